@@ -0,0 +1,62 @@
+"""unique (lost_item_id, found_item_id) on matches
+
+Removes duplicate match rows left by earlier matching runs, then adds the
+unique constraint that MatchRepository.bulk_upsert relies on for
+INSERT ... ON CONFLICT.
+
+Revision ID: a1f3c9d2e4b5
+Revises: 
+Create Date: 2026-10-17 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a1f3c9d2e4b5"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CONSTRAINT = "uq_matches_lost_found"
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if CONSTRAINT in {c["name"] for c in inspector.get_unique_constraints("matches")}:
+        return  # table was created from the current models
+
+    # Keep one row per pair: a reviewed (accepted/rejected) row wins over a
+    # pending one, then the highest score, then the oldest. The survivor
+    # takes the best score of its group.
+    op.execute("""
+        WITH ranked AS (
+            SELECT
+                id,
+                MAX(similarity_score) OVER w AS best_score,
+                ROW_NUMBER() OVER (
+                    PARTITION BY lost_item_id, found_item_id
+                    ORDER BY (status::text <> 'PENDING') DESC, similarity_score DESC, created_at, id
+                ) AS rn
+            FROM matches
+            WINDOW w AS (PARTITION BY lost_item_id, found_item_id)
+        ),
+        kept AS (
+            UPDATE matches m
+            SET similarity_score = ranked.best_score
+            FROM ranked
+            WHERE m.id = ranked.id AND ranked.rn = 1 AND m.similarity_score < ranked.best_score
+        )
+        DELETE FROM matches m
+        USING ranked
+        WHERE m.id = ranked.id AND ranked.rn > 1
+    """)
+
+    op.create_unique_constraint(CONSTRAINT, "matches", ["lost_item_id", "found_item_id"])
+
+
+def downgrade() -> None:
+    op.drop_constraint(CONSTRAINT, "matches", type_="unique")
@@ -0,0 +1,54 @@
+"""full-text search vector on items
+
+Adds a generated, weighted tsvector column (title A, tags B, description C)
+and a GIN index on it for ItemRepository.search_items.
+
+Revision ID: b7e2d4f1a9c3
+Revises: a1f3c9d2e4b5
+Create Date: 2026-10-17 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e2d4f1a9c3"
+down_revision: Union[str, None] = "a1f3c9d2e4b5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX = "ix_items_search_vector"
+
+# Frozen copy of app.models.item.SEARCH_VECTOR_EXPRESSION
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(json_to_tsvector('english', coalesce(tags, '[]'::json), '[\"string\"]'), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "search_vector" in {c["name"] for c in inspector.get_columns("items")}:
+        return  # table was created from the current models
+
+    # Stored generated column: rewrites the table once, then PostgreSQL keeps it current
+    op.add_column(
+        "items",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(INDEX, "items", ["search_vector"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    op.drop_index(INDEX, table_name="items")
+    op.drop_column("items", "search_vector")
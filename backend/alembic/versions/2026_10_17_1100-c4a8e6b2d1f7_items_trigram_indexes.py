@@ -0,0 +1,44 @@
+"""trigram indexes on items.title and items.location_found
+
+Enables pg_trgm and adds GIN trigram indexes backing fuzzy search
+(word-similarity ``%>``) and ``ILIKE '%...%'`` location filters.
+
+Revision ID: c4a8e6b2d1f7
+Revises: b7e2d4f1a9c3
+Create Date: 2026-10-17 11:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4a8e6b2d1f7"
+down_revision: Union[str, None] = "b7e2d4f1a9c3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    "ix_items_title_trgm": "title",
+    "ix_items_location_found_trgm": "location_found",
+}
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    existing = {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("items")}
+    for name, column in INDEXES.items():
+        if name in existing:
+            continue  # table was created from the current models
+        op.create_index(
+            name, "items", [column],
+            postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    for name in INDEXES:
+        op.drop_index(name, table_name="items")
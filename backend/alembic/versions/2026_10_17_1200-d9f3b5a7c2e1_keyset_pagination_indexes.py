@@ -0,0 +1,39 @@
+"""composite (created_at, id) indexes for keyset pagination
+
+Backs BaseCRUD.get_cursor_page for /items, /notifications and /messages.
+
+Revision ID: d9f3b5a7c2e1
+Revises: c4a8e6b2d1f7
+Create Date: 2026-10-17 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d9f3b5a7c2e1"
+down_revision: Union[str, None] = "c4a8e6b2d1f7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_items_created_at_id", "items", ["created_at", "id"]),
+    ("ix_notifications_user_created_id", "notifications", ["user_id", "created_at", "id"]),
+    ("ix_messages_receiver_created_id", "messages", ["receiver_id", "created_at", "id"]),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        if name in {index["name"] for index in inspector.get_indexes(table)}:
+            continue  # table was created from the current models
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,33 @@
+"""composite (sender_id, receiver_id, created_at) index on messages
+
+Backs the single-query conversation list and two-user threads.
+
+Revision ID: e2c7a4f9b3d6
+Revises: d9f3b5a7c2e1
+Create Date: 2026-10-17 13:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e2c7a4f9b3d6"
+down_revision: Union[str, None] = "d9f3b5a7c2e1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX = "ix_messages_sender_receiver_created"
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if INDEX in {index["name"] for index in inspector.get_indexes("messages")}:
+        return  # table was created from the current models
+    op.create_index(INDEX, "messages", ["sender_id", "receiver_id", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index(INDEX, table_name="messages")
@@ -0,0 +1,61 @@
+"""item_blocks matching blocking index
+
+One row per active item keyed by (type, category, date bucket). Tables
+created from an earlier model also carried a location zone that candidate
+lookups never used; it is dropped here. The API enqueues
+``rebuild_blocking_index`` at startup to fill the table.
+
+Revision ID: f5b1d8c3a7e9
+Revises: e2c7a4f9b3d6
+Create Date: 2026-10-17 14:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f5b1d8c3a7e9"
+down_revision: Union[str, None] = "e2c7a4f9b3d6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "item_blocks"
+KEY_INDEX = "ix_item_blocks_key"
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table(TABLE):
+        # table was created from the models; bring the key up to date
+        if "zone" in {column["name"] for column in inspector.get_columns(TABLE)}:
+            op.drop_index(KEY_INDEX, table_name=TABLE)
+            op.drop_column(TABLE, "zone")
+            op.create_index(KEY_INDEX, TABLE, ["type", "category", "date_bucket"])
+        return
+
+    op.create_table(
+        TABLE,
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "item_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("items.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("type", postgresql.ENUM(name="itemtype", create_type=False), nullable=False),
+        sa.Column("category", sa.String(100), nullable=False),
+        sa.Column("date_bucket", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_item_blocks_id", TABLE, ["id"])
+    op.create_index("ix_item_blocks_item_id", TABLE, ["item_id"], unique=True)
+    op.create_index(KEY_INDEX, TABLE, ["type", "category", "date_bucket"])
+
+
+def downgrade() -> None:
+    op.drop_table(TABLE)
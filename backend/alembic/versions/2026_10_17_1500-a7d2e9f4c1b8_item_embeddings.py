@@ -0,0 +1,56 @@
+"""item_embeddings table
+
+CLIP image/text embeddings per item, read by the ANN candidate index.
+Rows are filled by ``compute_item_embeddings`` as items are created or
+edited.
+
+Revision ID: a7d2e9f4c1b8
+Revises: f5b1d8c3a7e9
+Create Date: 2026-10-17 15:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7d2e9f4c1b8"
+down_revision: Union[str, None] = "f5b1d8c3a7e9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "item_embeddings"
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table(TABLE):
+        return  # table was created from the current models
+
+    op.create_table(
+        TABLE,
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "item_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("items.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("item_type", postgresql.ENUM(name="itemtype", create_type=False), nullable=False),
+        sa.Column("model_name", sa.String(255), nullable=False),
+        sa.Column("dim", sa.Integer(), nullable=False),
+        sa.Column("image_embedding", sa.LargeBinary(), nullable=True),
+        sa.Column("text_embedding", sa.LargeBinary(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_item_embeddings_id", TABLE, ["id"])
+    op.create_index("ix_item_embeddings_item_id", TABLE, ["item_id"], unique=True)
+    op.create_index("ix_item_embeddings_item_type", TABLE, ["item_type"])
+
+
+def downgrade() -> None:
+    op.drop_table(TABLE)
@@ -0,0 +1,60 @@
+"""item_fingerprints and matching_checkpoints tables
+
+State of the incremental matcher: the feature hash of each item when it
+was last scored, and the high-water mark of processed ``items.updated_at``.
+With no checkpoint the next run is a full one and seeds both tables.
+
+Revision ID: b3e8f1a6d4c2
+Revises: a7d2e9f4c1b8
+Create Date: 2026-10-17 16:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b3e8f1a6d4c2"
+down_revision: Union[str, None] = "a7d2e9f4c1b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table("item_fingerprints"):
+        op.create_table(
+            "item_fingerprints",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column(
+                "item_id",
+                postgresql.UUID(as_uuid=True),
+                sa.ForeignKey("items.id", ondelete="CASCADE"),
+                nullable=False,
+            ),
+            sa.Column("fingerprint", sa.String(64), nullable=False),
+            sa.Column("scored_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("ix_item_fingerprints_id", "item_fingerprints", ["id"])
+        op.create_index("ix_item_fingerprints_item_id", "item_fingerprints", ["item_id"], unique=True)
+
+    if not inspector.has_table("matching_checkpoints"):
+        op.create_table(
+            "matching_checkpoints",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("name", sa.String(100), nullable=False),
+            sa.Column("high_water_mark", sa.DateTime(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("ix_matching_checkpoints_id", "matching_checkpoints", ["id"])
+        op.create_index("ix_matching_checkpoints_name", "matching_checkpoints", ["name"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_table("matching_checkpoints")
+    op.drop_table("item_fingerprints")
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from typing import List, Dict, Any
-from PIL import Image
-from io import BytesIO
 from app.services.ai_model import ai_service
+from app.services.image_ingest import FileTooLargeError, read_limited
+from app.services.inference import inference_queue
 
 router = APIRouter()
 
@@ -19,25 +19,37 @@ TAGS = [
     "Bottle", "Charger", "Jacket", "Shirt", "Shoes"
 ]
 
+# Label embeddings are computed once, during the startup warmup
+ai_service.register_labels(CATEGORIES)
+ai_service.register_labels(TAGS)
+
 @router.post("/analyze-image")
 async def analyze_image(file: UploadFile = File(...)) -> Dict[str, Any]:
     """
     Analyze an uploaded image using CLIP AI to suggest categories and tags.
     """
-    if not ai_service.model:
+    if not await inference_queue.model_available():
         raise HTTPException(status_code=503, detail="AI Service unavailable (Model not loaded)")
 
     try:
-        # Read image
-        contents = await file.read()
-        image = Image.open(BytesIO(contents))
+        contents = await read_limited(file)
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    try:
+        # Cached by content hash; otherwise one image forward pass, micro-batched
+        # with concurrent requests off the event loop. Labels are scored against
+        # the cached label embeddings
+        image_embedding = await inference_queue.embed_image_bytes(contents)
         
         # 1. Predict Category
-        cat_results = ai_service.predict_labels(image, CATEGORIES)
+        category_embeddings = await inference_queue.label_embeddings(CATEGORIES)
+        cat_results = ai_service.rank_labels(image_embedding, category_embeddings, CATEGORIES)
         predicted_category = cat_results[0][0] if cat_results else "Other"
         
         # 2. Predict Tags
-        tag_results = ai_service.predict_labels(image, TAGS)
+        tag_embeddings = await inference_queue.label_embeddings(TAGS)
+        tag_results = ai_service.rank_labels(image_embedding, tag_embeddings, TAGS)
         # Filter tags with > 10% confidence and take top 5
         top_tags = [label for label, score in tag_results if score > 0.05][:5]
         
@@ -3,11 +3,16 @@ from typing import List, Optional
 from uuid import UUID
 
 from app.schemas.item import ItemCreate, ItemUpdate, ItemResponse, ItemList, ItemSearch
-from app.repositories import ItemRepository, MatchRepository
-from app.dependencies import get_item_repository, get_match_repository
+from app.repositories import ItemRepository
+from app.repositories.base import encode_cursor
+from app.dependencies import get_item_repository
 from app.api.deps import get_current_active_user
 from app.models.user import User
 from app.models.item import ItemType, ItemStatus
+from app.services.search import search_service, SearchUnavailableError
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -17,8 +22,7 @@ async def create_item(
     item_data: ItemCreate,
     background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_active_user),
-    item_repo: ItemRepository = Depends(get_item_repository),
-    match_repo: MatchRepository = Depends(get_match_repository)
+    item_repo: ItemRepository = Depends(get_item_repository)
 ):
     """
     Create a new lost or found item.
@@ -49,10 +53,13 @@ async def create_item(
     
     item = await item_repo.create(ItemCreateDB(**item_dict))
     
-    # Trigger matching algorithm in background
-    from app.services.matching import MatchingService
-    service = MatchingService(item_repo, match_repo)
-    background_tasks.add_task(service.process_matches_for_item, item.id)
+    # Matching and CLIP embeddings run in Celery workers. Enqueue after the
+    # response so the tasks only start once the item has been committed.
+    from app.workers.matching_tasks import run_matching_for_item
+    from app.workers.embedding_tasks import compute_item_embeddings
+    background_tasks.add_task(run_matching_for_item.delay, str(item.id))
+    background_tasks.add_task(compute_item_embeddings.delay, str(item.id))
+    background_tasks.add_task(search_service.index_items, [item])
     
     return item
 
@@ -61,12 +68,20 @@ async def create_item(
 async def list_items(
     skip: int = 0,
     limit: int = 20,
+    cursor: Optional[str] = None,
     type: Optional[ItemType] = None,
     status: Optional[ItemStatus] = None,
     category: Optional[str] = None,
     item_repo: ItemRepository = Depends(get_item_repository)
 ):
-    """List items with pagination and filters"""
+    """
+    List items with pagination and filters, newest first.
+    
+    Pass the returned ``next_cursor`` as ``cursor`` for the following page:
+    cursor pages cost the same at any depth, while ``skip`` gets slower
+    the deeper it goes. ``page`` is only set for ``skip`` pages, and
+    ``total`` is exact up to COUNT_EXACT_LIMIT items.
+    """
     filters = {}
     if type:
         filters['type'] = type
@@ -75,15 +90,22 @@ async def list_items(
     if category:
         filters['category'] = category
     
-    items = await item_repo.get_multi(skip=skip, limit=limit, **filters)
-    total = await item_repo.count(**filters)
+    if cursor or skip == 0:
+        items, next_cursor = await item_repo.get_multi_cursor(cursor=cursor, limit=limit, **filters)
+    else:
+        items = await item_repo.get_multi(skip=skip, limit=limit, order_by="-created_at", **filters)
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id) if len(items) == limit else None
+    # Capped count: exact for ordinary filters, estimated for huge ones
+    total, total_is_estimate = await item_repo.count_capped(item_repo.select_filtered(**filters))
     
     return ItemList(
         items=items,
         total=total,
-        page=skip // limit + 1,
+        page=None if cursor else skip // limit + 1,
         page_size=limit,
-        total_pages=(total + limit - 1) // limit
+        total_pages=(total + limit - 1) // limit,
+        next_cursor=next_cursor,
+        total_is_estimate=total_is_estimate
     )
 
 
@@ -92,8 +114,13 @@ async def search_items(
     search: ItemSearch,
     item_repo: ItemRepository = Depends(get_item_repository)
 ):
-    """Advanced search with multiple filters"""
-    items = await item_repo.search_items(
+    """
+    Advanced search with multiple filters.
+    
+    Served by the search index, with facet counts; falls back to the
+    database when the search backend is unreachable or still being built.
+    """
+    params = dict(
         query=search.query,
         item_type=search.type,
         category=search.category,
@@ -101,27 +128,37 @@ async def search_items(
         date_from=search.date_from,
         date_to=search.date_to,
         location=search.location,
+        fuzzy=search.fuzzy,
         skip=(search.page - 1) * search.page_size,
         limit=search.page_size
     )
+    try:
+        result = await search_service.search(**params)
+    except SearchUnavailableError as e:
+        logger.debug(f"{e}; searching the database")
+    except Exception as e:
+        logger.warning(f"Search backend failed, falling back to the database: {e}")
+    else:
+        return ItemList(
+            items=result.documents,
+            total=result.total,
+            page=search.page,
+            page_size=search.page_size,
+            total_pages=(result.total + search.page_size - 1) // search.page_size,
+            total_is_estimate=result.total_is_estimate,
+            facets=result.facets
+        )
     
-    # Count with same filters
-    filters = {}
-    if search.type:
-        filters['type'] = search.type
-    if search.category:
-        filters['category'] = search.category
-    if search.status:
-        filters['status'] = search.status
-    
-    total = await item_repo.count(**filters)
+    # Page and total of the same filters in one round trip
+    items, total, total_is_estimate = await item_repo.search_items_page(**params)
     
     return ItemList(
         items=items,
         total=total,
         page=search.page,
         page_size=search.page_size,
-        total_pages=(total + search.page_size - 1) // search.page_size
+        total_pages=(total + search.page_size - 1) // search.page_size,
+        total_is_estimate=total_is_estimate
     )
 
 
@@ -154,6 +191,7 @@ async def get_item(
 async def update_item(
     item_id: UUID,
     item_update: ItemUpdate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_active_user),
     item_repo: ItemRepository = Depends(get_item_repository)
 ):
@@ -175,12 +213,21 @@ async def update_item(
     
     # Update item
     updated_item = await item_repo.update(item_id, item_update)
+    
+    # Re-embed when the text or images CLIP sees have changed
+    changed = item_update.model_dump(exclude_unset=True)
+    if changed.keys() & {"title", "description", "images"}:
+        from app.workers.embedding_tasks import compute_item_embeddings
+        background_tasks.add_task(compute_item_embeddings.delay, str(item_id))
+    background_tasks.add_task(search_service.index_items, [updated_item])
+    
     return updated_item
 
 
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_item(
     item_id: UUID,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_active_user),
     item_repo: ItemRepository = Depends(get_item_repository)
 ):
@@ -202,3 +249,4 @@ async def delete_item(
     
     # Delete item
     await item_repo.delete(item_id)
+    background_tasks.add_task(search_service.delete_items, [item_id])
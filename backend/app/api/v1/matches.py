@@ -7,6 +7,7 @@ from app.repositories import MatchRepository, ItemRepository
 from app.dependencies import get_match_repository, get_item_repository
 from app.api.deps import get_current_active_user
 from app.models.user import User
+from app.config import settings
 
 router = APIRouter()
 
@@ -18,7 +19,7 @@ async def get_item_matches(
     match_repo: MatchRepository = Depends(get_match_repository),
     item_repo: ItemRepository = Depends(get_item_repository)
 ):
-    """Get all matches for an item"""
+    """Get the best matches for an item (at most MAX_MATCHES_PER_ITEM, highest score first)"""
     # Verify item exists and belongs to user
     item = await item_repo.get(item_id)
     if not item:
@@ -35,12 +36,12 @@ async def get_item_matches(
     
     # Get matches based on item type
     from app.models.item import ItemType
-    if item.type == ItemType.LOST:
-        matches = await match_repo.get_by_lost_item(item_id)
-    else:
-        matches = await match_repo.get_by_found_item(item_id)
-    
-    return matches
+    return await match_repo.get_top_matches(
+        item_id,
+        is_lost=item.type == ItemType.LOST,
+        min_score=0.0,
+        limit=settings.MAX_MATCHES_PER_ITEM
+    )
 
 
 @router.get("/{match_id}", response_model=MatchResponse)
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from typing import List, Optional
 from uuid import UUID
 
 from app.schemas.message import MessageCreate, MessageResponse, MessageList
 from app.repositories import MessageRepository
+from app.repositories.base import encode_cursor
 from app.dependencies import get_message_repository
 from app.api.deps import get_current_active_user
 from app.models.user import User
@@ -58,30 +59,63 @@ async def get_conversations(
 @router.get("/conversations/{user_id}", response_model=List[MessageResponse])
 async def get_conversation(
     user_id: UUID,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     message_repo: MessageRepository = Depends(get_message_repository)
 ):
-    """Get conversation with another user"""
-    messages = await message_repo.get_conversation(
-        current_user.id,
-        user_id,
-        skip=skip,
-        limit=limit
-    )
+    """
+    Get conversation with another user, oldest first.
+    
+    The ``X-Next-Cursor`` response header holds the cursor of the following
+    page (absent on the last page); pass it as ``cursor``.
+    """
+    if cursor or skip == 0:
+        messages, next_cursor = await message_repo.get_conversation_cursor(
+            current_user.id,
+            user_id,
+            cursor=cursor,
+            limit=limit
+        )
+    else:
+        messages = await message_repo.get_conversation(
+            current_user.id,
+            user_id,
+            skip=skip,
+            limit=limit
+        )
+        next_cursor = encode_cursor(messages[-1].created_at, messages[-1].id) if len(messages) == limit else None
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return messages
 
 
 @router.get("/", response_model=List[MessageResponse])
 async def get_my_messages(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     message_repo: MessageRepository = Depends(get_message_repository)
 ):
-    """Get all messages for current user"""
-    messages = await message_repo.get_by_receiver(current_user.id, skip=skip, limit=limit)
+    """
+    Get all messages for current user, newest first.
+    
+    The ``X-Next-Cursor`` response header holds the cursor of the following
+    page (absent on the last page); pass it as ``cursor``.
+    """
+    if cursor or skip == 0:
+        messages, next_cursor = await message_repo.get_by_receiver_cursor(current_user.id, cursor=cursor, limit=limit)
+    else:
+        messages = await message_repo.get_by_receiver(current_user.id, skip=skip, limit=limit)
+        next_cursor = encode_cursor(messages[-1].created_at, messages[-1].id) if len(messages) == limit else None
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return messages
 
 
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from app.schemas.notification import NotificationResponse, NotificationList, NotificationMarkRead
 from app.repositories import NotificationRepository
+from app.repositories.base import encode_cursor
 from app.dependencies import get_notification_repository
 from app.api.deps import get_current_active_user
 from app.models.user import User
@@ -15,15 +16,31 @@ router = APIRouter()
 async def get_notifications(
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     notification_repo: NotificationRepository = Depends(get_notification_repository)
 ):
-    """Get all notifications for current user"""
-    notifications = await notification_repo.get_by_user(
-        current_user.id,
-        skip=skip,
-        limit=limit
-    )
+    """
+    Get all notifications for current user, newest first.
+    
+    Pass the returned ``next_cursor`` as ``cursor`` for the following page
+    (constant cost at any depth); ``skip`` still works.
+    """
+    if cursor or skip == 0:
+        notifications, next_cursor = await notification_repo.get_by_user_cursor(
+            current_user.id,
+            cursor=cursor,
+            limit=limit
+        )
+    else:
+        notifications = await notification_repo.get_by_user(
+            current_user.id,
+            skip=skip,
+            limit=limit
+        )
+        next_cursor = None
+        if len(notifications) == limit:
+            next_cursor = encode_cursor(notifications[-1].created_at, notifications[-1].id)
     
     total = await notification_repo.count(user_id=current_user.id)
     unread_count = await notification_repo.count_unread_notifications(current_user.id)
@@ -32,8 +49,9 @@ async def get_notifications(
         notifications=notifications,
         total=total,
         unread_count=unread_count,
-        page=skip // limit + 1,
-        page_size=limit
+        page=None if cursor else skip // limit + 1,
+        page_size=limit,
+        next_cursor=next_cursor
     )
 
 
@@ -20,6 +20,9 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     DATABASE_POOL_SIZE: int = 20
     DATABASE_MAX_OVERFLOW: int = 10
+    COUNT_EXACT_LIMIT: int = 10000  # Rows counted exactly for paginated totals; planner estimate beyond
+    DATABASE_BULK_CHUNK_SIZE: int = 1000  # Rows per statement in BaseCRUD bulk writes
+    DATABASE_STREAM_CHUNK_SIZE: int = 1000  # Rows per partition fetched from server-side cursors
     
     # Redis
     REDIS_URL: str
@@ -48,6 +51,11 @@ class Settings(BaseSettings):
     # Elasticsearch
     ELASTICSEARCH_URL: str = "http://localhost:9200"
     ELASTICSEARCH_INDEX: str = "lost_found_items"
+    SEARCH_BACKEND: str = "elasticsearch"  # "elasticsearch" or "memory" (in-process index, single process only)
+    SEARCH_BULK_CHUNK_SIZE: int = 500  # Documents per bulk indexing request
+    SEARCH_TIMEOUT: float = 5.0  # Seconds per Elasticsearch request
+    SEARCH_RETRY_SECONDS: float = 30.0  # Searches use the database this long after a backend failure
+    SEARCH_FUZZY_THRESHOLD: float = 0.5  # Min pg_trgm word similarity for fuzzy search hits
     
     # Celery
     CELERY_BROKER_URL: str
@@ -74,8 +82,42 @@ class Settings(BaseSettings):
     WS_MESSAGE_QUEUE_SIZE: int = 100
     
     # Matching Algorithm
-    SIMILARITY_THRESHOLD: float = 0.7
+    SIMILARITY_THRESHOLD: float = 0.4
     MAX_MATCHES_PER_ITEM: int = 10
+    MATCHING_CHUNK_SIZE: int = 1000  # Items per side of a scoring block
+    MATCHING_DATE_WINDOW_DAYS: int = 30  # Max days between lost and found dates
+    MATCHING_DATE_BUCKET_DAYS: int = 7  # Width of the date buckets in the blocking index
+    MATCHING_POOL_WORKERS: int = 2  # Scoring processes per Celery worker (0 = in-process)
+    # Score fusion weights (should sum to 1; run a full matching pass after changing them).
+    # Check changes with scripts/evaluate_matching.py: no blend with a date weight
+    # has beaten these on the labeled set at the default threshold.
+    MATCHING_WEIGHT_TITLE: float = 0.4
+    MATCHING_WEIGHT_DESCRIPTION: float = 0.3
+    MATCHING_WEIGHT_TAGS: float = 0.2
+    MATCHING_WEIGHT_LOCATION: float = 0.1
+    MATCHING_WEIGHT_DATE: float = 0.0
+    
+    # AI Model & Embeddings
+    CLIP_MODEL_NAME: str = "openai/clip-vit-base-patch32"
+    AI_INFERENCE_BACKEND: str = "torch"  # torch | torch_int8 | onnx | onnx_int8
+    AI_MODEL_HOST: str = "local"  # local (in-process) | remote (shared model host process)
+    MODEL_HOST_SOCKET: str = "data/model_host.sock"
+    MODEL_HOST_TIMEOUT: float = 30.0  # Seconds to wait for a model host response
+    AI_MODEL_RETRY_SECONDS: float = 60.0  # Wait before retrying a failed model load
+    MODEL_CACHE_DIR: str = "data/model_cache"
+    EMBEDDING_INDEX_DIR: str = "data/embedding_index"
+    EMBEDDING_INDEX_NPROBE: int = 8
+    EMBEDDING_INDEX_TOP_K: int = 50
+    EMBEDDING_CACHE_BACKEND: str = "redis"  # redis | disk | memory (shared tier behind the LRU)
+    EMBEDDING_CACHE_SIZE: int = 4096  # Image embeddings kept in each process
+    EMBEDDING_CACHE_TTL: int = 30 * 24 * 3600  # Seconds (redis tier)
+    IMAGE_FETCH_TIMEOUT: float = 5.0  # Seconds per image download
+    IMAGE_FETCH_MAX_CONNECTIONS: int = 32  # Concurrent downloads per process
+    IMAGE_FETCH_PER_HOST: int = 8  # Concurrent downloads per origin
+    IMAGE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # Fetched image bytes kept in each process
+    AI_IMAGE_DECODE_SIZE: int = 224  # Shortest side images are decoded to (CLIP input size)
+    AI_BATCH_MAX_SIZE: int = 16  # Images per micro-batch
+    AI_BATCH_MAX_WAIT_MS: int = 10  # Max time a request waits for a batch to fill
     
     # Item Expiry
     ITEM_EXPIRY_DAYS: int = 90
@@ -1,7 +1,9 @@
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.pool import NullPool
 from typing import AsyncGenerator
+from contextlib import asynccontextmanager
 from app.config import settings
 
 # Create async engine
@@ -47,9 +49,38 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+@asynccontextmanager
+async def task_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for Celery tasks.
+    
+    Each task runs its coroutine in a fresh event loop (``asyncio.run``), so it
+    gets its own short-lived engine instead of the pooled one, whose
+    connections are bound to the loop that created them.
+    
+    Usage:
+        async with task_session() as db:
+            item = await ItemRepository(db).get(item_id)
+    """
+    task_engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    session_factory = async_sessionmaker(task_engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        async with session_factory() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+    finally:
+        await task_engine.dispose()
+
+
 async def init_db():
     """Initialize database - create all tables"""
     async with engine.begin() as conn:
+        # Trigram indexes on items need pg_trgm
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.create_all)
 
 
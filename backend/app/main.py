@@ -11,6 +11,7 @@ from app.config import settings
 from app.database import init_db, close_db
 from app.core.cache import close_redis
 from app.core.rate_limit import limiter
+from app.repositories.base import InvalidCursorError
 
 # Configure logging
 logging.basicConfig(
@@ -35,6 +36,31 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Database initialization failed: {e}")
     
+    # Prepare the search index
+    from app.database import AsyncSessionLocal
+    from app.repositories import ItemRepository
+    from app.services.search import search_service
+    try:
+        async with AsyncSessionLocal() as db:
+            await search_service.startup(ItemRepository(db))
+    except Exception as e:
+        logger.error(f"Search index initialization failed: {e}")
+    
+    # Items created before the matching blocking index have no entries in it
+    # and would never be match candidates; backfill them in a worker
+    try:
+        async with AsyncSessionLocal() as db:
+            if await ItemRepository(db).has_unblocked_items():
+                from app.workers.matching_tasks import rebuild_blocking_index
+                rebuild_blocking_index.delay()
+                logger.info("Blocking index incomplete, rebuild enqueued")
+    except Exception as e:
+        logger.error(f"Blocking index check failed: {e}")
+    
+    # Load CLIP and its label embeddings off the event loop
+    from app.services.inference import inference_queue
+    inference_queue.start_warmup()
+    
     logger.info(f"Application started in {settings.ENVIRONMENT} mode")
     
     yield
@@ -43,6 +69,9 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down...")
     await close_db()
     await close_redis()
+    
+    await inference_queue.close()
+    await search_service.close()
     logger.info("Shutdown complete")
 
 
@@ -67,6 +96,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=settings.allowed_methods_list,
     allow_headers=settings.allowed_headers_list,
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -97,6 +127,15 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    """Handle malformed pagination cursors"""
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": str(exc)},
+    )
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Handle unexpected errors"""
@@ -8,6 +8,9 @@ from app.models.match import Match, MatchStatus
 from app.models.claim import Claim, ClaimStatus
 from app.models.message import Message
 from app.models.notification import Notification
+from app.models.embedding import ItemEmbedding
+from app.models.matching_state import MatchingCheckpoint, ItemFingerprint
+from app.models.item_block import ItemBlock
 
 __all__ = [
     "User",
@@ -21,4 +24,8 @@ __all__ = [
     "ClaimStatus",
     "Message",
     "Notification",
+    "ItemEmbedding",
+    "MatchingCheckpoint",
+    "ItemFingerprint",
+    "ItemBlock",
 ]
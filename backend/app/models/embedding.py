@@ -0,0 +1,34 @@
+from sqlalchemy import Column, String, Integer, DateTime, LargeBinary, Enum as SQLEnum, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+from app.database import Base
+from app.models.item import ItemType
+
+
+class ItemEmbedding(Base):
+    """CLIP image/text embeddings computed once per item version"""
+    
+    __tablename__ = "item_embeddings"
+    
+    # Primary Key
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    
+    # Foreign Keys
+    item_id = Column(UUID(as_uuid=True), ForeignKey("items.id", ondelete="CASCADE"), nullable=False, unique=True, index=True)
+    
+    # Denormalized so the ANN index can be partitioned without a join
+    item_type = Column(SQLEnum(ItemType), nullable=False, index=True)
+    
+    # Embeddings (L2-normalized float32 vectors stored as raw bytes)
+    model_name = Column(String(255), nullable=False)
+    dim = Column(Integer, nullable=False)
+    image_embedding = Column(LargeBinary, nullable=True)  # None when the item has no usable image
+    text_embedding = Column(LargeBinary, nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<ItemEmbedding {self.item_id} ({self.model_name})>"
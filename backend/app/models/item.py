@@ -1,12 +1,23 @@
-from sqlalchemy import Column, String, Text, DateTime, Enum as SQLEnum, ForeignKey, Date, JSON
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Text, DateTime, Enum as SQLEnum, ForeignKey, Date, JSON, Computed, Index
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime, date
 import uuid
 import enum
 from app.database import Base
 
 
+# Text search configuration of the items search vector
+SEARCH_CONFIG = "english"
+
+# Weighted search document: title (A), tags (B), description (C)
+SEARCH_VECTOR_EXPRESSION = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(json_to_tsvector('{SEARCH_CONFIG}', coalesce(tags, '[]'::json), '[\"string\"]'), 'B') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'C')"
+)
+
+
 class ItemType(str, enum.Enum):
     """Item type enumeration"""
     LOST = "lost"
@@ -25,6 +36,17 @@ class Item(Base):
     """Item model for lost and found items"""
     
     __tablename__ = "items"
+    __table_args__ = (
+        Index("ix_items_search_vector", "search_vector", postgresql_using="gin"),
+        # Keyset pagination (created_at, id)
+        Index("ix_items_created_at_id", "created_at", "id"),
+        # Trigram indexes (pg_trgm): fuzzy search and ILIKE '%...%' filters
+        Index("ix_items_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        Index(
+            "ix_items_location_found_trgm", "location_found",
+            postgresql_using="gin", postgresql_ops={"location_found": "gin_trgm_ops"}
+        ),
+    )
     
     # Primary Key
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
@@ -51,6 +73,9 @@ class Item(Base):
     images = Column(JSON, default=list, nullable=False)  # Array of image URLs
     tags = Column(JSON, default=list, nullable=False)    # Array of tags for search
     
+    # Full-text search document, maintained by PostgreSQL; never loaded with the row
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_EXPRESSION, persisted=True), nullable=True))
+    
     # QR Code
     qr_code_url = Column(String(500), nullable=True)
     
@@ -0,0 +1,38 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+from app.database import Base
+from app.models.item import ItemType
+
+
+class ItemBlock(Base):
+    """
+    Blocking key of an active item for candidate pre-filtering.
+    
+    One row per active item; rows are removed when the item stops being
+    active, so candidate lookups never touch claimed or expired items.
+    """
+    
+    __tablename__ = "item_blocks"
+    __table_args__ = (
+        Index("ix_item_blocks_key", "type", "category", "date_bucket"),
+    )
+    
+    # Primary Key
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    
+    # Foreign Keys
+    item_id = Column(UUID(as_uuid=True), ForeignKey("items.id", ondelete="CASCADE"), nullable=False, unique=True, index=True)
+    
+    # Blocking key
+    type = Column(SQLEnum(ItemType), nullable=False)
+    category = Column(String(100), nullable=False)
+    date_bucket = Column(Integer, nullable=False)  # date ordinal // MATCHING_DATE_BUCKET_DAYS
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<ItemBlock {self.item_id} ({self.type}, {self.category}, {self.date_bucket})>"
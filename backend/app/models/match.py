@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Float, DateTime, Enum as SQLEnum, ForeignKey
+from sqlalchemy import Column, Float, DateTime, Enum as SQLEnum, ForeignKey, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -18,6 +18,10 @@ class Match(Base):
     """Match model for AI-powered item matching"""
     
     __tablename__ = "matches"
+    __table_args__ = (
+        # One match per pair; matching runs upsert against this
+        UniqueConstraint("lost_item_id", "found_item_id", name="uq_matches_lost_found"),
+    )
     
     # Primary Key
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
@@ -0,0 +1,48 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+from app.database import Base
+
+
+class MatchingCheckpoint(Base):
+    """High-water mark of the incremental matcher"""
+    
+    __tablename__ = "matching_checkpoints"
+    
+    # Primary Key
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    
+    # Checkpoint name (one row per job)
+    name = Column(String(100), unique=True, nullable=False, index=True)
+    
+    # Largest Item.updated_at already processed
+    high_water_mark = Column(DateTime, nullable=False)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<MatchingCheckpoint {self.name} @ {self.high_water_mark}>"
+
+
+class ItemFingerprint(Base):
+    """Hash of the matching features of an item when it was last scored"""
+    
+    __tablename__ = "item_fingerprints"
+    
+    # Primary Key
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    
+    # Foreign Keys
+    item_id = Column(UUID(as_uuid=True), ForeignKey("items.id", ondelete="CASCADE"), nullable=False, unique=True, index=True)
+    
+    # SHA-256 hex digest of the scored features
+    fingerprint = Column(String(64), nullable=False)
+    
+    # Timestamps
+    scored_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<ItemFingerprint {self.item_id}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Text, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -10,6 +10,12 @@ class Message(Base):
     """Message model for user-to-user communication"""
     
     __tablename__ = "messages"
+    __table_args__ = (
+        # Keyset pagination of a user's inbox
+        Index("ix_messages_receiver_created_id", "receiver_id", "created_at", "id"),
+        # Conversation list and threads between two users
+        Index("ix_messages_sender_receiver_created", "sender_id", "receiver_id", "created_at"),
+    )
     
     # Primary Key
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -10,6 +10,10 @@ class Notification(Base):
     """Notification model for real-time alerts"""
     
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Keyset pagination of a user's notifications
+        Index("ix_notifications_user_created_id", "user_id", "created_at", "id"),
+    )
     
     # Primary Key
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
@@ -18,6 +18,8 @@ from app.repositories.match import MatchRepository
 from app.repositories.claim import ClaimRepository
 from app.repositories.message import MessageRepository
 from app.repositories.notification import NotificationRepository
+from app.repositories.embedding import ItemEmbeddingRepository
+from app.repositories.matching_state import MatchingStateRepository
 
 __all__ = [
     "BaseCRUD",
@@ -27,4 +29,6 @@ __all__ = [
     "ClaimRepository",
     "MessageRepository",
     "NotificationRepository",
+    "ItemEmbeddingRepository",
+    "MatchingStateRepository",
 ]
@@ -1,10 +1,19 @@
-from typing import TypeVar, Generic, Type, Optional, List, Dict, Any
+from typing import TypeVar, Generic, Type, Optional, List, Dict, Any, Tuple, Sequence, AsyncIterator
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, func
+from sqlalchemy import select, insert, update, delete, func, tuple_, values, column, cast
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.engine import Row
+from sqlalchemy.orm.util import identity_key
 from sqlalchemy.sql import Select
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from datetime import datetime
 from uuid import UUID
 from pydantic import BaseModel
+import base64
+import binascii
+import json
 
+from app.config import settings
 from app.database import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
@@ -12,6 +21,45 @@ CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
+class InvalidCursorError(ValueError):
+    """Pagination cursor is malformed or was not issued by this API"""
+
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    """Opaque cursor for the keyset position (created_at, id)"""
+    payload = json.dumps([created_at.isoformat(), str(id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Keyset position of a cursor from ``encode_cursor``.
+    
+    Raises:
+        InvalidCursorError: If the cursor cannot be decoded
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(payload)
+        return datetime.fromisoformat(created_at), UUID(id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor!r}") from e
+
+
+class _Explain(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON)`` of a statement, with its parameters bound as usual"""
+    
+    inherit_cache = False
+    
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(_Explain)
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
 class BaseCRUD(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     """
     Base CRUD repository with generic database operations.
@@ -90,10 +138,312 @@ class BaseCRUD(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         result = await self.db.execute(query)
         return list(result.scalars().all())
     
+    async def get_page(
+        self,
+        stmt: Select,
+        skip: int = 0,
+        limit: int = 100,
+        count_limit: Optional[int] = None
+    ) -> Tuple[List[ModelType], int, bool]:
+        """
+        One page of a query together with its total, in a single round trip.
+        
+        The total is a capped count (``LIMIT count_limit + 1`` subquery)
+        evaluated once alongside the page, so it costs at most
+        ``count_limit`` index/row visits. Past the cap the planner's row
+        estimate is returned instead of an exact ``COUNT(*)``.
+        
+        Args:
+            stmt: Filtered, ordered ``select(self.model)`` without offset/limit
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            count_limit: Rows counted exactly (defaults to COUNT_EXACT_LIMIT)
+            
+        Returns:
+            (model instances, total, whether the total is an estimate)
+        """
+        count_limit = count_limit or settings.COUNT_EXACT_LIMIT
+        capped_count = self._capped_count(stmt, count_limit)
+        
+        result = await self.db.execute(
+            stmt.add_columns(capped_count.scalar_subquery().label("total")).offset(skip).limit(limit)
+        )
+        rows = result.all()
+        
+        # Past the last page there is no row to carry the total
+        total = rows[0].total if rows else (await self.db.execute(capped_count)).scalar_one()
+        items = [row[0] for row in rows]
+        
+        if total > count_limit:
+            return items, max(await self.estimate_count(stmt), total), True
+        return items, total, False
+    
+    async def count_capped(self, stmt: Select, count_limit: Optional[int] = None) -> Tuple[int, bool]:
+        """
+        Total of a query, exact up to ``count_limit`` rows and estimated beyond.
+        
+        Returns:
+            (total, whether the total is an estimate)
+        """
+        count_limit = count_limit or settings.COUNT_EXACT_LIMIT
+        total = (await self.db.execute(self._capped_count(stmt, count_limit))).scalar_one()
+        if total > count_limit:
+            return max(await self.estimate_count(stmt), total), True
+        return total, False
+    
+    def _capped_count(self, stmt: Select, count_limit: int) -> Select:
+        capped = stmt.order_by(None).with_only_columns(self.model.id).limit(count_limit + 1).subquery()
+        return select(func.count()).select_from(capped)
+    
+    async def get_cursor_page(
+        self,
+        stmt: Select,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        descending: bool = True
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        One page of a query by keyset pagination on (created_at, id).
+        
+        Every page is an index seek past the cursor position, so page 500
+        costs the same as page 1 (unlike ``OFFSET``). Rows inserted while
+        paging never shift later pages.
+        
+        Args:
+            stmt: Filtered ``select(self.model)``; its ordering is replaced by (created_at, id)
+            cursor: Cursor from the previous page, None for the first page
+            limit: Maximum number of records to return
+            descending: Newest first (default) or oldest first
+            
+        Returns:
+            (model instances, cursor of the next page or None on the last page)
+            
+        Raises:
+            InvalidCursorError: If the cursor cannot be decoded
+        """
+        key = tuple_(self.model.created_at, self.model.id)
+        if descending:
+            stmt = stmt.order_by(None).order_by(self.model.created_at.desc(), self.model.id.desc())
+        else:
+            stmt = stmt.order_by(None).order_by(self.model.created_at, self.model.id)
+        
+        if cursor:
+            position = decode_cursor(cursor)
+            stmt = stmt.where(key < position if descending else key > position)
+        
+        # One extra row tells whether there is a next page
+        result = await self.db.execute(stmt.limit(limit + 1))
+        items = list(result.scalars().all())
+        if len(items) <= limit:
+            return items, None
+        
+        items = items[:limit]
+        return items, encode_cursor(items[-1].created_at, items[-1].id)
+    
+    async def get_multi_cursor(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        descending: bool = True,
+        **filters
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        Cursor-paginated counterpart of ``get_multi`` (see ``get_cursor_page``).
+        
+        Args:
+            cursor: Cursor from the previous page, None for the first page
+            limit: Maximum number of records to return
+            descending: Newest first (default) or oldest first
+            **filters: Field filters (e.g., status="active")
+            
+        Returns:
+            (model instances, cursor of the next page or None on the last page)
+        """
+        return await self.get_cursor_page(
+            self.select_filtered(**filters), cursor=cursor, limit=limit, descending=descending
+        )
+    
+    def select_filtered(self, **filters) -> Select:
+        """``select(self.model)`` with field equality filters, e.g. for ``count_capped``"""
+        query = select(self.model)
+        
+        for field, value in filters.items():
+            if hasattr(self.model, field):
+                query = query.where(getattr(self.model, field) == value)
+        
+        return query
+    
+    async def estimate_count(self, stmt: Select) -> int:
+        """
+        Planner row estimate of a query (``EXPLAIN``, nothing is executed).
+        
+        Args:
+            stmt: Select statement
+            
+        Returns:
+            Estimated number of result rows
+        """
+        result = await self.db.execute(_Explain(stmt.order_by(None)))
+        plan = result.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    
+    def select_columns(self, columns: Optional[Sequence[str]] = None) -> Select:
+        """
+        ``select(model)``, or a projection of the named columns.
+        
+        Projections return plain ``Row`` tuples (attribute access by column
+        name) that skip ORM hydration and the identity map.
+        """
+        if columns is None:
+            return select(self.model)
+        return select(*(getattr(self.model, name) for name in columns))
+    
+    @staticmethod
+    def fetch_rows(result, columns: Optional[Sequence[str]] = None) -> list:
+        """Model instances, or rows for a projection built by ``select_columns``"""
+        if columns is None:
+            return list(result.scalars().all())
+        return list(result.all())
+    
+    async def get_columns(
+        self,
+        columns: Sequence[str],
+        skip: int = 0,
+        limit: int = 100,
+        order_by: Optional[str] = None,
+        **filters
+    ) -> List[Row]:
+        """
+        Projection counterpart of ``get_multi``: only the named columns are loaded.
+        
+        Args:
+            columns: Column names to load (e.g. ("id", "title"))
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            order_by: Column name to order by (prefix with - for descending)
+            **filters: Field filters (e.g., status="active")
+            
+        Returns:
+            Rows with one attribute per column
+        """
+        query = self.select_columns(columns)
+        
+        for field, value in filters.items():
+            if hasattr(self.model, field):
+                query = query.where(getattr(self.model, field) == value)
+        
+        if order_by:
+            if order_by.startswith("-"):
+                query = query.order_by(getattr(self.model, order_by[1:]).desc())
+            else:
+                query = query.order_by(getattr(self.model, order_by))
+        
+        result = await self.db.execute(query.offset(skip).limit(limit))
+        return list(result.all())
+    
+    async def stream_statement(
+        self,
+        stmt: Select,
+        chunk_size: Optional[int] = None,
+        scalars: bool = True
+    ) -> AsyncIterator[list]:
+        """
+        Run a statement on a server-side cursor and yield fixed-size partitions.
+        
+        Only one partition is held in memory at a time. Model instances are
+        detached from the session once their partition has been consumed, so
+        the identity map stays bounded too.
+        
+        The cursor lives in the current transaction: the caller may write in
+        between partitions but must not commit until iteration is done.
+        
+        Args:
+            stmt: Select to stream
+            chunk_size: Rows per partition (defaults to DATABASE_STREAM_CHUNK_SIZE)
+            scalars: Yield the first column (model instances) instead of rows
+            
+        Yields:
+            Lists of at most ``chunk_size`` instances (or rows)
+        """
+        chunk_size = chunk_size or settings.DATABASE_STREAM_CHUNK_SIZE
+        result = await self.db.stream(stmt.execution_options(yield_per=chunk_size))
+        if scalars:
+            result = result.scalars()
+        
+        async for partition in result.partitions():
+            yield partition
+            
+            if scalars:
+                for obj in partition:
+                    if obj in self.db:
+                        self.db.expunge(obj)
+    
+    async def stream(
+        self,
+        chunk_size: Optional[int] = None,
+        order_by: Optional[str] = None,
+        **filters
+    ) -> AsyncIterator[List[ModelType]]:
+        """
+        Streaming counterpart of ``get_all``.
+        
+        Args:
+            chunk_size: Records per partition (defaults to DATABASE_STREAM_CHUNK_SIZE)
+            order_by: Column name to order by (prefix with - for descending)
+            **filters: Field filters
+            
+        Yields:
+            Lists of at most ``chunk_size`` model instances
+        """
+        query = select(self.model)
+        
+        for field, value in filters.items():
+            if hasattr(self.model, field):
+                query = query.where(getattr(self.model, field) == value)
+        
+        if order_by:
+            if order_by.startswith("-"):
+                query = query.order_by(getattr(self.model, order_by[1:]).desc())
+            else:
+                query = query.order_by(getattr(self.model, order_by))
+        
+        async for partition in self.stream_statement(query, chunk_size):
+            yield partition
+    
+    async def stream_columns(
+        self,
+        columns: Sequence[str],
+        chunk_size: Optional[int] = None,
+        **filters
+    ) -> AsyncIterator[List[Row]]:
+        """
+        Stream a projection of all matching records in fixed-size partitions.
+        
+        Args:
+            columns: Column names to load
+            chunk_size: Rows per partition (defaults to DATABASE_STREAM_CHUNK_SIZE)
+            **filters: Field filters
+            
+        Yields:
+            Lists of at most ``chunk_size`` rows
+        """
+        query = self.select_columns(columns)
+        
+        for field, value in filters.items():
+            if hasattr(self.model, field):
+                query = query.where(getattr(self.model, field) == value)
+        
+        async for partition in self.stream_statement(query, chunk_size, scalars=False):
+            yield partition
+    
     async def get_all(self, **filters) -> List[ModelType]:
         """
         Get all records matching filters.
         
+        Loads every row at once; use ``stream`` for unbounded result sets.
+        
         Args:
             **filters: Field filters
             
@@ -257,54 +607,105 @@ class BaseCRUD(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         )
         return list(result.scalars().all())
     
-    async def bulk_create(self, objs_in: List[CreateSchemaType]) -> List[ModelType]:
+    async def bulk_create(
+        self,
+        objs_in: List[CreateSchemaType | Dict[str, Any]],
+        chunk_size: Optional[int] = None
+    ) -> List[ModelType]:
         """
         Create multiple records at once.
         
+        One ``INSERT ... VALUES (...), (...) RETURNING *`` per ``chunk_size``
+        rows; created instances come back from RETURNING instead of one
+        refresh SELECT per row.
+        
         Args:
-            objs_in: List of Pydantic schemas
+            objs_in: List of Pydantic schemas or dicts
+            chunk_size: Rows per statement (defaults to DATABASE_BULK_CHUNK_SIZE)
             
         Returns:
-            List of created model instances
+            List of created model instances, in input order
         """
-        db_objs = []
-        for obj_in in objs_in:
-            obj_data = obj_in.model_dump() if hasattr(obj_in, 'model_dump') else obj_in.dict()
-            db_obj = self.model(**obj_data)
-            db_objs.append(db_obj)
-        
-        self.db.add_all(db_objs)
-        await self.db.flush()
-        
-        for db_obj in db_objs:
-            await self.db.refresh(db_obj)
+        chunk_size = chunk_size or settings.DATABASE_BULK_CHUNK_SIZE
+        rows = [
+            obj_in if isinstance(obj_in, dict)
+            else obj_in.model_dump() if hasattr(obj_in, 'model_dump') else obj_in.dict()
+            for obj_in in objs_in
+        ]
+        
+        db_objs: List[ModelType] = []
+        for start in range(0, len(rows), chunk_size):
+            result = await self.db.execute(
+                insert(self.model).returning(self.model, sort_by_parameter_order=True),
+                rows[start:start + chunk_size],
+            )
+            db_objs.extend(result.scalars().all())
         
         return db_objs
     
-    async def bulk_update(self, updates: List[Dict[str, Any]]) -> int:
+    async def bulk_update(self, updates: List[Dict[str, Any]], chunk_size: Optional[int] = None) -> int:
         """
         Update multiple records at once.
         
+        Rows are grouped by the set of fields they change; each group is
+        applied as ``UPDATE ... FROM (VALUES ...)`` joined on id, one
+        statement per ``chunk_size`` rows. Instances of the updated rows
+        already loaded in the session are reloaded afterwards, so they see
+        the new values (and ``onupdate`` columns) rather than stale ones.
+        
         Args:
             updates: List of dicts with 'id' and update fields
+            chunk_size: Rows per statement (defaults to DATABASE_BULK_CHUNK_SIZE)
             
         Returns:
             Number of updated records
         """
-        count = 0
+        chunk_size = chunk_size or settings.DATABASE_BULK_CHUNK_SIZE
+        table = self.model.__table__
+        
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
         for update_data in updates:
             if 'id' not in update_data:
                 continue
-            
-            record_id = update_data.pop('id')
-            result = await self.db.execute(
-                update(self.model)
-                .where(self.model.id == record_id)
-                .values(**update_data)
-            )
-            count += result.rowcount
+            fields = tuple(sorted(name for name in update_data if name != 'id' and name in table.c))
+            if fields:
+                groups.setdefault(fields, []).append(update_data)
+        
+        count = 0
+        for fields, rows in groups.items():
+            for start in range(0, len(rows), chunk_size):
+                data = values(
+                    column('id', table.c.id.type),
+                    *(column(name, table.c[name].type) for name in fields),
+                    name='data',
+                ).data([
+                    (row['id'], *(row[name] for name in fields))
+                    for row in rows[start:start + chunk_size]
+                ])
+                result = await self.db.execute(
+                    update(self.model)
+                    .where(self.model.id == data.c.id)
+                    # VALUES columns without a bind cast (e.g. enums) arrive as text
+                    .values({name: cast(data.c[name], table.c[name].type) for name in fields})
+                    .execution_options(synchronize_session=False)
+                )
+                count += result.rowcount
         
         await self.db.flush()
+        
+        # The SET values are SQL expressions the ORM cannot apply in Python
+        # (synchronize_session="fetch" would only expire them, and expired
+        # attributes cannot lazy-load on an AsyncSession): reload instead
+        loaded_ids = [
+            row['id'] for rows in groups.values() for row in rows
+            if identity_key(self.model, row['id']) in self.db.identity_map
+        ]
+        for start in range(0, len(loaded_ids), chunk_size):
+            await self.db.execute(
+                select(self.model)
+                .where(self.model.id.in_(loaded_ids[start:start + chunk_size]))
+                .execution_options(populate_existing=True)
+            )
         return count
     
     async def bulk_delete(self, ids: List[UUID]) -> int:
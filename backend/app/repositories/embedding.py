@@ -0,0 +1,115 @@
+from typing import AsyncIterator, Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_
+from sqlalchemy.dialects.postgresql import insert
+from datetime import datetime
+from uuid import UUID
+
+from app.models.embedding import ItemEmbedding
+from app.models.item import Item, ItemType, ItemStatus
+from app.repositories.base import BaseCRUD
+from pydantic import BaseModel
+
+
+class ItemEmbeddingCreate(BaseModel):
+    """Schema for storing item embeddings"""
+    item_id: UUID
+    item_type: ItemType
+    model_name: str
+    dim: int
+    image_embedding: Optional[bytes] = None
+    text_embedding: Optional[bytes] = None
+
+
+class ItemEmbeddingRepository(BaseCRUD[ItemEmbedding, ItemEmbeddingCreate, ItemEmbeddingCreate]):
+    """
+    Repository for persisted CLIP embeddings.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        super().__init__(ItemEmbedding, db)
+    
+    async def get_by_item(self, item_id: UUID) -> Optional[ItemEmbedding]:
+        """Get embeddings for an item"""
+        return await self.get_by_field("item_id", item_id)
+    
+    async def get_by_items(self, item_ids: List[UUID]) -> Dict[UUID, ItemEmbedding]:
+        """Get embeddings for several items keyed by item ID"""
+        if not item_ids:
+            return {}
+        
+        result = await self.db.execute(
+            select(ItemEmbedding).where(ItemEmbedding.item_id.in_(item_ids))
+        )
+        return {row.item_id: row for row in result.scalars().all()}
+    
+    async def upsert(self, obj_in: ItemEmbeddingCreate) -> None:
+        """
+        Insert or replace the embeddings of an item.
+        
+        Args:
+            obj_in: Embedding data
+        """
+        values = obj_in.model_dump()
+        stmt = insert(ItemEmbedding).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ItemEmbedding.item_id],
+            set_={
+                "item_type": stmt.excluded.item_type,
+                "model_name": stmt.excluded.model_name,
+                "dim": stmt.excluded.dim,
+                "image_embedding": stmt.excluded.image_embedding,
+                "text_embedding": stmt.excluded.text_embedding,
+                "updated_at": datetime.utcnow(),
+            },
+        )
+        await self.db.execute(stmt)
+        await self.db.flush()
+    
+    async def iter_active_by_type(
+        self,
+        item_type: ItemType,
+        model_name: str,
+        chunk_size: int = 1000
+    ) -> AsyncIterator[List[ItemEmbedding]]:
+        """
+        Iterate over embeddings of active items of one type in ID order.
+        
+        Args:
+            item_type: Lost or found
+            model_name: Only embeddings produced by this model
+            chunk_size: Rows fetched per round trip
+            
+        Yields:
+            Lists of at most ``chunk_size`` embeddings
+        """
+        last_id: Optional[UUID] = None
+        while True:
+            stmt = (
+                select(ItemEmbedding)
+                .join(Item, Item.id == ItemEmbedding.item_id)
+                .where(
+                    and_(
+                        ItemEmbedding.item_type == item_type,
+                        ItemEmbedding.model_name == model_name,
+                        Item.status == ItemStatus.ACTIVE,
+                    )
+                )
+                .order_by(ItemEmbedding.id)
+                .limit(chunk_size)
+            )
+            if last_id is not None:
+                stmt = stmt.where(ItemEmbedding.id > last_id)
+            
+            result = await self.db.execute(stmt)
+            rows = list(result.scalars().all())
+            if not rows:
+                return
+            
+            yield rows
+            last_id = rows[-1].id
+            
+            # Keep the identity map from growing with the table
+            for row in rows:
+                if row in self.db:
+                    self.db.expunge(row)
@@ -1,12 +1,20 @@
-from typing import Optional, List
+from typing import Optional, List, AsyncIterator, Dict, Any, Tuple, Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
-from datetime import datetime, date
+from sqlalchemy import select, delete, and_, tuple_, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql import Select
+from datetime import datetime, date, timedelta
 from uuid import UUID
 
-from app.models.item import Item, ItemType, ItemStatus
+from app.config import settings
+from app.models.item import Item, ItemType, ItemStatus, SEARCH_CONFIG
+from app.models.item_block import ItemBlock
 from app.schemas.item import ItemCreate, ItemUpdate
 from app.repositories.base import BaseCRUD
+from app.services.features import date_bucket
+
+# Item fields that make up the blocking key (see ItemBlock)
+BLOCKING_FIELDS = {"type", "category", "date_lost_found", "status"}
 
 
 class ItemRepository(BaseCRUD[Item, ItemCreate, ItemUpdate]):
@@ -17,6 +25,44 @@ class ItemRepository(BaseCRUD[Item, ItemCreate, ItemUpdate]):
     def __init__(self, db: AsyncSession):
         super().__init__(Item, db)
     
+    async def create(self, obj_in: ItemCreate) -> Item:
+        """Create an item and its blocking index entry"""
+        item = await super().create(obj_in)
+        await self.sync_blocks([item])
+        return item
+    
+    async def update(self, id: UUID, obj_in: ItemUpdate | Dict[str, Any]) -> Optional[Item]:
+        """Update an item and keep its blocking index entry current"""
+        item = await super().update(id, obj_in)
+        if item is not None:
+            await self.sync_blocks([item])
+        return item
+    
+    async def bulk_create(self, objs_in: List[ItemCreate | Dict[str, Any]], chunk_size: Optional[int] = None) -> List[Item]:
+        """Create items in bulk together with their blocking index entries"""
+        items = await super().bulk_create(objs_in, chunk_size)
+        if items:
+            await self.sync_blocks(items)
+        return items
+    
+    async def bulk_update(self, updates: List[Dict[str, Any]], chunk_size: Optional[int] = None) -> int:
+        """Update items in bulk, refreshing blocking entries when a blocking field changed"""
+        count = await super().bulk_update(updates, chunk_size)
+        
+        blocked_ids = [
+            update_data['id'] for update_data in updates
+            if 'id' in update_data and BLOCKING_FIELDS.intersection(update_data)
+        ]
+        chunk_size = chunk_size or settings.DATABASE_BULK_CHUNK_SIZE
+        for start in range(0, len(blocked_ids), chunk_size):
+            result = await self.db.execute(
+                select(Item)
+                .where(Item.id.in_(blocked_ids[start:start + chunk_size]))
+                .execution_options(populate_existing=True)
+            )
+            await self.sync_blocks(list(result.scalars().all()))
+        return count
+    
     async def get_by_user(self, user_id: UUID, skip: int = 0, limit: int = 100) -> List[Item]:
         """Get all items posted by a user"""
         return await self.get_multi(skip=skip, limit=limit, user_id=user_id)
@@ -46,6 +92,7 @@ class ItemRepository(BaseCRUD[Item, ItemCreate, ItemUpdate]):
         date_from: Optional[date] = None,
         date_to: Optional[date] = None,
         location: Optional[str] = None,
+        fuzzy: bool = False,
         skip: int = 0,
         limit: int = 100
     ) -> List[Item]:
@@ -53,30 +100,91 @@ class ItemRepository(BaseCRUD[Item, ItemCreate, ItemUpdate]):
         Advanced search for items with multiple filters.
         
         Args:
-            query: Text search in title/description
+            skip: Pagination offset
+            limit: Max results
+            (filters as in ``search_statement``)
+            
+        Returns:
+            List of matching items
+        """
+        stmt = await self.search_statement(query, item_type, category, status, date_from, date_to, location, fuzzy)
+        result = await self.db.execute(stmt.offset(skip).limit(limit))
+        return list(result.scalars().all())
+    
+    async def search_items_page(
+        self,
+        query: Optional[str] = None,
+        item_type: Optional[ItemType] = None,
+        category: Optional[str] = None,
+        status: Optional[ItemStatus] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        location: Optional[str] = None,
+        fuzzy: bool = False,
+        skip: int = 0,
+        limit: int = 100
+    ) -> Tuple[List[Item], int, bool]:
+        """
+        Search page plus the total of the same filters in one round trip (see ``get_page``).
+        
+        Returns:
+            (items, total, whether the total is a planner estimate)
+        """
+        stmt = await self.search_statement(query, item_type, category, status, date_from, date_to, location, fuzzy)
+        return await self.get_page(stmt, skip=skip, limit=limit)
+    
+    async def search_statement(
+        self,
+        query: Optional[str] = None,
+        item_type: Optional[ItemType] = None,
+        category: Optional[str] = None,
+        status: Optional[ItemStatus] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        location: Optional[str] = None,
+        fuzzy: bool = False
+    ) -> Select:
+        """
+        Filtered and ranked item search query, without pagination.
+        
+        In fuzzy mode the query and location are matched against title and
+        location by trigram word similarity (pg_trgm, ``%>`` operator, GIN
+        indexed) with SEARCH_FUZZY_THRESHOLD as the cutoff, so misspellings
+        like "macbok" still find "MacBook Air"; results are ranked by
+        similarity.
+        
+        Args:
+            query: Web-search style query (quotes, OR, -word) on title/tags/description,
+                results ranked by relevance
             item_type: Filter by lost/found
             category: Filter by category
             status: Filter by status
             date_from: Filter by date range start
             date_to: Filter by date range end
             location: Filter by location
-            skip: Pagination offset
-            limit: Max results
+            fuzzy: Typo-tolerant matching instead of full-text search
             
         Returns:
-            List of matching items
+            Ordered select of matching items
         """
         stmt = select(Item)
+        order_by = [Item.created_at.desc()]
         
-        # Text search
-        if query:
-            stmt = stmt.where(
-                or_(
-                    Item.title.ilike(f"%{query}%"),
-                    Item.description.ilike(f"%{query}%")
-                )
+        if fuzzy and (query or location):
+            # Cutoff of the %> operator for this transaction
+            await self.db.execute(
+                select(func.set_config("pg_trgm.word_similarity_threshold", str(settings.SEARCH_FUZZY_THRESHOLD), True))
             )
         
+        if query and fuzzy:
+            stmt = stmt.where(Item.title.op("%>")(query))
+            order_by.insert(0, func.word_similarity(query, Item.title).desc())
+        elif query:
+            # Full-text search on the weighted title/tags/description vector (GIN indexed)
+            ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+            stmt = stmt.where(Item.search_vector.op("@@")(ts_query))
+            order_by.insert(0, func.ts_rank(Item.search_vector, ts_query).desc())
+        
         # Type filter
         if item_type:
             stmt = stmt.where(Item.type == item_type)
@@ -95,29 +203,48 @@ class ItemRepository(BaseCRUD[Item, ItemCreate, ItemUpdate]):
         if date_to:
             stmt = stmt.where(Item.date_lost_found <= date_to)
         
-        # Location filter
-        if location:
+        # Location filter (both forms use the trigram index)
+        if location and fuzzy:
+            stmt = stmt.where(Item.location_found.op("%>")(location))
+        elif location:
             stmt = stmt.where(Item.location_found.ilike(f"%{location}%"))
         
-        # Pagination
-        stmt = stmt.offset(skip).limit(limit).order_by(Item.created_at.desc())
-        
-        result = await self.db.execute(stmt)
-        return list(result.scalars().all())
+        return stmt.order_by(*order_by)
     
-    async def get_expired_items(self) -> List[Item]:
-        """Get all expired items that need cleanup"""
-        stmt = select(Item).where(
+    def _expired_statement(self, columns: Optional[Sequence[str]] = None) -> Select:
+        """Active items whose expiry date has passed"""
+        return self.select_columns(columns).where(
             and_(
                 Item.expires_at.isnot(None),
                 Item.expires_at <= datetime.utcnow(),
                 Item.status == ItemStatus.ACTIVE
             )
         )
-        
-        result = await self.db.execute(stmt)
+    
+    async def get_expired_items(self) -> List[Item]:
+        """Get all expired items that need cleanup"""
+        result = await self.db.execute(self._expired_statement())
         return list(result.scalars().all())
     
+    async def stream_expired_items(
+        self,
+        chunk_size: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[List[Item]]:
+        """
+        Stream expired items in fixed-size partitions from a server-side cursor.
+        
+        Args:
+            chunk_size: Items per partition (defaults to DATABASE_STREAM_CHUNK_SIZE)
+            columns: Optional projection; partitions are then plain rows
+            
+        Yields:
+            Lists of at most ``chunk_size`` items (or rows)
+        """
+        stmt = self._expired_statement(columns)
+        async for partition in self.stream_statement(stmt, chunk_size, scalars=columns is None):
+            yield partition
+    
     async def mark_as_claimed(self, item_id: UUID) -> Optional[Item]:
         """Mark item as claimed"""
         return await self.update(item_id, {"status": ItemStatus.CLAIMED})
@@ -137,3 +264,288 @@ class ItemRepository(BaseCRUD[Item, ItemCreate, ItemUpdate]):
         
         result = await self.db.execute(stmt)
         return list(result.scalars().all())
+    
+    async def get_active_categories(self) -> List[str]:
+        """Get distinct categories that have active items"""
+        stmt = select(Item.category).where(Item.status == ItemStatus.ACTIVE).distinct()
+        result = await self.db.execute(stmt)
+        return [row[0] for row in result.all()]
+    
+    async def iter_active_chunks(
+        self,
+        item_type: ItemType,
+        category: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        chunk_size: int = 1000,
+        columns: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[List[Item]]:
+        """
+        Iterate over active items in (date_lost_found, id) order.
+        
+        Uses keyset pagination so every chunk is an index seek, and detaches
+        each chunk from the session once consumed so memory stays bounded.
+        Unlike ``stream_statement`` every chunk is its own query, so callers
+        may commit between chunks.
+        With ``columns`` the chunks are plain rows of just those columns,
+        which never enter the session at all.
+        
+        Args:
+            item_type: Lost or found
+            category: Optional category filter
+            date_from: Optional lower bound on date_lost_found
+            date_to: Optional upper bound on date_lost_found
+            chunk_size: Items per chunk
+            columns: Optional projection; must include date_lost_found and id
+            
+        Yields:
+            Lists of at most ``chunk_size`` items (or rows)
+        """
+        stmt = self.select_columns(columns).where(
+            and_(Item.type == item_type, Item.status == ItemStatus.ACTIVE)
+        )
+        if category is not None:
+            stmt = stmt.where(Item.category == category)
+        if date_from is not None:
+            stmt = stmt.where(Item.date_lost_found >= date_from)
+        if date_to is not None:
+            stmt = stmt.where(Item.date_lost_found <= date_to)
+        async for items in self._iter_by_date(stmt, chunk_size, columns):
+            yield items
+    
+    async def _iter_by_date(
+        self,
+        stmt: Select,
+        chunk_size: int,
+        columns: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[List[Item]]:
+        """Keyset-paginate ``stmt`` over (date_lost_found, id), detaching consumed chunks"""
+        stmt = stmt.order_by(Item.date_lost_found, Item.id).limit(chunk_size)
+        
+        last_key = None
+        while True:
+            page = stmt
+            if last_key is not None:
+                page = page.where(tuple_(Item.date_lost_found, Item.id) > last_key)
+            
+            result = await self.db.execute(page)
+            items = self.fetch_rows(result, columns)
+            if not items:
+                return
+            
+            yield items
+            last_key = (items[-1].date_lost_found, items[-1].id)
+            
+            if columns is None:
+                for item in items:
+                    if item in self.db:
+                        self.db.expunge(item)
+    
+    async def iter_updated_since(
+        self,
+        since: Optional[datetime],
+        until: datetime,
+        chunk_size: int = 1000
+    ) -> AsyncIterator[List[Item]]:
+        """
+        Iterate over items (any status) with since < updated_at <= until.
+        
+        Keyset-paginated like ``iter_active_chunks``, so callers may commit
+        between chunks.
+        
+        Args:
+            since: Exclusive lower bound, None for no bound
+            until: Inclusive upper bound
+            chunk_size: Items per chunk
+            
+        Yields:
+            Lists of at most ``chunk_size`` items in (updated_at, id) order
+        """
+        stmt = select(Item).where(Item.updated_at <= until)
+        if since is not None:
+            stmt = stmt.where(Item.updated_at > since)
+        stmt = stmt.order_by(Item.updated_at, Item.id).limit(chunk_size)
+        
+        last_key = None
+        while True:
+            page = stmt
+            if last_key is not None:
+                page = page.where(tuple_(Item.updated_at, Item.id) > last_key)
+            
+            result = await self.db.execute(page)
+            items = list(result.scalars().all())
+            if not items:
+                return
+            
+            yield items
+            last_key = (items[-1].updated_at, items[-1].id)
+            
+            for item in items:
+                if item in self.db:
+                    self.db.expunge(item)
+
+    
+    async def sync_blocks(self, items: List[Item], chunk_size: Optional[int] = None) -> None:
+        """
+        Upsert blocking index entries of active items and drop the others.
+        
+        One statement per ``chunk_size`` rows keeps every statement well
+        under the 32767 bind parameters a PostgreSQL query may carry.
+        
+        Args:
+            items: Items whose type, category, date or status may have changed
+            chunk_size: Rows per statement (defaults to DATABASE_BULK_CHUNK_SIZE)
+        """
+        chunk_size = chunk_size or settings.DATABASE_BULK_CHUNK_SIZE
+        active = [item for item in items if item.status == ItemStatus.ACTIVE]
+        inactive_ids = [item.id for item in items if item.status != ItemStatus.ACTIVE]
+        
+        for start in range(0, len(inactive_ids), chunk_size):
+            await self.db.execute(
+                delete(ItemBlock).where(ItemBlock.item_id.in_(inactive_ids[start:start + chunk_size]))
+            )
+        
+        now = datetime.utcnow()
+        for start in range(0, len(active), chunk_size):
+            stmt = insert(ItemBlock).values([
+                {
+                    "item_id": item.id,
+                    "type": item.type,
+                    "category": item.category,
+                    "date_bucket": date_bucket(item.date_lost_found),
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for item in active[start:start + chunk_size]
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ItemBlock.item_id],
+                set_={
+                    "type": stmt.excluded.type,
+                    "category": stmt.excluded.category,
+                    "date_bucket": stmt.excluded.date_bucket,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            )
+            await self.db.execute(stmt)
+        
+        await self.db.flush()
+    
+    async def rebuild_blocks(self, chunk_size: int = 1000) -> int:
+        """
+        Rebuild the blocking index from the items table.
+        
+        Repairs entries missed by writes that bypassed the repository
+        (e.g. bulk status updates).
+        
+        Returns:
+            Number of indexed active items
+        """
+        await self.db.execute(
+            delete(ItemBlock).where(
+                ItemBlock.item_id.not_in(select(Item.id).where(Item.status == ItemStatus.ACTIVE))
+            )
+        )
+        
+        indexed = 0
+        for item_type in ItemType:
+            async for chunk in self.iter_active_chunks(item_type, chunk_size=chunk_size):
+                await self.sync_blocks(chunk)
+                indexed += len(chunk)
+        return indexed
+    
+    async def iter_block_candidates(
+        self,
+        item: Item,
+        window_days: Optional[int] = None,
+        chunk_size: int = 1000,
+        columns: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[List[Item]]:
+        """
+        Iterate over active opposite-type candidates for an item from the blocking index.
+        
+        Candidates share the item's category and fall within the date window
+        (bucket range seek on the blocking index, then the exact date bound).
+        The whole block is scanned in keyset chunks like ``iter_active_chunks``,
+        so no candidate is dropped and memory stays bounded by ``chunk_size``.
+        
+        Args:
+            item: Source item
+            window_days: Max days between dates (defaults to MATCHING_DATE_WINDOW_DAYS)
+            chunk_size: Candidates per chunk
+            columns: Optional projection; must include date_lost_found and id
+            
+        Yields:
+            Lists of at most ``chunk_size`` candidates in (date_lost_found, id) order
+        """
+        window = timedelta(days=window_days or settings.MATCHING_DATE_WINDOW_DAYS)
+        target_type = ItemType.FOUND if item.type == ItemType.LOST else ItemType.LOST
+        date_from = item.date_lost_found - window
+        date_to = item.date_lost_found + window
+        
+        stmt = (
+            self.select_columns(columns)
+            .join(ItemBlock, ItemBlock.item_id == Item.id)
+            .where(
+                and_(
+                    ItemBlock.type == target_type,
+                    ItemBlock.category == item.category,
+                    ItemBlock.date_bucket.between(date_bucket(date_from), date_bucket(date_to)),
+                    Item.date_lost_found.between(date_from, date_to),
+                    Item.status == ItemStatus.ACTIVE,
+                )
+            )
+        )
+        async for candidates in self._iter_by_date(stmt, chunk_size, columns):
+            yield candidates
+    
+    async def get_active_by_ids(
+        self,
+        item_ids: List[UUID],
+        item_type: ItemType,
+        columns: Optional[Sequence[str]] = None
+    ) -> List[Item]:
+        """
+        Active items of one type among the given IDs (e.g. ANN index hits).
+        
+        Args:
+            item_ids: Item UUIDs
+            item_type: Lost or found
+            columns: Optional projection; items are then plain rows
+            
+        Returns:
+            Matching items (or rows), in no particular order
+        """
+        if not item_ids:
+            return []
+        
+        result = await self.db.execute(
+            self.select_columns(columns).where(
+                and_(
+                    Item.id.in_(item_ids),
+                    Item.type == item_type,
+                    Item.status == ItemStatus.ACTIVE,
+                )
+            )
+        )
+        return self.fetch_rows(result, columns)
+    
+    async def has_unblocked_items(self) -> bool:
+        """
+        Whether any active item is missing from the blocking index.
+        
+        True after the index is first deployed (items created before it have
+        no entries) or after writes that bypassed ``sync_blocks``.
+        """
+        stmt = select(
+            select(Item.id)
+            .where(
+                and_(
+                    Item.status == ItemStatus.ACTIVE,
+                    ~select(ItemBlock.id).where(ItemBlock.item_id == Item.id).exists(),
+                )
+            )
+            .exists()
+        )
+        result = await self.db.execute(stmt)
+        return bool(result.scalar())
@@ -1,8 +1,12 @@
-from typing import List, Optional
+from typing import Iterable, List, Optional, Dict, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, delete, and_, or_, func, literal_column
+from sqlalchemy.dialects.postgresql import insert
+from datetime import datetime
 from uuid import UUID
 
+from app.config import settings
+from app.models.item import Item, ItemStatus
 from app.models.match import Match, MatchStatus
 from app.schemas.match import MatchUpdate
 from app.repositories.base import BaseCRUD
@@ -98,3 +102,176 @@ class MatchRepository(BaseCRUD[Match, MatchCreate, MatchUpdate]):
     async def reject_match(self, match_id: UUID) -> Optional[Match]:
         """Mark match as rejected"""
         return await self.update(match_id, {"status": MatchStatus.REJECTED})
+    
+    async def bulk_upsert(self, pairs: List[Tuple[UUID, UUID, float]], chunk_size: int = 2000) -> Dict[str, int]:
+        """
+        Create or refresh matches for many (lost, found) pairs at once.
+        
+        One ``INSERT ... ON CONFLICT DO UPDATE`` per ``chunk_size`` pairs on the
+        (lost_item_id, found_item_id) unique constraint. Existing matches keep
+        their status and are overwritten with the new score, even when it is
+        lower than the stored one: a score reflects the items as they are now,
+        so an edit that makes a pair less similar must lower it. (Earlier
+        versions only ever raised a stored score; that no longer holds.) The
+        highest score wins only among duplicates of a pair within one call.
+        Every written row gets a fresh ``updated_at``, so pairs that were not
+        re-emitted can be found with ``delete_stale_pending``.
+        
+        Args:
+            pairs: (lost_item_id, found_item_id, similarity_score) tuples;
+                duplicates within the batch keep their highest score
+            chunk_size: Pairs per statement (bounded by the bind parameter limit)
+            
+        Returns:
+            {"created": n, "updated": n}
+        """
+        # ON CONFLICT cannot touch the same row twice in one statement
+        scores: Dict[Tuple[UUID, UUID], float] = {}
+        for lost_id, found_id, score in pairs:
+            key = (lost_id, found_id)
+            scores[key] = max(score, scores.get(key, 0.0))
+        
+        counts = {"created": 0, "updated": 0}
+        rows = list(scores.items())
+        now = datetime.utcnow()
+        
+        for start in range(0, len(rows), chunk_size):
+            stmt = insert(Match).values([
+                {
+                    "lost_item_id": lost_id,
+                    "found_item_id": found_id,
+                    "similarity_score": score,
+                    "status": MatchStatus.PENDING,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for (lost_id, found_id), score in rows[start:start + chunk_size]
+            ])
+            stmt = stmt.on_conflict_do_update(
+                constraint="uq_matches_lost_found",
+                set_={
+                    "similarity_score": stmt.excluded.similarity_score,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            ).returning(
+                # xmax is 0 for freshly inserted rows and set for updated ones
+                literal_column("xmax = 0").label("inserted")
+            )
+            
+            result = await self.db.execute(stmt)
+            for (inserted,) in result.all():
+                counts["created" if inserted else "updated"] += 1
+        
+        await self.db.flush()
+        return counts
+    
+    async def delete_stale_pending(
+        self,
+        lost_item_ids: Iterable[UUID] = (),
+        found_item_ids: Iterable[UUID] = (),
+        before: Optional[datetime] = None
+    ) -> int:
+        """
+        Delete pending matches of rescored items that were not written since ``before``.
+        
+        After an item is rescored, its pairs that were re-emitted carry an
+        ``updated_at`` of at least ``before``; the rest fell below the
+        threshold or out of the top K, or the item is no longer active.
+        Accepted and rejected matches are kept.
+        
+        Args:
+            lost_item_ids: Rescored lost items
+            found_item_ids: Rescored found items
+            before: Start of the rescoring; None deletes all their pending matches
+            
+        Returns:
+            Number of deleted matches
+        """
+        deleted = 0
+        for column, item_ids in (
+            (Match.lost_item_id, list(lost_item_ids)),
+            (Match.found_item_id, list(found_item_ids)),
+        ):
+            for start in range(0, len(item_ids), settings.DATABASE_BULK_CHUNK_SIZE):
+                stmt = delete(Match).where(
+                    column.in_(item_ids[start:start + settings.DATABASE_BULK_CHUNK_SIZE]),
+                    Match.status == MatchStatus.PENDING,
+                )
+                if before is not None:
+                    stmt = stmt.where(Match.updated_at < before)
+                result = await self.db.execute(stmt.execution_options(synchronize_session=False))
+                deleted += result.rowcount
+        
+        await self.db.flush()
+        return deleted
+    
+    async def delete_inactive_pending(self) -> int:
+        """
+        Delete pending matches whose lost or found item is no longer active.
+        
+        Returns:
+            Number of deleted matches
+        """
+        inactive = select(Item.id).where(Item.status != ItemStatus.ACTIVE)
+        stmt = delete(Match).where(
+            Match.status == MatchStatus.PENDING,
+            or_(Match.lost_item_id.in_(inactive), Match.found_item_id.in_(inactive)),
+        ).execution_options(synchronize_session=False)
+        
+        result = await self.db.execute(stmt)
+        await self.db.flush()
+        return result.rowcount
+    
+    async def prune_to_top_k(
+        self,
+        lost_item_ids: Iterable[UUID] = (),
+        found_item_ids: Iterable[UUID] = (),
+        keep: int = 10
+    ) -> int:
+        """
+        Delete pending matches ranked below the top ``keep`` of their item.
+        
+        Matches are ranked by score per lost item and per found item (one
+        ``DELETE`` per side, ranking with ``row_number()``). Accepted and
+        rejected matches are never deleted, but they do take up a slot.
+        
+        Args:
+            lost_item_ids: Lost items whose matches to prune
+            found_item_ids: Found items whose matches to prune
+            keep: Matches retained per item
+            
+        Returns:
+            Number of deleted matches
+        """
+        pruned = 0
+        for column, item_ids in (
+            (Match.lost_item_id, list(lost_item_ids)),
+            (Match.found_item_id, list(found_item_ids)),
+        ):
+            if not item_ids:
+                continue
+            ranked = (
+                select(
+                    Match.id,
+                    Match.status,
+                    func.row_number().over(
+                        partition_by=column,
+                        order_by=(Match.similarity_score.desc(), Match.id),
+                    ).label("rank"),
+                )
+                .where(column.in_(item_ids))
+                .subquery()
+            )
+            stmt = delete(Match).where(
+                Match.id.in_(
+                    select(ranked.c.id).where(
+                        ranked.c.rank > keep,
+                        ranked.c.status == MatchStatus.PENDING,
+                    )
+                )
+            )
+            result = await self.db.execute(stmt)
+            pruned += result.rowcount
+        
+        await self.db.flush()
+        return pruned
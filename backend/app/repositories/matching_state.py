@@ -0,0 +1,76 @@
+from typing import Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from datetime import datetime
+from uuid import UUID
+
+from app.models.matching_state import MatchingCheckpoint, ItemFingerprint
+from app.repositories.base import BaseCRUD
+from pydantic import BaseModel
+
+
+class ItemFingerprintCreate(BaseModel):
+    """Schema for storing item fingerprints"""
+    item_id: UUID
+    fingerprint: str
+
+
+class MatchingStateRepository(BaseCRUD[ItemFingerprint, ItemFingerprintCreate, ItemFingerprintCreate]):
+    """
+    Bookkeeping for incremental matching: per-item feature fingerprints and
+    the high-water mark of the last run.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        super().__init__(ItemFingerprint, db)
+    
+    async def get_fingerprints(self, item_ids: List[UUID]) -> Dict[UUID, str]:
+        """Get stored fingerprints keyed by item ID"""
+        if not item_ids:
+            return {}
+        
+        result = await self.db.execute(
+            select(ItemFingerprint.item_id, ItemFingerprint.fingerprint)
+            .where(ItemFingerprint.item_id.in_(item_ids))
+        )
+        return {item_id: fingerprint for item_id, fingerprint in result.all()}
+    
+    async def save_fingerprints(self, fingerprints: Dict[UUID, str]) -> None:
+        """
+        Insert or replace fingerprints in one statement.
+        
+        Args:
+            fingerprints: Mapping of item ID to fingerprint
+        """
+        if not fingerprints:
+            return
+        
+        now = datetime.utcnow()
+        stmt = insert(ItemFingerprint).values([
+            {"item_id": item_id, "fingerprint": fingerprint, "scored_at": now}
+            for item_id, fingerprint in fingerprints.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ItemFingerprint.item_id],
+            set_={"fingerprint": stmt.excluded.fingerprint, "scored_at": stmt.excluded.scored_at},
+        )
+        await self.db.execute(stmt)
+        await self.db.flush()
+    
+    async def get_high_water_mark(self, name: str) -> Optional[datetime]:
+        """Get the high-water mark of a job, or None if it never ran"""
+        result = await self.db.execute(
+            select(MatchingCheckpoint.high_water_mark).where(MatchingCheckpoint.name == name)
+        )
+        return result.scalar_one_or_none()
+    
+    async def set_high_water_mark(self, name: str, value: datetime) -> None:
+        """Store the high-water mark of a job"""
+        stmt = insert(MatchingCheckpoint).values(name=name, high_water_mark=value)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[MatchingCheckpoint.name],
+            set_={"high_water_mark": stmt.excluded.high_water_mark, "updated_at": datetime.utcnow()},
+        )
+        await self.db.execute(stmt)
+        await self.db.flush()
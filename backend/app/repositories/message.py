@@ -1,6 +1,6 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy import select, and_, or_, func, case
 from datetime import datetime
 from uuid import UUID
 
@@ -31,6 +31,36 @@ class MessageRepository(BaseCRUD[Message, MessageCreate, MessageUpdate]):
         """Get all messages received by a user"""
         return await self.get_multi(skip=skip, limit=limit, receiver_id=receiver_id, order_by="-created_at")
     
+    async def get_by_receiver_cursor(
+        self,
+        receiver_id: UUID,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[Message], Optional[str]]:
+        """Get a page of messages received by a user, newest first, and the next page's cursor"""
+        return await self.get_multi_cursor(cursor=cursor, limit=limit, receiver_id=receiver_id)
+    
+    async def get_conversation_cursor(
+        self,
+        user1_id: UUID,
+        user2_id: UUID,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[Message], Optional[str]]:
+        """
+        Get a page of the conversation between two users, oldest first.
+        
+        Returns:
+            (messages, cursor of the next page or None on the last page)
+        """
+        stmt = select(Message).where(
+            or_(
+                and_(Message.sender_id == user1_id, Message.receiver_id == user2_id),
+                and_(Message.sender_id == user2_id, Message.receiver_id == user1_id)
+            )
+        )
+        return await self.get_cursor_page(stmt, cursor=cursor, limit=limit, descending=False)
+    
     async def get_conversation(
         self,
         user1_id: UUID,
@@ -150,48 +180,50 @@ class MessageRepository(BaseCRUD[Message, MessageCreate, MessageUpdate]):
         """
         from app.models.user import User
         
-        # Get all messages involving this user
-        stmt = select(Message).where(
-            or_(Message.sender_id == user_id, Message.receiver_id == user_id)
-        ).order_by(Message.created_at.desc())
-        
-        result = await self.db.execute(stmt)
-        all_messages = list(result.scalars().all())
-        
-        # Group by conversation partner
-        conversations_dict = {}
-        for msg in all_messages:
-            partner_id = msg.receiver_id if msg.sender_id == user_id else msg.sender_id
-            
-            if partner_id not in conversations_dict:
-                # Get user details
-                user_stmt = select(User).where(User.id == partner_id)
-                user_result = await self.db.execute(user_stmt)
-                partner = user_result.scalar_one_or_none()
-                
-                if partner:
-                    conversations_dict[partner_id] = {
-                        "user": {
-                            "id": str(partner.id),
-                            "full_name": partner.full_name,
-                            "email": partner.email,
-                            "avatar": getattr(partner, "avatar", None)
-                        },
-                        "last_message": msg.content,
-                        "last_message_at": msg.created_at.isoformat(),
-                        "unread_count": 0  # Will calculate below
-                    }
-        
-        # Calculate unread counts
-        for partner_id, conv in conversations_dict.items():
-            unread_stmt = select(func.count()).select_from(Message).where(
-                and_(
-                    Message.sender_id == partner_id,
-                    Message.receiver_id == user_id,
-                    Message.is_read == False
-                )
+        # One pass over the user's messages: per partner, the latest message
+        # (DISTINCT ON) and the unread count (window FILTER aggregate)
+        partner_id = case(
+            (Message.sender_id == user_id, Message.receiver_id),
+            else_=Message.sender_id,
+        )
+        unread = and_(Message.receiver_id == user_id, Message.is_read == False)
+        latest = (
+            select(
+                partner_id.label("partner_id"),
+                Message.content,
+                Message.created_at,
+                func.count().filter(unread).over(partition_by=partner_id).label("unread_count"),
             )
-            unread_result = await self.db.execute(unread_stmt)
-            conv["unread_count"] = unread_result.scalar() or 0
+            .where(or_(Message.sender_id == user_id, Message.receiver_id == user_id))
+            .distinct(partner_id)
+            .order_by(partner_id, Message.created_at.desc(), Message.id.desc())
+            .subquery()
+        )
+        stmt = (
+            select(
+                User.id,
+                User.full_name,
+                User.email,
+                latest.c.content,
+                latest.c.created_at,
+                latest.c.unread_count,
+            )
+            .join(latest, latest.c.partner_id == User.id)
+            .order_by(latest.c.created_at.desc())
+        )
         
-        return list(conversations_dict.values())
+        result = await self.db.execute(stmt)
+        return [
+            {
+                "user": {
+                    "id": str(row.id),
+                    "full_name": row.full_name,
+                    "email": row.email,
+                    "avatar": None  # users have no avatar column
+                },
+                "last_message": row.content,
+                "last_message_at": row.created_at.isoformat(),
+                "unread_count": row.unread_count
+            }
+            for row in result.all()
+        ]
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from uuid import UUID
@@ -34,6 +34,15 @@ class NotificationRepository(BaseCRUD[Notification, NotificationCreate, Notifica
         """Get all notifications for a user"""
         return await self.get_multi(skip=skip, limit=limit, user_id=user_id, order_by="-created_at")
     
+    async def get_by_user_cursor(
+        self,
+        user_id: UUID,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[Notification], Optional[str]]:
+        """Get a page of a user's notifications, newest first, and the next page's cursor"""
+        return await self.get_multi_cursor(cursor=cursor, limit=limit, user_id=user_id)
+    
     async def get_unread_notifications(self, user_id: UUID) -> List[Notification]:
         """Get all unread notifications for a user"""
         return await self.get_multi(user_id=user_id, is_read=False, order_by="-created_at")
@@ -98,17 +107,14 @@ class NotificationRepository(BaseCRUD[Notification, NotificationCreate, Notifica
         from datetime import timedelta
         cutoff_date = datetime.utcnow() - timedelta(days=days)
         
-        from sqlalchemy import select, delete
-        stmt = select(Notification.id).where(
+        # One set-based DELETE; no ids are loaded
+        from sqlalchemy import delete
+        stmt = delete(Notification).where(
             Notification.user_id == user_id,
             Notification.is_read == True,
             Notification.created_at < cutoff_date
-        )
+        ).execution_options(synchronize_session=False)
         
         result = await self.db.execute(stmt)
-        old_notification_ids = [row[0] for row in result.all()]
-        
-        if old_notification_ids:
-            return await self.bulk_delete(old_notification_ids)
-        
-        return 0
+        await self.db.flush()
+        return result.rowcount
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime, date
 from uuid import UUID
 from app.models.item import ItemType, ItemStatus
@@ -27,6 +27,7 @@ class ItemUpdate(BaseModel):
     category: Optional[str] = Field(None, min_length=2, max_length=100)
     location_found: Optional[str] = Field(None, max_length=255)
     tags: Optional[List[str]] = None
+    images: Optional[List[str]] = Field(None, max_items=10)
     status: Optional[ItemStatus] = None
 
 
@@ -57,9 +58,12 @@ class ItemList(BaseModel):
     """Paginated item list"""
     items: List[ItemResponse]
     total: int
-    page: int
+    page: Optional[int] = None  # None for cursor pages
     page_size: int
     total_pages: int
+    next_cursor: Optional[str] = None  # Pass as ``cursor`` to fetch the following page
+    total_is_estimate: bool = False  # total is a lower bound / estimate for very large result sets
+    facets: Optional[Dict[str, Dict[str, int]]] = None  # Hit counts per field value (search only)
 
 
 # Search schemas
@@ -71,5 +75,6 @@ class ItemSearch(BaseModel):
     date_from: Optional[date] = None
     date_to: Optional[date] = None
     location: Optional[str] = None
+    fuzzy: bool = False  # Typo-tolerant title/location matching
     page: int = Field(1, ge=1)
     page_size: int = Field(20, ge=1, le=100)
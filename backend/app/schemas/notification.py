@@ -25,8 +25,9 @@ class NotificationList(BaseModel):
     notifications: List[NotificationResponse]
     total: int
     unread_count: int
-    page: int
+    page: Optional[int] = None  # None for cursor pages
     page_size: int
+    next_cursor: Optional[str] = None  # Pass as ``cursor`` to fetch the following page
 
 
 class NotificationMarkRead(BaseModel):
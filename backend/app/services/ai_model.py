@@ -1,18 +1,31 @@
-from typing import Tuple, List, Optional
+from typing import Tuple, List, Optional, Dict
+import hashlib
+import logging
+import os
+import time
+from app.config import settings
+from app.services.inference_backends import create_backend
+from app.services.embedding_cache import content_key, image_embedding_cache
+from app.services.image_ingest import decode_image
+from app.services.model_host import ModelHostClient
 try:
-    from transformers import CLIPProcessor, CLIPModel
-    import torch
-    from PIL import Image
+    from transformers import CLIPProcessor
 except ImportError:
     CLIPProcessor = None
-    CLIPModel = None
-    torch = None
-    Image = None
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
 
 class AIModelService:
     _instance = None
     _model = None
     _processor = None
+    _load_failed_at: Optional[float] = None  # monotonic time of the last failed load
+    _label_sets: Dict[Tuple[str, ...], List[str]] = {}  # Registered label sets
+    _label_embeddings: Dict[str, "np.ndarray"] = {}  # Label embedding matrices by key
     
     def __new__(cls):
         if cls._instance is None:
@@ -20,17 +33,69 @@ class AIModelService:
         return cls._instance
     
     def load_model(self):
-        """Load CLIP model if not already loaded"""
-        if self._model is None and CLIPModel is not None:
-            print("Loading Shared CLIP Model...")
+        """
+        Load CLIP model on the configured inference backend if not already loaded.
+        
+        In remote mode only the processor is loaded here; the towers run in
+        the model host process (see app.services.model_host).
+        
+        A failed load is not retried for AI_MODEL_RETRY_SECONDS, so callers
+        checking ``model`` while the weights or the model host are unreachable
+        get None at once instead of another download or connect attempt.
+        Blocking: the API loads on the inference thread (see
+        ``InferenceQueue.model_available``).
+        """
+        if self._load_failed_at is not None:
+            if time.monotonic() - self._load_failed_at < settings.AI_MODEL_RETRY_SECONDS:
+                return
+        
+        if self._model is None and CLIPProcessor is not None:
+            if settings.AI_MODEL_HOST == "remote":
+                print(f"Connecting to CLIP model host at {settings.MODEL_HOST_SOCKET}...")
+            else:
+                print(f"Loading Shared CLIP Model ({settings.AI_INFERENCE_BACKEND} backend)...")
             try:
-                self._model = CLIPModel.from_pretrained("openai/clip-vit-base-patch32")
-                self._processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
+                if self._processor is None:
+                    self._processor = CLIPProcessor.from_pretrained(self.model_name)
+                if settings.AI_MODEL_HOST == "remote":
+                    self._model = ModelHostClient()
+                else:
+                    self._model = self._create_backend()
                 print("CLIP Model Loaded Successfully")
             except Exception as e:
                 print(f"Failed to load CLIP model: {e}")
                 self._model = None
-                self._processor = None
+                self._load_failed_at = time.monotonic()
+                return
+            self._load_failed_at = None
+            
+            # Label prompts never change: embed them once per model
+            for labels in list(self._label_sets.values()):
+                self.label_embeddings(labels)
+    
+    def _create_backend(self):
+        """Configured backend, falling back to fp32 torch if it cannot be created"""
+        try:
+            return create_backend(settings.AI_INFERENCE_BACKEND, self.model_name)
+        except Exception as e:
+            if settings.AI_INFERENCE_BACKEND == "torch":
+                raise
+            logger.error(f"Inference backend '{settings.AI_INFERENCE_BACKEND}' unavailable, using torch: {e}")
+            return create_backend("torch", self.model_name)
+    
+    @property
+    def model_name(self) -> str:
+        return settings.CLIP_MODEL_NAME
+    
+    @property
+    def backend_name(self) -> Optional[str]:
+        """Name of the loaded inference backend"""
+        return self._model.name if self._model is not None else None
+    
+    @property
+    def model_version(self) -> str:
+        """Identifies the embedding space: model plus inference backend"""
+        return f"{self.model_name}:{self.backend_name or settings.AI_INFERENCE_BACKEND}"
     
     @property
     def model(self):
@@ -49,45 +114,187 @@ class AIModelService:
         if not self.model: 
             return None
         
-        inputs = self.processor(images=image, return_tensors="pt")
-        with torch.no_grad():
-            outputs = self.model.get_image_features(**inputs)
-        return outputs
+        inputs = self.processor(images=image, return_tensors="np")
+        return self.model.image_features(inputs["pixel_values"])
         
     def get_text_features(self, texts: List[str]):
         """Get embeddings for a list of texts"""
         if not self.model: 
             return None
             
-        inputs = self.processor(text=texts, return_tensors="pt", padding=True)
-        with torch.no_grad():
-            outputs = self.model.get_text_features(**inputs)
-        return outputs
+        inputs = self.processor(text=texts, return_tensors="np", padding=True, truncation=True)
+        return self.model.text_features(inputs["input_ids"], inputs["attention_mask"])
 
-    def predict_labels(self, image, labels: List[str]) -> List[Tuple[str, float]]:
+    def embed_images(self, images: List):
         """
-        Zero-shot classification: Given an image and a list of labels, 
-        return sorted (label, score) tuples.
+        L2-normalized embeddings for a batch of images in one forward pass.
+        
+        Returns:
+            float32 array of shape (len(images), dim), or None if the model is unavailable
         """
-        if not self.model:
-            return []
-            
-        inputs = self.processor(text=labels, images=image, return_tensors="pt", padding=True)
+        outputs = self.get_image_features(images)
+        if outputs is None:
+            return None
+        return outputs / np.linalg.norm(outputs, axis=-1, keepdims=True)
+    
+    def embed_texts(self, texts: List[str]):
+        """
+        L2-normalized embeddings for a batch of texts in one forward pass.
+        
+        Returns:
+            float32 array of shape (len(texts), dim), or None if the model is unavailable
+        """
+        outputs = self.get_text_features(texts)
+        if outputs is None:
+            return None
+        return outputs / np.linalg.norm(outputs, axis=-1, keepdims=True)
+    
+    def embed_image_bytes(self, contents: List[bytes]) -> Optional[List]:
+        """
+        Normalized embeddings for encoded images, via the content-addressed cache.
         
-        with torch.no_grad():
-            outputs = self.model(**inputs)
+        Only images whose bytes were never embedded under the current model
+        version are decoded and run through the image tower (in one batch).
+        
+        Args:
+            contents: Raw image file contents
             
-        # success: logits_per_image is [1, num_labels]
-        logits_per_image = outputs.logits_per_image
-        probs = logits_per_image.softmax(dim=1) # softmax to get probabilities
+        Returns:
+            One float32 vector per input (None for undecodable images),
+            or None if the model is unavailable
+        """
+        if not self.model:
+            return None
         
-        # Convert to list
-        probs_list = probs[0].tolist()
+        keys = [content_key(data, self.model_version) for data in contents]
+        vectors = [image_embedding_cache.get(key) for key in keys]
         
-        # Zip with labels and sort
-        results = list(zip(labels, probs_list))
-        results.sort(key=lambda x: x[1], reverse=True)
+        missing, images = [], []
+        for i, vector in enumerate(vectors):
+            if vector is not None:
+                continue
+            try:
+                images.append(decode_image(contents[i]))
+                missing.append(i)
+            except Exception as e:
+                logger.warning(f"Could not decode image: {e}")
+        
+        if images:
+            embeddings = self.embed_images(images)
+            if embeddings is None:
+                return None
+            for i, vector in zip(missing, embeddings):
+                image_embedding_cache.set(keys[i], vector)
+                vectors[i] = vector
+        
+        return vectors
+    
+    @property
+    def logit_scale(self) -> float:
+        """CLIP temperature applied to cosine similarities"""
+        return self.model.logit_scale
+    
+    def rank_labels(self, image_embedding, label_embeddings, labels: List[str]) -> List[Tuple[str, float]]:
+        """
+        Zero-shot classification from precomputed embeddings.
+        
+        Equivalent to CLIP's ``logits_per_image`` followed by a softmax, but
+        without re-running either tower.
         
+        Args:
+            image_embedding: Normalized image embedding (dim,)
+            label_embeddings: Normalized label embeddings (len(labels), dim)
+            labels: Label names
+            
+        Returns:
+            (label, probability) tuples sorted by probability
+        """
+        logits = self.logit_scale * (label_embeddings @ image_embedding)
+        logits = logits - logits.max()
+        probs = np.exp(logits) / np.exp(logits).sum()
+        
+        results = list(zip(labels, probs.tolist()))
+        results.sort(key=lambda x: x[1], reverse=True)
         return results
 
+    def _label_key(self, labels: List[str]) -> str:
+        """Cache key for a label set under the current model and backend"""
+        key_parts = [self.model_name, self.backend_name or settings.AI_INFERENCE_BACKEND, *labels]
+        digest = hashlib.sha256("\n".join(key_parts).encode()).hexdigest()[:16]
+        model_slug = self.model_name.replace("/", "--")
+        return f"{model_slug}-{digest}"
+    
+    def register_labels(self, labels: List[str]) -> None:
+        """
+        Register a label set whose embeddings are precomputed when the model loads.
+        
+        Args:
+            labels: Label names used for zero-shot classification
+        """
+        # Keyed by the labels themselves: the cache key depends on the backend,
+        # which is only known once the model has loaded
+        self._label_sets[tuple(labels)] = list(labels)
+        if self._model is not None:
+            self.label_embeddings(labels)
+    
+    def _label_path(self, key: str) -> str:
+        return os.path.join(settings.MODEL_CACHE_DIR, "label_embeddings", f"{key}.npy")
+    
+    def cached_label_embeddings(self, labels: List[str]):
+        """
+        Label embeddings from memory or the on-disk cache, without running the model.
+        
+        Returns:
+            float32 array of shape (len(labels), dim), or None on a miss
+        """
+        key = self._label_key(labels)
+        cached = self._label_embeddings.get(key)
+        if cached is None:
+            path = self._label_path(key)
+            if not os.path.exists(path):
+                return None
+            cached = self._label_embeddings[key] = np.load(path)
+        return cached
+    
+    def store_label_embeddings(self, labels: List[str], embeddings) -> None:
+        """Keep computed label embeddings in memory and on disk under MODEL_CACHE_DIR"""
+        key = self._label_key(labels)
+        path = self._label_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, embeddings)
+        os.replace(tmp_path, path)
+        self._label_embeddings[key] = embeddings
+    
+    def label_embeddings(self, labels: List[str]):
+        """
+        Normalized text embeddings for a label set.
+        
+        Looked up in memory, then on disk under MODEL_CACHE_DIR, and only
+        computed with the text tower on a miss. Blocking; async callers use
+        ``inference_queue.label_embeddings``.
+        
+        Returns:
+            float32 array of shape (len(labels), dim), or None if the model is unavailable
+        """
+        embeddings = self.cached_label_embeddings(labels)
+        if embeddings is None:
+            embeddings = self.embed_texts(labels)
+            if embeddings is None:
+                return None
+            self.store_label_embeddings(labels, embeddings)
+        return embeddings
+    
+    def predict_labels(self, image, labels: List[str]) -> List[Tuple[str, float]]:
+        """
+        Zero-shot classification: Given an image and a list of labels, 
+        return sorted (label, score) tuples.
+        """
+        if not self.model:
+            return []
+        
+        image_embedding = self.embed_images([image])[0]
+        return self.rank_labels(image_embedding, self.label_embeddings(labels), labels)
+
 ai_service = AIModelService()
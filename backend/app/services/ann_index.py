@@ -0,0 +1,216 @@
+"""
+IVF (inverted file) approximate nearest-neighbour index over item embeddings.
+
+Vectors are clustered with spherical k-means; each query only scans the
+``nprobe`` clusters whose centroids are closest to it, so lookups are
+sub-linear in the number of indexed items. Indexes are stored as plain
+``.npy`` files in a directory and memory-mapped on load, so every process on
+a node shares the same pages.
+
+Usage:
+    index = IVFIndex.build(vectors, ids)
+    index.save("/var/lib/lostfound/index/found")
+    index = IVFIndex.load("/var/lib/lostfound/index/found")
+    hits = index.search(query_vector, k=20)   # [(id, cosine), ...]
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class IVFIndex:
+    """
+    Inverted-file index for L2-normalized vectors (inner product = cosine).
+
+    Vectors are stored grouped by cluster: rows ``offsets[c]:offsets[c + 1]``
+    of ``vectors``/``ids`` belong to cluster ``c``.
+    """
+
+    def __init__(self, centroids, vectors, ids, offsets, nprobe: int = 8):
+        self.centroids = centroids
+        self.vectors = vectors
+        self.ids = ids
+        self.offsets = offsets
+        self.nprobe = nprobe
+
+    def __len__(self) -> int:
+        return int(self.vectors.shape[0])
+
+    @property
+    def dim(self) -> int:
+        return int(self.centroids.shape[1])
+
+    @classmethod
+    def build(
+        cls,
+        vectors,
+        ids: Sequence[str],
+        n_lists: Optional[int] = None,
+        n_iter: int = 15,
+        nprobe: int = 8,
+        seed: int = 0
+    ) -> "IVFIndex":
+        """
+        Build an index from a matrix of normalized vectors.
+
+        Args:
+            vectors: Array of shape (n, dim)
+            ids: Identifier for each row
+            n_lists: Number of clusters (defaults to ~sqrt(n))
+            n_iter: k-means iterations
+            nprobe: Clusters scanned per query
+            seed: Random seed for centroid initialisation
+
+        Returns:
+            Built index
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        ids = np.asarray(ids, dtype="U36")
+        n = vectors.shape[0]
+        if n == 0:
+            dim = vectors.shape[1] if vectors.ndim == 2 else 0
+            return cls(
+                np.zeros((0, dim), dtype=np.float32),
+                vectors.reshape(0, dim),
+                ids,
+                np.zeros(1, dtype=np.int64),
+                nprobe,
+            )
+
+        n_lists = max(1, min(n_lists or int(np.sqrt(n)), n))
+        centroids = _spherical_kmeans(vectors, n_lists, n_iter, seed)
+        assignments = _assign(vectors, centroids)
+
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=n_lists)
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        return cls(centroids, vectors[order], ids[order], offsets, nprobe)
+
+    def search(self, query, k: int = 10, nprobe: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Find the ``k`` nearest vectors to ``query``.
+
+        Args:
+            query: Normalized vector of shape (dim,)
+            k: Number of results
+            nprobe: Override the number of clusters scanned
+
+        Returns:
+            (id, cosine similarity) pairs, best first
+        """
+        if len(self) == 0 or k <= 0:
+            return []
+
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        nprobe = min(nprobe or self.nprobe, self.centroids.shape[0])
+
+        centroid_scores = self.centroids @ query
+        probes = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+
+        rows = np.concatenate([
+            np.arange(self.offsets[c], self.offsets[c + 1]) for c in probes
+        ])
+        if rows.size == 0:
+            return []
+
+        scores = self.vectors[rows] @ query
+        k = min(k, rows.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [(str(self.ids[rows[i]]), float(scores[i])) for i in top]
+
+    def save(self, path: str) -> None:
+        """
+        Persist the index to a directory, replacing any previous version atomically.
+
+        Args:
+            path: Target directory
+        """
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=".ivf-", dir=parent)
+
+        np.save(os.path.join(tmp_dir, "centroids.npy"), self.centroids)
+        np.save(os.path.join(tmp_dir, "vectors.npy"), self.vectors)
+        np.save(os.path.join(tmp_dir, "ids.npy"), self.ids)
+        np.save(os.path.join(tmp_dir, "offsets.npy"), self.offsets)
+        with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+            json.dump({"nprobe": self.nprobe, "size": len(self), "dim": self.dim}, f)
+
+        # Swap directories so readers never see a half-written index
+        old_dir = None
+        if os.path.exists(path):
+            old_dir = tempfile.mkdtemp(prefix=".ivf-old-", dir=parent)
+            os.rmdir(old_dir)
+            os.replace(path, old_dir)
+        os.replace(tmp_dir, path)
+        if old_dir:
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path: str) -> "IVFIndex":
+        """
+        Load an index saved with :meth:`save` (vectors are memory-mapped).
+
+        Args:
+            path: Index directory
+
+        Returns:
+            Loaded index
+        """
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+
+        return cls(
+            centroids=np.load(os.path.join(path, "centroids.npy")),
+            vectors=np.load(os.path.join(path, "vectors.npy"), mmap_mode="r"),
+            ids=np.load(os.path.join(path, "ids.npy")),
+            offsets=np.load(os.path.join(path, "offsets.npy")),
+            nprobe=meta.get("nprobe", 8),
+        )
+
+
+def _assign(vectors, centroids):
+    """Index of the closest centroid for every vector, computed in blocks"""
+    assignments = np.empty(vectors.shape[0], dtype=np.int64)
+    block = 8192
+    for start in range(0, vectors.shape[0], block):
+        chunk = vectors[start:start + block]
+        assignments[start:start + block] = np.argmax(chunk @ centroids.T, axis=1)
+    return assignments
+
+
+def _spherical_kmeans(vectors, n_clusters: int, n_iter: int, seed: int):
+    """k-means on the unit sphere (cosine distance)"""
+    rng = np.random.default_rng(seed)
+
+    # Train on a sample: centroid quality saturates well below the full set
+    sample_size = min(vectors.shape[0], max(n_clusters * 256, 10000))
+    sample = vectors[rng.choice(vectors.shape[0], sample_size, replace=False)]
+
+    centroids = sample[rng.choice(sample_size, n_clusters, replace=False)].copy()
+    for _ in range(n_iter):
+        assignments = _assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        empty = norms[:, 0] == 0
+
+        # Re-seed empty clusters with random points
+        if empty.any():
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()), replace=False)]
+            norms[empty] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+
+    return centroids
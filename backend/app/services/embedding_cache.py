@@ -0,0 +1,150 @@
+"""
+Content-addressed cache for CLIP image embeddings.
+
+Keys are the SHA-256 of the raw image bytes plus the model version, so the
+same photo (including a re-upload under a new URL) is embedded once per
+model. Lookups go through a per-process LRU first, then a shared tier chosen
+by ``EMBEDDING_CACHE_BACKEND``:
+
+- ``redis``: shared by every API and worker process (REDIS_CACHE_DB)
+- ``disk``: ``.npy`` files under ``MODEL_CACHE_DIR/image_embeddings``
+- ``memory``: LRU only
+
+Shared-tier failures are logged and treated as misses; the cache never makes
+an embedding request fail.
+"""
+
+from collections import OrderedDict
+from typing import Optional
+import hashlib
+import logging
+import os
+import threading
+
+from app.config import settings
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+
+def content_key(data: bytes, model_version: str) -> str:
+    """Cache key for image bytes under a model version"""
+    return f"{model_version}:{hashlib.sha256(data).hexdigest()}"
+
+
+class LRUTier:
+    """Thread-safe in-memory LRU of embeddings"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            vector = self._items.get(key)
+            if vector is not None:
+                self._items.move_to_end(key)
+            return vector
+
+    def set(self, key: str, vector) -> None:
+        with self._lock:
+            self._items[key] = vector
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+
+class RedisTier:
+    """Embeddings as raw float32 bytes in Redis with a TTL"""
+
+    def __init__(self, ttl: int):
+        import redis
+
+        self.ttl = ttl
+        self._client = redis.Redis.from_url(settings.REDIS_URL, db=settings.REDIS_CACHE_DB)
+
+    def get(self, key: str):
+        data = self._client.get(f"emb:{key}")
+        return np.frombuffer(data, dtype=np.float32) if data else None
+
+    def set(self, key: str, vector) -> None:
+        self._client.set(f"emb:{key}", np.asarray(vector, dtype=np.float32).tobytes(), ex=self.ttl)
+
+
+class DiskTier:
+    """Embeddings as .npy files fanned out by hash prefix"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        model_version, digest = key.rsplit(":", 1)
+        model_slug = model_version.replace("/", "--").replace(":", "-")
+        return os.path.join(self.root, model_slug, digest[:2], f"{digest}.npy")
+
+    def get(self, key: str):
+        path = self._path(key)
+        return np.load(path) if os.path.exists(path) else None
+
+    def set(self, key: str, vector) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.asarray(vector, dtype=np.float32))
+        os.replace(tmp_path, path)
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache: process LRU in front of a shared tier"""
+
+    def __init__(self, backend: Optional[str] = None):
+        self.memory = LRUTier(settings.EMBEDDING_CACHE_SIZE)
+        self.backend = backend or settings.EMBEDDING_CACHE_BACKEND
+        self._shared = None
+        self._shared_lock = threading.Lock()
+
+    @property
+    def shared(self):
+        """Shared tier, created on first use"""
+        if self._shared is None and self.backend != "memory":
+            with self._shared_lock:
+                if self._shared is None:
+                    if self.backend == "redis":
+                        self._shared = RedisTier(settings.EMBEDDING_CACHE_TTL)
+                    else:
+                        self._shared = DiskTier(os.path.join(settings.MODEL_CACHE_DIR, "image_embeddings"))
+        return self._shared
+
+    def get(self, key: str):
+        """Cached embedding or None"""
+        vector = self.memory.get(key)
+        if vector is not None:
+            return vector
+
+        try:
+            vector = self.shared.get(key) if self.shared is not None else None
+        except Exception as e:
+            logger.warning(f"Embedding cache read failed: {e}")
+            return None
+
+        if vector is not None:
+            self.memory.set(key, vector)
+        return vector
+
+    def set(self, key: str, vector) -> None:
+        """Store an embedding in both tiers"""
+        self.memory.set(key, vector)
+        try:
+            if self.shared is not None:
+                self.shared.set(key, vector)
+        except Exception as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+
+
+image_embedding_cache = EmbeddingCache()
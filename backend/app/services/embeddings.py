@@ -0,0 +1,265 @@
+"""
+Per-item CLIP embedding store and opposite-type ANN lookup.
+
+Embeddings are computed once when an item is created or edited and persisted
+in ``item_embeddings``. A periodic job builds one IVF index per item type from
+the stored vectors; matching then asks the index for the top-k items of the
+opposite type instead of running CLIP on every candidate pair.
+"""
+
+from typing import Any, List, Optional, Tuple
+from uuid import UUID
+import logging
+import os
+
+from app.config import settings
+from app.models.item import Item, ItemType
+from app.repositories.embedding import ItemEmbeddingRepository, ItemEmbeddingCreate
+from app.services.ai_model import ai_service
+from app.services.ann_index import IVFIndex
+from app.services.image_loader import image_loader
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+
+def encode_vector(vector) -> Optional[bytes]:
+    """Serialize a vector as float32 bytes"""
+    if vector is None:
+        return None
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def decode_vector(data: Optional[bytes]):
+    """Deserialize float32 bytes produced by :func:`encode_vector`"""
+    if data is None:
+        return None
+    return np.frombuffer(data, dtype=np.float32)
+
+
+def normalize(vector):
+    """L2-normalize a vector (zero vectors are returned unchanged)"""
+    vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+def combined_vector(image_vector, text_vector):
+    """
+    Single vector used for ANN search.
+
+    CLIP puts images and text in the same space, so the normalized mean of the
+    two is a reasonable joint representation of the item.
+    """
+    parts = [v for v in (image_vector, text_vector) if v is not None]
+    if not parts:
+        return None
+    return normalize(np.mean(parts, axis=0))
+
+
+def item_text(item: Any) -> str:
+    """Text fed to the CLIP text tower for an item"""
+    if isinstance(item, dict):
+        title, description = item.get("title", ""), item.get("description", "")
+    else:
+        title, description = item.title, item.description
+    return f"{title or ''}. {description or ''}".strip(". ")
+
+
+async def compute_items_vectors(items: List[Any]) -> List[Tuple[Optional["np.ndarray"], Optional["np.ndarray"]]]:
+    """
+    Run CLIP on each item's first image and its title/description.
+
+    Images are fetched concurrently through the pooled image loader and
+    embedded via the content-addressed cache, so a photo that was already
+    embedded (for any item) is not run through CLIP again. Texts are embedded
+    in one batch.
+
+    Args:
+        items: Item ORM objects or dicts
+
+    Returns:
+        (image vector or None, text vector or None) per item, L2-normalized
+    """
+    if np is None or not items or not ai_service.model:
+        return [(None, None) for _ in items]
+
+    image_urls = []
+    for item in items:
+        images = item.get("images") if isinstance(item, dict) else item.images
+        image_urls.append(images[0] if images else None)
+
+    image_vectors: List[Optional["np.ndarray"]] = [None] * len(items)
+    with_images = [i for i, url in enumerate(image_urls) if url]
+    contents = await image_loader.fetch_many([image_urls[i] for i in with_images])
+    fetched = [(i, data) for i, data in zip(with_images, contents) if data is not None]
+    if fetched:
+        vectors = ai_service.embed_image_bytes([data for _, data in fetched])
+        if vectors is not None:
+            for (i, _), vector in zip(fetched, vectors):
+                image_vectors[i] = vector
+
+    text_vectors: List[Optional["np.ndarray"]] = [None] * len(items)
+    texts = [(i, item_text(item)) for i, item in enumerate(items)]
+    texts = [(i, text) for i, text in texts if text]
+    if texts:
+        vectors = ai_service.embed_texts([text for _, text in texts])
+        if vectors is not None:
+            for (i, _), vector in zip(texts, vectors):
+                text_vectors[i] = vector
+
+    return list(zip(image_vectors, text_vectors))
+
+
+async def compute_item_vectors(item: Any) -> Tuple[Optional["np.ndarray"], Optional["np.ndarray"]]:
+    """Single-item version of :func:`compute_items_vectors`"""
+    return (await compute_items_vectors([item]))[0]
+
+
+def index_path(item_type: ItemType) -> str:
+    """Directory holding the ANN index for one item type"""
+    return os.path.join(settings.EMBEDDING_INDEX_DIR, ItemType(item_type).value)
+
+
+class EmbeddingIndex:
+    """
+    Process-local cache of the on-disk per-type IVF indexes.
+
+    Indexes are reloaded when the files on disk are newer than the cached copy,
+    so workers pick up rebuilds without restarting.
+    """
+
+    _indexes = {}
+
+    @classmethod
+    def get(cls, item_type: ItemType) -> Optional[IVFIndex]:
+        """Get the index for an item type, or None if it has not been built yet"""
+        path = index_path(item_type)
+        meta_path = os.path.join(path, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+
+        mtime = os.path.getmtime(meta_path)
+        cached = cls._indexes.get(path)
+        if cached is None or cached[0] != mtime:
+            index = IVFIndex.load(path)
+            index.nprobe = settings.EMBEDDING_INDEX_NPROBE
+            cls._indexes[path] = (mtime, index)
+        return cls._indexes[path][1]
+
+    @classmethod
+    def search_opposite(
+        cls,
+        item_type: ItemType,
+        vector,
+        k: Optional[int] = None
+    ) -> List[Tuple[UUID, float]]:
+        """
+        Top-k items of the opposite type for a query vector.
+
+        Args:
+            item_type: Type of the query item
+            vector: Query vector (see :func:`combined_vector`)
+            k: Number of results (defaults to EMBEDDING_INDEX_TOP_K)
+
+        Returns:
+            (item_id, cosine similarity) pairs, best first
+        """
+        target_type = ItemType.FOUND if item_type == ItemType.LOST else ItemType.LOST
+        index = cls.get(target_type)
+        if index is None or vector is None:
+            return []
+
+        hits = index.search(vector, k=k or settings.EMBEDDING_INDEX_TOP_K)
+        return [(UUID(item_id), score) for item_id, score in hits]
+
+
+class EmbeddingService:
+    """
+    Computes, stores and looks up item embeddings.
+    """
+
+    def __init__(self, embedding_repo: ItemEmbeddingRepository):
+        self.embedding_repo = embedding_repo
+
+    async def refresh_item(self, item: Item) -> bool:
+        """
+        Compute and persist embeddings for an item.
+
+        Args:
+            item: Item to embed
+
+        Returns:
+            True if embeddings were stored, False if the model is unavailable
+        """
+        image_vector, text_vector = await compute_item_vectors(item)
+        if image_vector is None and text_vector is None:
+            return False
+
+        dim = (image_vector if image_vector is not None else text_vector).shape[0]
+        await self.embedding_repo.upsert(ItemEmbeddingCreate(
+            item_id=item.id,
+            item_type=item.type,
+            model_name=ai_service.model_name,
+            dim=dim,
+            image_embedding=encode_vector(image_vector),
+            text_embedding=encode_vector(text_vector),
+        ))
+        return True
+
+    async def get_vectors(self, item_id: UUID) -> Tuple[Optional["np.ndarray"], Optional["np.ndarray"]]:
+        """
+        Stored (image, text) vectors of an item for the current model.
+
+        Returns:
+            (None, None) when nothing is stored
+        """
+        row = await self.embedding_repo.get_by_item(item_id)
+        if row is None or row.model_name != ai_service.model_name:
+            return None, None
+        return decode_vector(row.image_embedding), decode_vector(row.text_embedding)
+
+    async def find_candidates(self, item: Item, k: Optional[int] = None) -> List[Tuple[UUID, float]]:
+        """
+        Nearest opposite-type items for an item via the ANN index.
+
+        Args:
+            item: Query item (must already have stored embeddings)
+            k: Number of results
+
+        Returns:
+            (item_id, cosine similarity) pairs, best first
+        """
+        image_vector, text_vector = await self.get_vectors(item.id)
+        return EmbeddingIndex.search_opposite(item.type, combined_vector(image_vector, text_vector), k)
+
+    async def rebuild_index(self, item_type: ItemType) -> int:
+        """
+        Rebuild and persist the ANN index for one item type.
+
+        Args:
+            item_type: Lost or found
+
+        Returns:
+            Number of indexed items
+        """
+        ids: List[str] = []
+        vectors = []
+        async for rows in self.embedding_repo.iter_active_by_type(item_type, ai_service.model_name):
+            for row in rows:
+                vector = combined_vector(decode_vector(row.image_embedding), decode_vector(row.text_embedding))
+                if vector is not None:
+                    ids.append(str(row.item_id))
+                    vectors.append(vector)
+
+        dim = vectors[0].shape[0] if vectors else 0
+        matrix = np.vstack(vectors) if vectors else np.zeros((0, dim), dtype=np.float32)
+
+        index = IVFIndex.build(matrix, ids, nprobe=settings.EMBEDDING_INDEX_NPROBE)
+        index.save(index_path(item_type))
+        logger.info(f"Rebuilt {ItemType(item_type).value} embedding index with {len(index)} items")
+        return len(index)
@@ -0,0 +1,137 @@
+"""
+Normalized per-item features used by match scoring.
+
+- Dates become day ordinals, so proximity is a subtraction.
+- Free-text locations are resolved to canonical campus location ids through
+  an alias gazetteer ("central lib", "library 2nd floor" -> ``library``), so
+  two spellings of the same place compare equal instead of by string overlap.
+- Dates also map to fixed-width buckets; together with type and category
+  these form the blocking key used to pre-filter match candidates (see
+  ``ItemBlock``).
+- Fusion weights come from settings (``MATCHING_WEIGHT_*``).
+
+Scoring code turns these into arrays once per item (see
+``app.services.scoring``); pair scores are then plain array arithmetic.
+"""
+
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+import math
+import re
+
+from app.config import settings
+
+
+# Canonical campus locations and the ways people write them. Aliases are
+# matched as whole words after lowercasing and stripping punctuation. The
+# first place mentioned wins, taking the longest alias at that position
+# ("library cafe" -> cafeteria, "lab 3 room" -> lab), except that GENERIC_ALIASES
+# only count when nothing more specific is mentioned ("gym entrance" -> gym).
+CAMPUS_LOCATIONS: Dict[str, List[str]] = {
+    "library": ["library", "lib", "central library", "reading room", "reading hall", "study hall"],
+    "cafeteria": ["cafeteria", "canteen", "cafe", "library cafe", "food court", "mess", "dining hall", "dining"],
+    "gym": ["gym", "gymnasium", "fitness center", "fitness centre", "weight room"],
+    "sports_ground": ["sports ground", "playground", "football ground", "cricket ground", "field", "track", "stadium", "basketball court", "tennis court", "court"],
+    "auditorium": ["auditorium", "audi", "seminar hall", "convocation hall", "main hall"],
+    "admin_block": ["admin block", "administration", "admin building", "admin office", "office", "registrar"],
+    "hostel": ["hostel", "dorm", "dormitory", "residence hall", "boys hostel", "girls hostel"],
+    "lab": ["lab", "laboratory", "computer lab", "physics lab", "chemistry lab", "workshop"],
+    "classroom": ["classroom", "class room", "lecture hall", "lecture theatre", "lecture theater", "room"],
+    "parking": ["parking", "parking lot", "car park", "bike stand", "cycle stand", "garage"],
+    "main_gate": ["main gate", "gate", "entrance", "security", "security office", "reception"],
+    "bus_stop": ["bus stop", "bus stand", "shuttle stop", "shuttle"],
+    "medical_center": ["medical center", "medical centre", "health center", "health centre", "clinic", "infirmary"],
+    "bookstore": ["bookstore", "book store", "stationery", "xerox", "photocopy", "print shop"],
+}
+
+# Words that often qualify a more specific place rather than name one
+GENERIC_ALIASES = {"room", "office", "entrance", "reception", "security", "gate", "field", "court", "track"}
+
+# Stable integer ids for array features; -1 means unknown
+LOCATION_IDS: Dict[str, int] = {name: i for i, name in enumerate(sorted(CAMPUS_LOCATIONS))}
+UNKNOWN_LOCATION = -1
+
+_ALIASES = sorted(
+    ((alias, name) for name, aliases in CAMPUS_LOCATIONS.items() for alias in aliases),
+    key=lambda pair: len(pair[0]),
+    reverse=True,
+)
+_ALIAS_PATTERN = re.compile(r"\b(" + "|".join(re.escape(alias) for alias, _ in _ALIASES) + r")\b")
+_ALIAS_TO_LOCATION = dict(_ALIASES)
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Lowercase, replace punctuation with spaces and collapse whitespace"""
+    return " ".join(re.sub(r"[^\w\s]", " ", (text or "").lower()).split())
+
+
+def canonical_location(text: Optional[str]) -> Optional[str]:
+    """
+    Resolve a free-text location to a canonical campus location.
+
+    Args:
+        text: Location as entered by the user
+
+    Returns:
+        Canonical location name, or None if no alias matches
+    """
+    # findall scans left to right; alternatives are longest first, so each
+    # match is the longest alias starting at its position
+    matches = _ALIAS_PATTERN.findall(normalize_text(text))
+    if not matches:
+        return None
+    specific = [alias for alias in matches if alias not in GENERIC_ALIASES]
+    return _ALIAS_TO_LOCATION[(specific or matches)[0]]
+
+
+def location_id(text: Optional[str]) -> int:
+    """Integer id of the canonical location, or UNKNOWN_LOCATION"""
+    name = canonical_location(text)
+    return LOCATION_IDS[name] if name else UNKNOWN_LOCATION
+
+
+def date_bucket(value: Any) -> int:
+    """Blocking bucket of a date (MATCHING_DATE_BUCKET_DAYS-day periods)"""
+    return int(date_ordinal(value)) // settings.MATCHING_DATE_BUCKET_DAYS
+
+
+def date_ordinal(value: Any) -> float:
+    """Day ordinal of a date, datetime or ISO string (NaN if missing)"""
+    if value is None or value == "":
+        return math.nan
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    if isinstance(value, datetime):
+        value = value.date()
+    return float(value.toordinal())
+
+
+def date_proximity(first: Any, second: Any, window_days: Optional[int] = None) -> float:
+    """
+    Linear date proximity: 1.0 on the same day, 0.0 at ``window_days`` apart.
+
+    Args:
+        first: Date of one item
+        second: Date of the other item
+        window_days: Distance at which proximity reaches zero
+            (defaults to MATCHING_DATE_WINDOW_DAYS)
+
+    Returns:
+        Proximity in [0, 1]; 0.0 if either date is missing
+    """
+    window_days = window_days or settings.MATCHING_DATE_WINDOW_DAYS
+    delta = abs(date_ordinal(first) - date_ordinal(second))
+    if math.isnan(delta):
+        return 0.0
+    return max(0.0, 1.0 - delta / window_days)
+
+
+def fusion_weights() -> Dict[str, float]:
+    """Per-signal weights of the match score from settings"""
+    return {
+        "title": settings.MATCHING_WEIGHT_TITLE,
+        "description": settings.MATCHING_WEIGHT_DESCRIPTION,
+        "tags": settings.MATCHING_WEIGHT_TAGS,
+        "location": settings.MATCHING_WEIGHT_LOCATION,
+        "date": settings.MATCHING_WEIGHT_DATE,
+    }
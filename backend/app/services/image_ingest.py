@@ -0,0 +1,96 @@
+"""
+Image ingestion for CLIP: bounded reads and reduced-size decoding.
+
+CLIP only ever sees a 224px crop, so decoding a 12MP phone photo at full
+resolution wastes ~36MB and most of the decode time. Images are instead
+decoded straight to the smallest size whose shortest side still covers the
+model input:
+
+- JPEG: ``Image.draft`` lets libjpeg decode at 1/2, 1/4 or 1/8 scale
+- other formats: ``Image.reduce`` by an integer factor right after loading
+
+EXIF orientation is applied after the reduction, so rotated phone photos
+reach the model upright.
+"""
+
+from io import BytesIO
+from typing import Any
+import math
+
+from app.config import settings
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+    ImageOps = None
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class FileTooLargeError(ValueError):
+    """Upload exceeds MAX_FILE_SIZE"""
+
+
+async def read_limited(file: Any, max_size: int = None) -> bytes:
+    """
+    Read an upload in chunks, aborting as soon as it exceeds ``max_size``.
+
+    Args:
+        file: FastAPI UploadFile (anything with an async ``read(size)``)
+        max_size: Byte limit (defaults to MAX_FILE_SIZE)
+
+    Returns:
+        The file contents
+
+    Raises:
+        FileTooLargeError: If the upload is larger than the limit
+    """
+    max_size = max_size or settings.MAX_FILE_SIZE
+
+    # Starlette knows the size of spooled uploads; reject without reading
+    size = getattr(file, "size", None)
+    if size is not None and size > max_size:
+        raise FileTooLargeError(f"File exceeds the {max_size} byte limit")
+
+    buffer = bytearray()
+    while True:
+        chunk = await file.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer.extend(chunk)
+        if len(buffer) > max_size:
+            raise FileTooLargeError(f"File exceeds the {max_size} byte limit")
+    return bytes(buffer)
+
+
+def decode_image(contents: bytes, min_side: int = None):
+    """
+    Decode image bytes to an upright RGB image no smaller than needed.
+
+    Args:
+        contents: Encoded image
+        min_side: Smallest acceptable shortest side (defaults to AI_IMAGE_DECODE_SIZE)
+
+    Returns:
+        RGB PIL image whose shortest side is >= ``min_side`` (or the
+        original size for smaller images)
+    """
+    min_side = min_side or settings.AI_IMAGE_DECODE_SIZE
+    image = Image.open(BytesIO(contents))
+    width, height = image.size
+    scale = min_side / min(width, height)
+
+    if scale < 1:
+        if image.format == "JPEG":
+            # libjpeg picks the largest DCT scale that stays >= the requested size
+            image.draft("RGB", (math.ceil(width * scale), math.ceil(height * scale)))
+        else:
+            factor = int(1 / scale)
+            if factor >= 2:
+                if image.mode not in ("RGB", "RGBA", "L", "LA"):
+                    image = image.convert("RGB")  # reduce() does not support palette/bilevel images
+                image = image.reduce(factor)
+
+    image = ImageOps.exif_transpose(image)
+    return image.convert("RGB")
@@ -0,0 +1,168 @@
+"""
+Async image fetching for the matching and embedding pipelines.
+
+One pooled ``httpx.AsyncClient`` per event loop keeps connections alive
+between requests. Concurrency is capped globally and per host so a batch run
+can fetch hundreds of images in parallel without hammering one origin.
+Fetched bytes are kept in a bounded in-process LRU; decoding is left to the
+embedding pipeline, whose content-addressed cache already skips images it
+has seen.
+
+Usage:
+    contents = await image_loader.fetch_many(urls)     # raw bytes (or None)
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+import asyncio
+import logging
+import os
+import threading
+
+from app.config import settings
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedLRU:
+    """Thread-safe LRU bounded by the total size of its values"""
+
+    def __init__(self, max_size: int, size_of: Callable[[Any], int]):
+        self.max_size = max_size
+        self.size_of = size_of
+        self._items: "OrderedDict[str, Any]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        size = self.size_of(value)
+        if size > self.max_size:
+            return
+        with self._lock:
+            if key in self._items:
+                self._size -= self.size_of(self._items.pop(key))
+            self._items[key] = value
+            self._size += size
+            while self._size > self.max_size:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= self.size_of(evicted)
+
+
+class ImageLoader:
+    """
+    Pooled, concurrency-limited image fetcher with a local byte cache.
+
+    Each event loop gets its own client and semaphores: Celery tasks run
+    under ``asyncio.run`` and a client cannot be shared across loops, so
+    task coroutines call :meth:`close` before their loop ends.
+    """
+
+    def __init__(self):
+        self._bytes = BoundedLRU(settings.IMAGE_CACHE_MAX_BYTES, len)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client = None
+        self._limit: Optional[asyncio.Semaphore] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    def _ensure_client(self):
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._loop = loop
+            self._client = httpx.AsyncClient(
+                timeout=settings.IMAGE_FETCH_TIMEOUT,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=settings.IMAGE_FETCH_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.IMAGE_FETCH_MAX_CONNECTIONS,
+                    keepalive_expiry=30.0,
+                ),
+            )
+            self._limit = asyncio.Semaphore(settings.IMAGE_FETCH_MAX_CONNECTIONS)
+            self._host_limits = {}
+        return self._client
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(settings.IMAGE_FETCH_PER_HOST)
+        return self._host_limits[host]
+
+    async def fetch(self, url: str) -> Optional[bytes]:
+        """
+        Raw contents of an image URL or local path.
+
+        Args:
+            url: http(s) URL or filesystem path
+
+        Returns:
+            Image bytes, or None if the image could not be fetched
+        """
+        cached = self._bytes.get(url)
+        if cached is not None:
+            return cached
+
+        try:
+            if url.startswith(("http://", "https://")):
+                if httpx is None:
+                    raise RuntimeError("httpx is not installed")
+                client = self._ensure_client()
+                async with self._limit, self._host_limit(url):
+                    contents = await self._download(client, url)
+            else:
+                contents = await asyncio.to_thread(self._read_file, url)
+        except Exception as e:
+            logger.warning(f"Failed to fetch image {url}: {e}")
+            return None
+
+        self._bytes.set(url, contents)
+        return contents
+
+    @staticmethod
+    async def _download(client, url: str) -> bytes:
+        """Stream a response body, aborting as soon as it exceeds MAX_FILE_SIZE"""
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            declared = response.headers.get("content-length")
+            if declared is not None and int(declared) > settings.MAX_FILE_SIZE:
+                raise ValueError(f"{declared} bytes exceeds MAX_FILE_SIZE")
+
+            buffer = bytearray()
+            async for chunk in response.aiter_bytes():
+                buffer.extend(chunk)
+                if len(buffer) > settings.MAX_FILE_SIZE:
+                    raise ValueError("Response exceeds MAX_FILE_SIZE")
+            return bytes(buffer)
+
+    async def fetch_many(self, urls: List[str]) -> List[Optional[bytes]]:
+        """Fetch several images concurrently, preserving order"""
+        return list(await asyncio.gather(*(self.fetch(url) for url in urls)))
+
+    async def close(self) -> None:
+        """Close the pooled client of the current event loop"""
+        if self._client is not None and self._loop is asyncio.get_running_loop():
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+    @staticmethod
+    def _read_file(path: str) -> bytes:
+        if os.path.getsize(path) > settings.MAX_FILE_SIZE:
+            raise ValueError(f"{path} exceeds MAX_FILE_SIZE")
+        with open(path, "rb") as f:
+            return f.read()
+
+
+image_loader = ImageLoader()
@@ -0,0 +1,243 @@
+"""
+In-process CLIP inference queue with dynamic micro-batching.
+
+Concurrent requests are collected for at most ``AI_BATCH_MAX_WAIT_MS`` (or
+until ``AI_BATCH_MAX_SIZE`` requests are waiting) and run as one forward pass
+on a dedicated inference thread, so the event loop is never blocked and a
+burst of uploads costs a few batched passes instead of one pass per request.
+
+Usage:
+    image_embedding = await inference_queue.embed_image(image)
+    image_embedding = await inference_queue.embed_image_bytes(contents)
+    text_embeddings = await inference_queue.embed_texts(["Phone", "Wallet"])
+    label_embeddings = await inference_queue.label_embeddings(["Phone", "Wallet"])
+"""
+
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+import asyncio
+import logging
+
+from app.config import settings
+from app.services.ai_model import ai_service
+from app.services.embedding_cache import content_key, image_embedding_cache
+from app.services.image_ingest import decode_image
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Gathers single requests into batches for a batch function.
+
+    ``batch_fn`` takes a list of payloads and returns a sequence of results
+    in the same order. Each :meth:`submit` call awaits its own result.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], Sequence[Any]],
+        executor: Executor,
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10.0
+    ):
+        self.batch_fn = batch_fn
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def submit(self, payload: Any) -> Any:
+        """
+        Queue a payload and wait for its result.
+
+        Args:
+            payload: Single input for ``batch_fn``
+
+        Returns:
+            The result for this payload
+        """
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((payload, future))
+        return await future
+
+    async def close(self) -> None:
+        """Stop the batching task"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._worker = None
+        self._queue = None
+
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def _collect(self) -> List[Tuple[Any, asyncio.Future]]:
+        """Wait for one request, then keep collecting until the batch is full or the deadline passes"""
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        # Callers that gave up (client disconnect, timeout) are dropped
+        return [(payload, future) for payload, future in batch if not future.done()]
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            if not batch:
+                continue
+
+            payloads = [payload for payload, _ in batch]
+            try:
+                results = await self._loop.run_in_executor(self.executor, self.batch_fn, payloads)
+            except Exception as e:
+                logger.error(f"Inference batch of {len(batch)} failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+class InferenceQueue:
+    """
+    Micro-batched front end for the shared CLIP model.
+
+    A single inference thread runs every batch; torch already parallelizes
+    each forward pass across cores, so more threads would only contend.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="clip-inference")
+        self._warmup: Optional[asyncio.Task] = None
+        self._images = MicroBatcher(
+            self._embed_images,
+            self._executor,
+            settings.AI_BATCH_MAX_SIZE,
+            settings.AI_BATCH_MAX_WAIT_MS,
+        )
+        self._texts = MicroBatcher(
+            self._embed_texts,
+            self._executor,
+            settings.AI_BATCH_MAX_SIZE * 8,  # text requests are small; label sets arrive together
+            settings.AI_BATCH_MAX_WAIT_MS,
+        )
+
+    async def embed_image(self, image):
+        """Normalized embedding for one image (batched with concurrent requests)"""
+        return await self._images.submit(image)
+
+    async def embed_image_bytes(self, contents: bytes):
+        """
+        Normalized embedding for encoded image bytes.
+
+        Served from the content-addressed cache when this exact image was
+        embedded before; otherwise decoded, batched and cached.
+        """
+        key = content_key(contents, ai_service.model_version)
+        vector = await asyncio.to_thread(image_embedding_cache.get, key)
+        if vector is not None:
+            return vector
+
+        # Decoding a large photo is CPU-bound; keep it off the event loop
+        image = await asyncio.to_thread(decode_image, contents)
+        vector = await self.embed_image(image)
+        await asyncio.to_thread(image_embedding_cache.set, key, vector)
+        return vector
+
+    async def embed_texts(self, texts: List[str]):
+        """Normalized embeddings for a list of texts as one (n, dim) array"""
+        vectors = await asyncio.gather(*(self._texts.submit(text) for text in texts))
+        return np.vstack(vectors)
+
+    async def label_embeddings(self, labels: List[str]):
+        """
+        Normalized embeddings for a zero-shot label set.
+
+        Served from the label cache (memory, then disk) when possible;
+        otherwise embedded through the text batcher and cached.
+        """
+        embeddings = await asyncio.to_thread(ai_service.cached_label_embeddings, labels)
+        if embeddings is None:
+            embeddings = await self.embed_texts(labels)
+            await asyncio.to_thread(ai_service.store_label_embeddings, labels, embeddings)
+        return embeddings
+
+    async def model_available(self) -> bool:
+        """
+        Whether CLIP is loaded, loading it on the inference thread if needed.
+
+        Never blocks the event loop, even when a load (or a retry after a
+        failed one) has to download weights or reach the model host.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: ai_service.model is not None)
+
+    def start_warmup(self) -> None:
+        """
+        Load the model and precompute registered label embeddings in the background.
+
+        Runs on the inference thread, so the first request neither loads CLIP
+        nor runs the text tower on the event loop.
+        """
+        if self._warmup is None:
+            loop = asyncio.get_running_loop()
+            self._warmup = loop.create_task(self._run_warmup())
+
+    async def _run_warmup(self) -> None:
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._executor, ai_service.load_model)
+        except Exception as e:
+            logger.error(f"CLIP warmup failed: {e}")
+
+    async def close(self) -> None:
+        """Stop batching tasks and the inference thread"""
+        if self._warmup is not None:
+            self._warmup.cancel()
+            self._warmup = None
+        await self._images.close()
+        await self._texts.close()
+        self._executor.shutdown(wait=False)
+
+    @staticmethod
+    def _embed_images(images: List):
+        embeddings = ai_service.embed_images(images)
+        if embeddings is None:
+            raise RuntimeError("AI model not loaded")
+        return list(embeddings)
+
+    @staticmethod
+    def _embed_texts(texts: List[str]):
+        embeddings = ai_service.embed_texts(texts)
+        if embeddings is None:
+            raise RuntimeError("AI model not loaded")
+        return list(embeddings)
+
+
+inference_queue = InferenceQueue()
@@ -0,0 +1,272 @@
+"""
+Pluggable CPU inference backends for the CLIP towers.
+
+``AI_INFERENCE_BACKEND`` selects how the image and text towers run:
+
+- ``torch``: fp32 PyTorch ``CLIPModel`` (reference)
+- ``torch_int8``: the same model with dynamic int8 quantization of every
+  ``nn.Linear`` (weights stored as int8, activations quantized on the fly)
+- ``onnx``: ONNX Runtime graphs exported from the fp32 model
+- ``onnx_int8``: the ONNX graphs with dynamically quantized int8 weights
+
+ONNX graphs are exported once into ``MODEL_CACHE_DIR/onnx`` and reused by
+every process. The ONNX backends need the optional ``onnxruntime`` and
+``onnx`` packages (see requirements.txt); they are not installed by default. All backends take preprocessed numpy inputs from
+``CLIPProcessor`` and return unnormalized float32 features, so they can be
+swapped without touching callers. Use :func:`check_parity` (or
+``scripts/benchmark_inference.py``) before switching production to a
+quantized backend.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+import json
+import logging
+import os
+
+from app.config import settings
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import torch
+    from transformers import CLIPModel
+except ImportError:
+    torch = None
+    CLIPModel = None
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("torch", "torch_int8", "onnx", "onnx_int8")
+
+
+class InferenceBackend(ABC):
+    """Runs the CLIP image and text towers on preprocessed inputs"""
+
+    name = "base"
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.logit_scale = 100.0
+
+    @abstractmethod
+    def image_features(self, pixel_values) -> "np.ndarray":
+        """Image features for a (batch, 3, H, W) float32 array"""
+
+    @abstractmethod
+    def text_features(self, input_ids, attention_mask) -> "np.ndarray":
+        """Text features for (batch, seq) int64 token arrays"""
+
+
+class TorchBackend(InferenceBackend):
+    """fp32 PyTorch CLIPModel"""
+
+    name = "torch"
+
+    def __init__(self, model_name: str):
+        super().__init__(model_name)
+        if CLIPModel is None:
+            raise RuntimeError("torch and transformers are required for the torch backends")
+        self.model = CLIPModel.from_pretrained(model_name).eval()
+        self.logit_scale = float(self.model.logit_scale.exp().item())
+
+    def image_features(self, pixel_values) -> "np.ndarray":
+        with torch.inference_mode():
+            outputs = self.model.get_image_features(pixel_values=torch.from_numpy(pixel_values))
+        return outputs.numpy().astype(np.float32)
+
+    def text_features(self, input_ids, attention_mask) -> "np.ndarray":
+        with torch.inference_mode():
+            outputs = self.model.get_text_features(
+                input_ids=torch.from_numpy(input_ids),
+                attention_mask=torch.from_numpy(attention_mask),
+            )
+        return outputs.numpy().astype(np.float32)
+
+
+class QuantizedTorchBackend(TorchBackend):
+    """CLIPModel with dynamically int8-quantized linear layers"""
+
+    name = "torch_int8"
+
+    def __init__(self, model_name: str):
+        super().__init__(model_name)
+        self.model = torch.ao.quantization.quantize_dynamic(
+            self.model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+
+
+class OnnxBackend(InferenceBackend):
+    """ONNX Runtime sessions for the exported image and text towers"""
+
+    name = "onnx"
+
+    def __init__(self, model_name: str, quantized: bool = False):
+        super().__init__(model_name)
+        if ort is None:
+            raise RuntimeError("onnxruntime is required for the onnx backends (pip install onnxruntime onnx)")
+
+        export_dir = onnx_export_dir(model_name)
+        if not os.path.exists(os.path.join(export_dir, "meta.json")):
+            export_onnx(model_name, export_dir)
+        if quantized:
+            quantize_onnx(export_dir)
+            self.name = "onnx_int8"
+
+        suffix = ".int8.onnx" if quantized else ".onnx"
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        providers = ["CPUExecutionProvider"]
+        self.vision = ort.InferenceSession(os.path.join(export_dir, f"vision{suffix}"), options, providers=providers)
+        self.text = ort.InferenceSession(os.path.join(export_dir, f"text{suffix}"), options, providers=providers)
+
+        with open(os.path.join(export_dir, "meta.json")) as f:
+            self.logit_scale = json.load(f)["logit_scale"]
+
+    def image_features(self, pixel_values) -> "np.ndarray":
+        (outputs,) = self.vision.run(None, {"pixel_values": pixel_values.astype(np.float32)})
+        return outputs.astype(np.float32)
+
+    def text_features(self, input_ids, attention_mask) -> "np.ndarray":
+        (outputs,) = self.text.run(None, {
+            "input_ids": input_ids.astype(np.int64),
+            "attention_mask": attention_mask.astype(np.int64),
+        })
+        return outputs.astype(np.float32)
+
+
+def create_backend(name: Optional[str] = None, model_name: Optional[str] = None) -> InferenceBackend:
+    """
+    Instantiate an inference backend.
+
+    Args:
+        name: One of BACKENDS (defaults to AI_INFERENCE_BACKEND)
+        model_name: Hugging Face model id (defaults to CLIP_MODEL_NAME)
+
+    Returns:
+        Ready-to-use backend
+    """
+    name = name or settings.AI_INFERENCE_BACKEND
+    model_name = model_name or settings.CLIP_MODEL_NAME
+
+    if name == "torch":
+        return TorchBackend(model_name)
+    if name == "torch_int8":
+        return QuantizedTorchBackend(model_name)
+    if name == "onnx":
+        return OnnxBackend(model_name)
+    if name == "onnx_int8":
+        return OnnxBackend(model_name, quantized=True)
+    raise ValueError(f"Unknown inference backend '{name}', expected one of {', '.join(BACKENDS)}")
+
+
+def onnx_export_dir(model_name: str) -> str:
+    """Directory holding the exported ONNX graphs for a model"""
+    return os.path.join(settings.MODEL_CACHE_DIR, "onnx", model_name.replace("/", "--"))
+
+
+def export_onnx(model_name: str, export_dir: str) -> None:
+    """
+    Export the CLIP image and text towers to ONNX.
+
+    Args:
+        model_name: Hugging Face model id
+        export_dir: Output directory
+    """
+    if CLIPModel is None:
+        raise RuntimeError("torch and transformers are required to export ONNX graphs")
+
+    logger.info(f"Exporting {model_name} to ONNX in {export_dir}")
+    os.makedirs(export_dir, exist_ok=True)
+    model = CLIPModel.from_pretrained(model_name).eval()
+
+    class VisionTower(torch.nn.Module):
+        def __init__(self, clip):
+            super().__init__()
+            self.clip = clip
+
+        def forward(self, pixel_values):
+            return self.clip.get_image_features(pixel_values=pixel_values)
+
+    class TextTower(torch.nn.Module):
+        def __init__(self, clip):
+            super().__init__()
+            self.clip = clip
+
+        def forward(self, input_ids, attention_mask):
+            return self.clip.get_text_features(input_ids=input_ids, attention_mask=attention_mask)
+
+    image_size = model.config.vision_config.image_size
+    with torch.inference_mode():
+        torch.onnx.export(
+            VisionTower(model),
+            (torch.zeros(1, 3, image_size, image_size),),
+            os.path.join(export_dir, "vision.onnx"),
+            input_names=["pixel_values"],
+            output_names=["image_embeds"],
+            dynamic_axes={"pixel_values": {0: "batch"}, "image_embeds": {0: "batch"}},
+            opset_version=17,
+        )
+        torch.onnx.export(
+            TextTower(model),
+            (torch.ones(1, 8, dtype=torch.long), torch.ones(1, 8, dtype=torch.long)),
+            os.path.join(export_dir, "text.onnx"),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["text_embeds"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "text_embeds": {0: "batch"},
+            },
+            opset_version=17,
+        )
+
+    # Written last: its presence marks a complete export
+    with open(os.path.join(export_dir, "meta.json"), "w") as f:
+        json.dump({"model_name": model_name, "logit_scale": float(model.logit_scale.exp().item())}, f)
+
+
+def quantize_onnx(export_dir: str) -> None:
+    """Create int8 weight-quantized copies of the exported graphs if missing"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    for tower in ("vision", "text"):
+        target = os.path.join(export_dir, f"{tower}.int8.onnx")
+        if not os.path.exists(target):
+            quantize_dynamic(
+                os.path.join(export_dir, f"{tower}.onnx"),
+                target,
+                weight_type=QuantType.QInt8,
+            )
+
+
+def check_parity(reference, candidate) -> Dict[str, float]:
+    """
+    Compare embeddings from a candidate backend against fp32 reference embeddings.
+
+    Args:
+        reference: (n, dim) embeddings from the torch backend
+        candidate: (n, dim) embeddings from the backend under test
+
+    Returns:
+        Mean/min cosine similarity between matching rows, and the share of
+        rows whose nearest reference row is their own (retrieval agreement)
+    """
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    candidate = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    cosine = np.sum(reference * candidate, axis=1)
+    nearest = np.argmax(candidate @ reference.T, axis=1)
+
+    return {
+        "cosine_mean": float(cosine.mean()),
+        "cosine_min": float(cosine.min()),
+        "top1_agreement": float(np.mean(nearest == np.arange(len(reference)))),
+    }
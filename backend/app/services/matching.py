@@ -1,69 +1,531 @@
-from typing import List
+from typing import List, Dict, Any, Optional, Tuple
 from uuid import UUID
+from concurrent.futures import Executor
+import asyncio
 import difflib
-from datetime import datetime
+import heapq
+import logging
+import time
+from datetime import datetime, timedelta
 
+from app.config import settings
 from app.models.item import Item, ItemType, ItemStatus
 from app.repositories.item import ItemRepository
 from app.repositories.match import MatchRepository
-from app.schemas.match import MatchCreate
+from app.repositories.matching_state import MatchingStateRepository
+from app.services import features, scoring
+from app.services.embeddings import EmbeddingService
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Checkpoint name of the scheduled incremental run
+INCREMENTAL_CHECKPOINT = "incremental_matching"
+
+# Re-read edits this far behind the high-water mark so rows committed late with
+# an older updated_at are not missed; fingerprints make the overlap free.
+CHECKPOINT_OVERLAP = timedelta(minutes=5)
+
+
+class TopKPairs:
+    """
+    Best ``k`` candidates per item, kept in bounded min-heaps while scoring.
+    
+    Pushing is O(log k) and memory is O(items * k) however many candidates
+    are scored.
+    """
+    
+    def __init__(self, k: int):
+        self.k = k
+        self._heaps: Dict[UUID, List[Tuple[float, UUID]]] = {}
+    
+    def push(self, item_id: UUID, score: float, candidate_id: UUID) -> None:
+        heap = self._heaps.setdefault(item_id, [])
+        if len(heap) < self.k:
+            heapq.heappush(heap, (score, candidate_id))
+        elif score > heap[0][0]:
+            heapq.heapreplace(heap, (score, candidate_id))
+    
+    def items(self) -> List[Tuple[UUID, UUID, float]]:
+        """(item_id, candidate_id, score) for every retained candidate"""
+        return [
+            (item_id, candidate_id, score)
+            for item_id, heap in self._heaps.items()
+            for score, candidate_id in heap
+        ]
+
 
 class MatchingService:
-    def __init__(self, item_repo: ItemRepository, match_repo: MatchRepository):
+    def __init__(
+        self,
+        item_repo: ItemRepository,
+        match_repo: MatchRepository,
+        state_repo: Optional[MatchingStateRepository] = None,
+        executor: Optional[Executor] = None,
+        embedding_service: Optional[EmbeddingService] = None
+    ):
         self.item_repo = item_repo
         self.match_repo = match_repo
+        self.state_repo = state_repo
+        self.executor = executor
+        # CLIP nearest neighbours from the ANN index join the candidate set when set
+        self.embedding_service = embedding_service
+        # Vectorized scorer when numpy/scikit-learn are installed, difflib otherwise
+        self.scorer = scoring.BatchScorer() if scoring.is_available() else None
 
-    async def process_matches_for_item(self, item_id: UUID):
+    async def process_matches_for_item(self, item_id: UUID) -> Dict[str, int]:
         """
         Find and create matches for a newly created item.
+        
+        Only the MAX_MATCHES_PER_ITEM best candidates above
+        SIMILARITY_THRESHOLD are kept; pending matches that fall out of the
+        top K of either item are pruned, and pending matches of the item that
+        were not re-emitted are removed.
+        
+        Candidates are the item's block (same category and date window) plus,
+        with an embedding service, the item's EMBEDDING_INDEX_TOP_K nearest
+        opposite-type items in the CLIP ANN index, which also catches
+        look-alikes filed under another category or date.
+        
+        Returns:
+            {"created": n, "updated": n, "pruned": n, "removed": n}
         """
         # 1. Get the source item
         source_item = await self.item_repo.get(item_id)
         if not source_item:
-            return
-
-        # 2. Determine target type
-        target_type = ItemType.FOUND if source_item.type == ItemType.LOST else ItemType.LOST
-        
-        # 3. Get candidates (fetch all active items of opposite type)
-        # Ideally, we'd have a more specific query (e.g. by category) to limit search space
-        candidates = await self.item_repo.get_multi(
-            limit=1000, 
-            type=target_type, 
-            status=ItemStatus.ACTIVE,
-            category=source_item.category # Optimization: simple category filter
+            return {"created": 0, "updated": 0, "pruned": 0, "removed": 0}
+        started = datetime.utcnow()
+
+        # 2. Score candidates: active opposite-type items in the same category
+        # and date window, scanned chunk by chunk via the blocking index. Only
+        # the scored columns are loaded and only the running top K is kept.
+        best = []
+        seen = set()
+        async for candidates in self.item_repo.iter_block_candidates(
+            source_item, chunk_size=settings.MATCHING_CHUNK_SIZE, columns=scoring.SCORING_FIELDS
+        ):
+            seen.update(candidate.id for candidate in candidates)
+            best = await self._merge_top_k(source_item, candidates, best)
+
+        # 3. Add ANN hits outside the block (sub-linear lookup, no full scan)
+        if self.embedding_service is not None:
+            hits = await self.embedding_service.find_candidates(source_item)
+            target_type = ItemType.FOUND if source_item.type == ItemType.LOST else ItemType.LOST
+            extra = await self.item_repo.get_active_by_ids(
+                [hit_id for hit_id, _ in hits if hit_id not in seen], target_type, columns=scoring.SCORING_FIELDS
+            )
+            if extra:
+                best = await self._merge_top_k(source_item, extra, best)
+
+        pairs = []
+        for score, candidate in best:
+            # Ensure we define which is lost and which is found correctly
+            lost_item = source_item if source_item.type == ItemType.LOST else candidate
+            found_item = candidate if source_item.type == ItemType.LOST else source_item
+            pairs.append((lost_item.id, found_item.id, score))
+
+        # Upsert so re-running for the same item never duplicates matches
+        counts = await self.match_repo.bulk_upsert(pairs)
+        counts["pruned"] = await self._prune(pairs)
+        counts["removed"] = await self.match_repo.delete_stale_pending(
+            lost_item_ids=[source_item.id] if source_item.type == ItemType.LOST else [],
+            found_item_ids=[source_item.id] if source_item.type == ItemType.FOUND else [],
+            before=started,
+        )
+        return counts
+
+    async def _merge_top_k(
+        self,
+        source_item: Item,
+        candidates: List[Item],
+        best: List[Tuple[float, Item]]
+    ) -> List[Tuple[float, Item]]:
+        """Score candidates and merge those above the threshold into the running top K"""
+        scores = await self._score_candidates(source_item, candidates)
+        return heapq.nlargest(
+            settings.MAX_MATCHES_PER_ITEM,
+            best + [pair for pair in zip(scores, candidates) if pair[0] > settings.SIMILARITY_THRESHOLD],
+            key=lambda pair: pair[0],
         )
 
-        for candidate in candidates:
-            score = self._calculate_similarity(source_item, candidate)
+    async def run_batch_matching(
+        self,
+        chunk_size: Optional[int] = None,
+        date_window_days: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Match all active lost items against all active found items.
+        
+        Items are blocked by category and by a date window: for each chunk of
+        lost items (ordered by date) only found items of the same category
+        dated within the window are streamed in, and every (lost chunk, found
+        chunk) block is scored as one matrix. Memory is bounded by
+        ``chunk_size`` squared regardless of table size.
+        
+        Args:
+            chunk_size: Items loaded per side of a block
+            date_window_days: Max days between lost and found dates
             
-            if score > 0.3: # Threshold
-                # Create Match
-                # Ensure we define which is lost and which is found correctly
-                lost_item = source_item if source_item.type == ItemType.LOST else candidate
-                found_item = candidate if source_item.type == ItemType.LOST else source_item
+        Returns:
+            Run statistics including per-block timings and pruned pair count
+        """
+        chunk_size = chunk_size or settings.MATCHING_CHUNK_SIZE
+        window = timedelta(days=date_window_days if date_window_days is not None else settings.MATCHING_DATE_WINDOW_DAYS)
+        
+        if self.scorer is None:
+            logger.warning("Batch matching skipped: numpy/scikit-learn not installed")
+            return {"status": "skipped", "items_processed": 0}
+        
+        n_lost = await self.item_repo.count(type=ItemType.LOST, status=ItemStatus.ACTIVE)
+        n_found = await self.item_repo.count(type=ItemType.FOUND, status=ItemStatus.ACTIVE)
+        
+        stats = {
+            "items_processed": n_lost + n_found,
+            "pairs_total": n_lost * n_found,
+            "pairs_scored": 0,
+            "matches_created": 0,
+            "matches_updated": 0,
+            "matches_pruned": 0,
+            "matches_removed": await self.match_repo.delete_inactive_pending(),
+            "blocks": [],
+        }
+        started = time.perf_counter()
+        
+        for category in await self.item_repo.get_active_categories():
+            async for lost_chunk in self.item_repo.iter_active_chunks(
+                ItemType.LOST, category=category, chunk_size=chunk_size, columns=scoring.SCORING_FIELDS
+            ):
+                chunk_started = datetime.utcnow()
+                lost_vectors = self.scorer.vectorize(lost_chunk)
+                best = TopKPairs(settings.MAX_MATCHES_PER_ITEM)
+                
+                # Chunks are date-ordered, so one range query covers the window of every item
+                found_chunks = self.item_repo.iter_active_chunks(
+                    ItemType.FOUND,
+                    category=category,
+                    date_from=lost_chunk[0].date_lost_found - window,
+                    date_to=lost_chunk[-1].date_lost_found + window,
+                    chunk_size=chunk_size,
+                    columns=scoring.SCORING_FIELDS,
+                )
+                async for found_chunk in found_chunks:
+                    block_started = time.perf_counter()
+                    pairs, n_scored = self._match_block(
+                        lost_chunk, lost_vectors, found_chunk, self.scorer.vectorize(found_chunk), window
+                    )
+                    for lost_id, found_id, score in pairs:
+                        best.push(lost_id, score, found_id)
+                    
+                    stats["pairs_scored"] += n_scored
+                    stats["blocks"].append({
+                        "category": category,
+                        "lost": len(lost_chunk),
+                        "found": len(found_chunk),
+                        "pairs_scored": n_scored,
+                        "matches": len(pairs),
+                        "seconds": round(time.perf_counter() - block_started, 4),
+                    })
                 
-                # Check if match already exists? Repo might handle it, or we assume new item = new matches
-                # We'll just try to create it.
+                # Every found chunk in the window has been seen: the heaps hold each lost item's top K
+                await self._save_top_k(best.items(), stats)
+                stats["matches_removed"] += await self.match_repo.delete_stale_pending(
+                    lost_item_ids=[item.id for item in lost_chunk], before=chunk_started
+                )
+                
+                # Commit per lost chunk so a long run never holds one huge transaction
+                await self.match_repo.db.commit()
+        
+        stats["pairs_pruned"] = stats["pairs_total"] - stats["pairs_scored"]
+        stats["seconds"] = round(time.perf_counter() - started, 3)
+        logger.info(
+            f"Batch matching: {stats['pairs_scored']} pairs scored, {stats['pairs_pruned']} pruned, "
+            f"{stats['matches_created']} created, {stats['matches_updated']} updated, "
+            f"{stats['matches_pruned']} pruned, {stats['matches_removed']} removed in {stats['seconds']}s"
+        )
+        return stats
+
+    async def run_full_matching(
+        self,
+        chunk_size: Optional[int] = None,
+        date_window_days: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Full batch run that also resets the incremental checkpoint.
+        
+        Seeds the fingerprint of every item up to the run start, so the next
+        incremental run only rescores items edited after it.
+        
+        Args:
+            chunk_size: Items loaded per side of a block
+            date_window_days: Max days between lost and found dates
+            
+        Returns:
+            Run statistics
+        """
+        if self.state_repo is None:
+            raise ValueError("Full matching requires a MatchingStateRepository")
+        
+        if self.scorer is None:
+            logger.warning("Full matching skipped: numpy/scikit-learn not installed")
+            return {"status": "skipped", "items_processed": 0}
+        
+        run_started = datetime.utcnow()
+        stats = await self.run_batch_matching(chunk_size, date_window_days)
+        
+        stats["items_fingerprinted"] = 0
+        async for chunk in self.item_repo.iter_updated_since(
+            None, run_started, chunk_size or settings.MATCHING_CHUNK_SIZE
+        ):
+            await self.state_repo.save_fingerprints(
+                {item.id: scoring.feature_fingerprint(item) for item in chunk}
+            )
+            await self.match_repo.db.commit()
+            stats["items_fingerprinted"] += len(chunk)
+        
+        await self.state_repo.set_high_water_mark(INCREMENTAL_CHECKPOINT, run_started)
+        return {"mode": "full", **stats}
+
+    async def run_incremental_matching(
+        self,
+        chunk_size: Optional[int] = None,
+        date_window_days: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Rescore only items created or edited since the previous run.
+        
+        Items with ``updated_at`` past the stored high-water mark are checked
+        against their last feature fingerprint; only those whose scored
+        features actually changed are matched against the candidate blocks.
+        Their matches are rewritten: scores are overwritten, and pending
+        matches that were not re-emitted (or whose item is no longer active)
+        are deleted. Matches between unchanged items are left untouched. The
+        first run (no checkpoint yet) falls back to ``run_full_matching``.
+        
+        Args:
+            chunk_size: Items loaded per side of a block
+            date_window_days: Max days between lost and found dates
+            
+        Returns:
+            Run statistics
+        """
+        if self.state_repo is None:
+            raise ValueError("Incremental matching requires a MatchingStateRepository")
+        
+        if self.scorer is None:
+            logger.warning("Incremental matching skipped: numpy/scikit-learn not installed")
+            return {"status": "skipped", "items_processed": 0}
+        
+        chunk_size = chunk_size or settings.MATCHING_CHUNK_SIZE
+        window = timedelta(days=date_window_days if date_window_days is not None else settings.MATCHING_DATE_WINDOW_DAYS)
+        run_started = datetime.utcnow()
+        
+        high_water_mark = await self.state_repo.get_high_water_mark(INCREMENTAL_CHECKPOINT)
+        if high_water_mark is None:
+            return await self.run_full_matching(chunk_size, window.days)
+        
+        stats = {
+            "mode": "incremental",
+            "items_checked": 0,
+            "items_processed": 0,
+            "pairs_scored": 0,
+            "matches_created": 0,
+            "matches_updated": 0,
+            "matches_pruned": 0,
+            "matches_removed": 0,
+            "blocks": [],
+        }
+        new_high_water_mark = high_water_mark
+        
+        async for chunk in self.item_repo.iter_updated_since(
+            high_water_mark - CHECKPOINT_OVERLAP, run_started, chunk_size
+        ):
+            new_high_water_mark = max(new_high_water_mark, chunk[-1].updated_at)
+            
+            fingerprints = {item.id: scoring.feature_fingerprint(item) for item in chunk}
+            stored = await self.state_repo.get_fingerprints(list(fingerprints))
+            changed = {
+                item_id: fingerprint
+                for item_id, fingerprint in fingerprints.items()
+                if stored.get(item_id) != fingerprint
+            }
+            to_rescore = [
+                item for item in chunk
+                if item.id in changed and item.status == ItemStatus.ACTIVE
+            ]
+            
+            stats["items_checked"] += len(chunk)
+            stats["items_processed"] += len(to_rescore)
+            rescore_started = datetime.utcnow()
+            await self._rescore_items(to_rescore, chunk_size, window, stats)
+            
+            # Pending pairs of changed items that were not re-emitted are stale,
+            # including every pending pair of items that are no longer active
+            stats["matches_removed"] += await self.match_repo.delete_stale_pending(
+                lost_item_ids=[item.id for item in chunk if item.id in changed and item.type == ItemType.LOST],
+                found_item_ids=[item.id for item in chunk if item.id in changed and item.type == ItemType.FOUND],
+                before=rescore_started,
+            )
+            await self.state_repo.save_fingerprints(changed)
+            await self.match_repo.db.commit()
+        
+        await self.state_repo.set_high_water_mark(INCREMENTAL_CHECKPOINT, new_high_water_mark)
+        stats["seconds"] = round((datetime.utcnow() - run_started).total_seconds(), 3)
+        logger.info(
+            f"Incremental matching: {stats['items_processed']}/{stats['items_checked']} items rescored, "
+            f"{stats['matches_created']} created, {stats['matches_updated']} updated, "
+            f"{stats['matches_pruned']} pruned, {stats['matches_removed']} removed in {stats['seconds']}s"
+        )
+        return stats
+
+    async def _rescore_items(
+        self,
+        items: List[Item],
+        chunk_size: int,
+        window: timedelta,
+        stats: Dict[str, Any]
+    ) -> None:
+        """
+        Match a set of changed items against their opposite-type candidate blocks.
+        """
+        groups: Dict[Tuple[ItemType, str], List[Item]] = {}
+        for item in items:
+            groups.setdefault((item.type, item.category), []).append(item)
+        
+        for (item_type, category), group in groups.items():
+            group.sort(key=lambda item: item.date_lost_found)
+            group_vectors = self.scorer.vectorize(group)
+            best = TopKPairs(settings.MAX_MATCHES_PER_ITEM)
+            target_type = ItemType.FOUND if item_type == ItemType.LOST else ItemType.LOST
+            
+            candidate_chunks = self.item_repo.iter_active_chunks(
+                target_type,
+                category=category,
+                date_from=group[0].date_lost_found - window,
+                date_to=group[-1].date_lost_found + window,
+                chunk_size=chunk_size,
+                columns=scoring.SCORING_FIELDS,
+            )
+            async for candidates in candidate_chunks:
+                block_started = time.perf_counter()
+                candidate_vectors = self.scorer.vectorize(candidates)
+                if item_type == ItemType.LOST:
+                    pairs, n_scored = self._match_block(group, group_vectors, candidates, candidate_vectors, window)
+                    for lost_id, found_id, score in pairs:
+                        best.push(lost_id, score, found_id)
+                else:
+                    pairs, n_scored = self._match_block(
+                        candidates, candidate_vectors, group, group_vectors, window, per_found=True
+                    )
+                    for lost_id, found_id, score in pairs:
+                        best.push(found_id, score, lost_id)
                 
-                await self.match_repo.create(MatchCreate(
-                    lost_item_id=lost_item.id,
-                    found_item_id=found_item.id,
-                    score=score,
-                    status="pending"
-                ))
+                stats["pairs_scored"] += n_scored
+                stats["blocks"].append({
+                    "category": category,
+                    "changed": len(group),
+                    "candidates": len(candidates),
+                    "pairs_scored": n_scored,
+                    "matches": len(pairs),
+                    "seconds": round(time.perf_counter() - block_started, 4),
+                })
+            
+            if item_type == ItemType.LOST:
+                pairs = best.items()
+            else:
+                pairs = [(lost_id, found_id, score) for found_id, lost_id, score in best.items()]
+            await self._save_top_k(pairs, stats)
+
+    async def _save_top_k(self, pairs: List[Tuple[UUID, UUID, float]], stats: Dict[str, Any]) -> None:
+        """Upsert retained (lost_id, found_id, score) pairs and prune what they displace"""
+        counts = await self.match_repo.bulk_upsert(pairs)
+        stats["matches_created"] += counts["created"]
+        stats["matches_updated"] += counts["updated"]
+        stats["matches_pruned"] += await self._prune(pairs)
+
+    async def _prune(self, pairs: List[Tuple[UUID, UUID, float]]) -> int:
+        """Drop pending matches ranked below the top K of any item in ``pairs``"""
+        if not pairs:
+            return 0
+        return await self.match_repo.prune_to_top_k(
+            lost_item_ids={lost_id for lost_id, _, _ in pairs},
+            found_item_ids={found_id for _, found_id, _ in pairs},
+            keep=settings.MAX_MATCHES_PER_ITEM,
+        )
+
+    def _match_block(
+        self,
+        lost_items: List[Item],
+        lost_vectors: "scoring.ItemVectors",
+        found_items: List[Item],
+        found_vectors: "scoring.ItemVectors",
+        window: timedelta,
+        per_found: bool = False
+    ) -> Tuple[List[Tuple[UUID, UUID, float]], int]:
+        """
+        Score one (lost, found) block and keep each item's best pairs above the threshold.
+        
+        Args:
+            per_found: Keep the top MAX_MATCHES_PER_ITEM per found item
+                (columns) instead of per lost item (rows)
+        
+        Returns:
+            ((lost_id, found_id, score) pairs, number of pairs inside the date window)
+        """
+        # Date proximity fades out over the run's window, not the configured default
+        scores = self.scorer.score_matrix(lost_vectors, found_vectors, date_window_days=window.days)
+        
+        in_window = np.abs(lost_vectors.dates[:, None] - found_vectors.dates[None, :]) <= window.days
+        candidates = np.where(in_window & (scores > settings.SIMILARITY_THRESHOLD), scores, -np.inf)
+        
+        # Only a block's top K per item can reach the item's overall top K
+        k = settings.MAX_MATCHES_PER_ITEM
+        ranked = candidates.T if per_found else candidates
+        if ranked.shape[1] > k:
+            top = np.argpartition(-ranked, k - 1, axis=1)[:, :k]
+            keep = np.zeros(ranked.shape, dtype=bool)
+            np.put_along_axis(keep, top, True, axis=1)
+            ranked = np.where(keep, ranked, -np.inf)
+            candidates = ranked.T if per_found else ranked
+        
+        rows, cols = np.nonzero(np.isfinite(candidates))
+        pairs = [
+            (lost_items[i].id, found_items[j].id, float(scores[i, j]))
+            for i, j in zip(rows, cols)
+        ]
+        return pairs, int(in_window.sum())
+
+    async def _score_candidates(self, source_item: Item, candidates: List[Item]) -> List[float]:
+        """
+        Score all candidates against the source item in one batch.
+        
+        Runs in ``self.executor`` (e.g. a process pool) when one is set, so
+        CPU-bound scoring never blocks the event loop.
+        """
+        if self.scorer is None:
+            return [self._calculate_similarity(source_item, candidate) for candidate in candidates]
+        if self.executor is None or not candidates:
+            return self.scorer.score_one(source_item, candidates).tolist()
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            scoring.score_candidates,
+            scoring.scoring_fields(source_item),
+            [scoring.scoring_fields(candidate) for candidate in candidates],
+        )
 
     def _calculate_similarity(self, item1: Item, item2: Item) -> float:
         """
         Calculate a similarity score between 0.0 and 1.0
+        
+        Pure-Python fallback for BatchScorer with the same signals and weights.
         """
         score = 0.0
-        weights = {
-            'title': 0.4,
-            'description': 0.3,
-            'tags': 0.2,
-            'location': 0.1
-        }
+        weights = features.fusion_weights()
 
         # Title Similarity
         s_title = difflib.SequenceMatcher(None, item1.title.lower(), item2.title.lower()).ratio()
@@ -84,11 +546,18 @@ class MatchingService:
             s_tags = intersection / union if union > 0 else 0
             score += s_tags * weights['tags']
 
-        # Location Similarity (String based for now)
+        # Location: canonical campus location when both resolve, string overlap otherwise
         loc1 = item1.location_found or ""
         loc2 = item2.location_found or ""
         if loc1 and loc2:
-             s_loc = difflib.SequenceMatcher(None, loc1.lower(), loc2.lower()).ratio()
-             score += s_loc * weights['location']
+            place1, place2 = features.canonical_location(loc1), features.canonical_location(loc2)
+            if place1 and place2:
+                s_loc = float(place1 == place2)
+            else:
+                s_loc = difflib.SequenceMatcher(None, loc1.lower(), loc2.lower()).ratio()
+            score += s_loc * weights['location']
+
+        # Date proximity
+        score += features.date_proximity(item1.date_lost_found, item2.date_lost_found) * weights['date']
 
-        return score
+        return min(score, 1.0)
@@ -0,0 +1,230 @@
+"""
+CLIP model host: one process owns the weights, everyone else talks to it.
+
+With ``AI_MODEL_HOST=remote`` the API and Celery processes only load the
+(lightweight) CLIPProcessor and send preprocessed tensors to the host over a
+Unix socket at ``MODEL_HOST_SOCKET``. Memory stays flat as workers are added,
+and a recycled Celery child no longer reloads CLIP on its first task.
+
+Image requests from all clients are micro-batched together on the host.
+
+Run the host (from backend/):
+    python -m app.services.model_host
+
+Wire format (both directions): an 8-byte big-endian header with the JSON
+header length and the binary payload length, then the JSON header, then the
+payload. Arrays travel as raw bytes with ``dtype``/``shape`` in the header.
+"""
+
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+
+from app.config import settings
+from app.services.inference_backends import InferenceBackend
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+_FRAME = struct.Struct(">II")
+
+
+def _encode(header: Dict[str, Any], array=None) -> bytes:
+    """Build one frame, attaching ``array`` as the payload"""
+    payload = b""
+    if array is not None:
+        array = np.ascontiguousarray(array)
+        header = dict(header, dtype=array.dtype.str, shape=list(array.shape))
+        payload = array.tobytes()
+    header_bytes = json.dumps(header).encode()
+    return _FRAME.pack(len(header_bytes), len(payload)) + header_bytes + payload
+
+
+def _decode_array(header: Dict[str, Any], payload: bytes):
+    """Array carried by a frame, or None"""
+    if "shape" not in header:
+        return None
+    return np.frombuffer(payload, dtype=np.dtype(header["dtype"])).reshape(header["shape"])
+
+
+class ModelHostClient(InferenceBackend):
+    """
+    Inference backend that forwards to the model host.
+
+    Drop-in replacement for a local backend inside AIModelService. Each
+    thread keeps its own connection, which is re-established once on failure.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, timeout: Optional[float] = None):
+        self.socket_path = socket_path or settings.MODEL_HOST_SOCKET
+        self.timeout = timeout or settings.MODEL_HOST_TIMEOUT
+        self._local = threading.local()
+
+        info, _ = self._request({"op": "info"})
+        super().__init__(info["model_name"])
+        self.name = info["backend"]
+        self.logit_scale = info["logit_scale"]
+
+    def image_features(self, pixel_values) -> "np.ndarray":
+        _, features = self._request({"op": "image_features"}, pixel_values.astype(np.float32))
+        return features
+
+    def text_features(self, input_ids, attention_mask) -> "np.ndarray":
+        _, features = self._request(
+            {"op": "text_features"},
+            np.stack([input_ids, attention_mask]).astype(np.int64),
+        )
+        return features
+
+    def _connect(self) -> socket.socket:
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn.settimeout(self.timeout)
+        conn.connect(self.socket_path)
+        return conn
+
+    def _request(self, header: Dict[str, Any], array=None) -> Tuple[Dict[str, Any], Any]:
+        frame = _encode(header, array)
+        for attempt in range(2):
+            conn = getattr(self._local, "conn", None)
+            try:
+                if conn is None:
+                    conn = self._local.conn = self._connect()
+                conn.sendall(frame)
+                response, payload = self._read_frame(conn)
+                break
+            except OSError:
+                if conn is not None:
+                    conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+
+        if not response.get("ok"):
+            raise RuntimeError(f"Model host error: {response.get('error')}")
+        return response, _decode_array(response, payload)
+
+    @staticmethod
+    def _read_frame(conn: socket.socket) -> Tuple[Dict[str, Any], bytes]:
+        def read_exactly(n: int) -> bytes:
+            chunks = []
+            while n:
+                chunk = conn.recv(min(n, 1 << 20))
+                if not chunk:
+                    raise ConnectionError("Model host closed the connection")
+                chunks.append(chunk)
+                n -= len(chunk)
+            return b"".join(chunks)
+
+        header_len, payload_len = _FRAME.unpack(read_exactly(_FRAME.size))
+        header = json.loads(read_exactly(header_len))
+        return header, read_exactly(payload_len)
+
+
+class ModelHost:
+    """
+    Unix socket server around a local inference backend.
+
+    Image rows from concurrent requests are batched with MicroBatcher; text
+    requests run as they arrive since their sequence lengths differ.
+    """
+
+    def __init__(self, backend: InferenceBackend, socket_path: Optional[str] = None):
+        from concurrent.futures import ThreadPoolExecutor
+        from app.services.inference import MicroBatcher
+
+        self.backend = backend
+        self.socket_path = socket_path or settings.MODEL_HOST_SOCKET
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-host")
+        self._images = MicroBatcher(
+            lambda rows: list(self.backend.image_features(np.stack(rows))),
+            self._executor,
+            settings.AI_BATCH_MAX_SIZE,
+            settings.AI_BATCH_MAX_WAIT_MS,
+        )
+
+    async def serve(self) -> None:
+        """Listen on the socket until cancelled"""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)  # stale socket from a previous run
+        os.makedirs(os.path.dirname(os.path.abspath(self.socket_path)), exist_ok=True)
+
+        server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        os.chmod(self.socket_path, 0o660)
+        logger.info(f"Model host serving {self.backend.model_name} ({self.backend.name}) on {self.socket_path}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self._images.close()
+            self._executor.shutdown(wait=False)
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    header_len, payload_len = _FRAME.unpack(await reader.readexactly(_FRAME.size))
+                except asyncio.IncompleteReadError:
+                    break
+                header = json.loads(await reader.readexactly(header_len))
+                array = _decode_array(header, await reader.readexactly(payload_len))
+
+                try:
+                    writer.write(await self._dispatch(header["op"], array))
+                except Exception as e:
+                    logger.error(f"Model host request '{header.get('op')}' failed: {e}")
+                    writer.write(_encode({"ok": False, "error": str(e)}))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def _dispatch(self, op: str, array) -> bytes:
+        if op == "info":
+            return _encode({
+                "ok": True,
+                "model_name": self.backend.model_name,
+                "backend": self.backend.name,
+                "logit_scale": self.backend.logit_scale,
+            })
+
+        if op == "image_features":
+            rows = await asyncio.gather(*(self._images.submit(row) for row in array))
+            return _encode({"ok": True}, np.stack(rows))
+
+        if op == "text_features":
+            loop = asyncio.get_running_loop()
+            features = await loop.run_in_executor(self._executor, self.backend.text_features, array[0], array[1])
+            return _encode({"ok": True}, features)
+
+        raise ValueError(f"Unknown op '{op}'")
+
+
+def main() -> None:
+    """Load the model in this process and serve it"""
+    from app.services.ai_model import ai_service
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    # The host itself must run the model in-process
+    settings.AI_MODEL_HOST = "local"
+    if not ai_service.model:
+        raise SystemExit("Failed to load CLIP model")
+
+    try:
+        asyncio.run(ModelHost(ai_service.model).serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,560 @@
+"""
+Item search engine kept in sync with the items table.
+
+Items are indexed as flat documents holding everything ``ItemResponse``
+needs, so text searches are answered entirely by the search engine; the
+primary database is only read when (re)building the index.
+
+Backends (``SEARCH_BACKEND``):
+
+- ``elasticsearch``: the shared index at ELASTICSEARCH_URL / ELASTICSEARCH_INDEX
+- ``memory``: an in-process inverted index with the same query features,
+  for tests and single-process deployments without Elasticsearch; it is
+  rebuilt from the database at startup
+
+Writes go through the bulk API: ``index_items``/``delete_items`` send one
+request per SEARCH_BULK_CHUNK_SIZE documents. Indexing failures are logged,
+not raised (the index is derived data and the periodic rebuild repairs it).
+
+Searches raise ``SearchUnavailableError`` (callers fall back to the
+database) until a full reindex has completed into the index, and for
+SEARCH_RETRY_SECONDS after a backend failure, so an outage does not cost
+every request a SEARCH_TIMEOUT wait.
+
+Usage:
+    await search_service.index_items([item])
+    result = await search_service.search(query="black wallet", category="Wallets")
+    result.documents, result.total, result.facets
+"""
+
+from abc import ABC, abstractmethod
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional
+from uuid import UUID
+import asyncio
+import difflib
+import logging
+import math
+import time
+
+from app.config import settings
+from app.services.features import canonical_location, normalize_text
+
+try:
+    from elasticsearch import AsyncElasticsearch
+    from elasticsearch.helpers import async_bulk
+except ImportError:
+    AsyncElasticsearch = None
+    async_bulk = None
+
+logger = logging.getLogger(__name__)
+
+# Text fields and their relevance boosts
+TEXT_FIELDS: Dict[str, float] = {
+    "title": 3.0,
+    "tags": 2.0,
+    "description": 1.0,
+    "location_found": 1.0,
+}
+
+# Keyword fields aggregated into facet counts
+FACET_FIELDS = ("type", "status", "category", "location")
+
+ITEM_FIELDS = (
+    "id", "user_id", "type", "status", "title", "description", "category",
+    "location_found", "date_lost_found", "images", "tags", "qr_code_url",
+    "created_at", "updated_at", "expires_at",
+)
+
+
+def item_document(item: Any) -> Dict[str, Any]:
+    """
+    Search document of an item: its response fields plus the canonical location.
+
+    Args:
+        item: Item model (or any object with the item attributes)
+
+    Returns:
+        JSON-serializable document
+    """
+    document = {}
+    for name in ITEM_FIELDS:
+        value = getattr(item, name)
+        if isinstance(value, UUID):
+            value = str(value)
+        elif hasattr(value, "value"):
+            value = value.value  # enums
+        elif isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        document[name] = value
+    document["tags"] = list(document["tags"] or [])
+    document["images"] = list(document["images"] or [])
+    document["location"] = canonical_location(item.location_found)
+    return document
+
+
+class SearchUnavailableError(RuntimeError):
+    """Search backend is down or its index is not built yet"""
+
+
+@dataclass
+class SearchQuery:
+    """Text query, filters and page of a search"""
+    query: Optional[str] = None
+    item_type: Optional[str] = None
+    category: Optional[str] = None
+    status: Optional[str] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    location: Optional[str] = None
+    fuzzy: bool = False
+    skip: int = 0
+    limit: int = 20
+
+    def filters(self) -> Dict[str, str]:
+        """Exact-match keyword filters"""
+        filters = {"type": self.item_type, "category": self.category, "status": self.status}
+        return {name: getattr(value, "value", value) for name, value in filters.items() if value}
+
+
+@dataclass
+class SearchResult:
+    """One page of hits with the total hit count and facet counts"""
+    documents: List[Dict[str, Any]]
+    total: int
+    facets: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    total_is_estimate: bool = False
+
+
+class SearchBackend(ABC):
+    """Storage and query engine behind SearchService"""
+
+    name = "base"
+
+    async def setup(self) -> None:
+        """Create the index if needed"""
+
+    async def is_built(self) -> bool:
+        """Whether a full reindex has completed into the index"""
+        return True
+
+    async def mark_built(self) -> None:
+        """Record that a full reindex has completed"""
+
+    @abstractmethod
+    async def index(self, documents: List[Dict[str, Any]]) -> None:
+        """Add or replace documents"""
+
+    @abstractmethod
+    async def delete(self, ids: List[str]) -> None:
+        """Remove documents by item id"""
+
+    @abstractmethod
+    async def search(self, query: SearchQuery) -> SearchResult:
+        """Run a query"""
+
+    async def close(self) -> None:
+        """Release connections"""
+
+
+class ElasticsearchBackend(SearchBackend):
+    """
+    Items index in Elasticsearch.
+
+    Like the image loader, the client is bound to the event loop it was
+    created on and recreated for a new one (Celery tasks use ``asyncio.run``).
+    """
+
+    name = "elasticsearch"
+
+    MAPPINGS = {
+        "dynamic": False,
+        "properties": {
+            "id": {"type": "keyword"},
+            "user_id": {"type": "keyword"},
+            "type": {"type": "keyword"},
+            "status": {"type": "keyword"},
+            "category": {"type": "keyword"},
+            "location": {"type": "keyword"},
+            "title": {"type": "text", "analyzer": "english"},
+            "description": {"type": "text", "analyzer": "english"},
+            "tags": {"type": "text", "analyzer": "english"},
+            "location_found": {"type": "text"},
+            "date_lost_found": {"type": "date"},
+            "created_at": {"type": "date"},
+            "updated_at": {"type": "date"},
+        },
+    }
+
+    def __init__(self, url: Optional[str] = None, index_name: Optional[str] = None):
+        if AsyncElasticsearch is None:
+            raise RuntimeError("elasticsearch is not installed")
+        self.url = url or settings.ELASTICSEARCH_URL
+        self.index_name = index_name or settings.ELASTICSEARCH_INDEX
+        self._client = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_client(self):
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._loop = loop
+            self._client = AsyncElasticsearch(self.url, request_timeout=settings.SEARCH_TIMEOUT)
+        return self._client
+
+    async def setup(self) -> None:
+        client = self._ensure_client()
+        if not await client.indices.exists(index=self.index_name):
+            await client.indices.create(index=self.index_name, mappings=self.MAPPINGS)
+
+    async def is_built(self) -> bool:
+        response = await self._ensure_client().indices.get_mapping(index=self.index_name)
+        mappings = next(iter(response.values()))["mappings"]
+        return "reindexed_at" in mappings.get("_meta", {})
+
+    async def mark_built(self) -> None:
+        await self._ensure_client().indices.put_mapping(
+            index=self.index_name, meta={"reindexed_at": datetime.utcnow().isoformat()}
+        )
+
+    async def index(self, documents: List[Dict[str, Any]]) -> None:
+        actions = (
+            {"_op_type": "index", "_index": self.index_name, "_id": document["id"], "_source": document}
+            for document in documents
+        )
+        await async_bulk(self._ensure_client(), actions, chunk_size=settings.SEARCH_BULK_CHUNK_SIZE)
+
+    async def delete(self, ids: List[str]) -> None:
+        actions = (
+            {"_op_type": "delete", "_index": self.index_name, "_id": item_id}
+            for item_id in ids
+        )
+        # Deleting a document that was never indexed is not an error
+        await async_bulk(
+            self._ensure_client(), actions,
+            chunk_size=settings.SEARCH_BULK_CHUNK_SIZE, raise_on_error=False,
+        )
+
+    async def search(self, query: SearchQuery) -> SearchResult:
+        must: List[Dict[str, Any]] = []
+        if query.query:
+            must.append({
+                "multi_match": {
+                    "query": query.query,
+                    "fields": [f"{name}^{boost:g}" for name, boost in TEXT_FIELDS.items()],
+                    "fuzziness": "AUTO" if query.fuzzy else 0,
+                }
+            })
+
+        filters: List[Dict[str, Any]] = [
+            {"term": {name: value}} for name, value in query.filters().items()
+        ]
+        if query.date_from or query.date_to:
+            bounds = {}
+            if query.date_from:
+                bounds["gte"] = query.date_from.isoformat()
+            if query.date_to:
+                bounds["lte"] = query.date_to.isoformat()
+            filters.append({"range": {"date_lost_found": bounds}})
+        if query.location:
+            place = canonical_location(query.location)
+            if place:
+                filters.append({"term": {"location": place}})
+            else:
+                filters.append({"match": {"location_found": {
+                    "query": query.location, "operator": "and",
+                    "fuzziness": "AUTO" if query.fuzzy else 0,
+                }}})
+
+        response = await self._ensure_client().search(
+            index=self.index_name,
+            query={"bool": {"must": must or [{"match_all": {}}], "filter": filters}},
+            aggs={name: {"terms": {"field": name, "size": 50}} for name in FACET_FIELDS},
+            sort=["_score", {"created_at": "desc"}],
+            from_=query.skip,
+            size=query.limit,
+            # Exact hit counting stops here; beyond it the total is a lower bound
+            track_total_hits=settings.COUNT_EXACT_LIMIT,
+        )
+        total = response["hits"]["total"]
+        return SearchResult(
+            documents=[hit["_source"] for hit in response["hits"]["hits"]],
+            total=total["value"],
+            total_is_estimate=total["relation"] == "gte",
+            facets={
+                name: {bucket["key"]: bucket["doc_count"] for bucket in aggregation["buckets"]}
+                for name, aggregation in response["aggregations"].items()
+            },
+        )
+
+    async def close(self) -> None:
+        if self._client is not None and self._loop is asyncio.get_running_loop():
+            await self._client.close()
+        self._client = None
+        self._loop = None
+
+
+class InMemoryBackend(SearchBackend):
+    """
+    In-process inverted index: term -> {document id: boosted term frequency}.
+
+    Scoring is TF-IDF over the boosted text fields; fuzzy queries expand each
+    term to close vocabulary terms (difflib ratio >= 0.8). Only suitable for
+    a single process: every process holds its own copy.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self.postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._terms: Dict[str, List[str]] = {}  # document id -> its terms, for removal
+
+    @staticmethod
+    def tokenize(text: Optional[str]) -> List[str]:
+        return normalize_text(text).split()
+
+    def _weighted_terms(self, document: Dict[str, Any]) -> Counter:
+        weights: Counter = Counter()
+        for name, boost in TEXT_FIELDS.items():
+            value = document.get(name)
+            text = " ".join(value) if isinstance(value, list) else value
+            for term in self.tokenize(text):
+                weights[term] += boost
+        return weights
+
+    def _remove(self, item_id: str) -> None:
+        self.documents.pop(item_id, None)
+        for term in self._terms.pop(item_id, ()):
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(item_id, None)
+                if not postings:
+                    del self.postings[term]
+
+    async def index(self, documents: List[Dict[str, Any]]) -> None:
+        for document in documents:
+            item_id = document["id"]
+            self._remove(item_id)
+            weights = self._weighted_terms(document)
+            for term, weight in weights.items():
+                self.postings[term][item_id] = weight
+            self._terms[item_id] = list(weights)
+            self.documents[item_id] = document
+
+    async def delete(self, ids: List[str]) -> None:
+        for item_id in ids:
+            self._remove(item_id)
+
+    def _expand(self, term: str, fuzzy: bool) -> List[str]:
+        if not fuzzy or term in self.postings:
+            return [term]
+        return difflib.get_close_matches(term, list(self.postings), n=5, cutoff=0.8)
+
+    def _matches_filters(self, document: Dict[str, Any], query: SearchQuery, location_terms: List[str]) -> bool:
+        for name, value in query.filters().items():
+            if document.get(name) != value:
+                return False
+        day = document.get("date_lost_found")
+        if query.date_from and (not day or day < query.date_from.isoformat()):
+            return False
+        if query.date_to and (not day or day > query.date_to.isoformat()):
+            return False
+        if query.location:
+            place = canonical_location(query.location)
+            if place:
+                return document.get("location") == place
+            found = self.tokenize(document.get("location_found"))
+            return all(self._term_in(term, found, query.fuzzy) for term in location_terms)
+        return True
+
+    @staticmethod
+    def _term_in(term: str, terms: List[str], fuzzy: bool) -> bool:
+        if term in terms:
+            return True
+        return fuzzy and bool(difflib.get_close_matches(term, terms, n=1, cutoff=0.8))
+
+    async def search(self, query: SearchQuery) -> SearchResult:
+        if query.query:
+            scores: Dict[str, float] = defaultdict(float)
+            n_documents = len(self.documents)
+            for term in self.tokenize(query.query):
+                for expanded in self._expand(term, query.fuzzy):
+                    postings = self.postings.get(expanded, {})
+                    idf = math.log(1 + n_documents / (1 + len(postings)))
+                    for item_id, weight in postings.items():
+                        scores[item_id] += weight * idf
+        else:
+            scores = dict.fromkeys(self.documents, 0.0)
+
+        location_terms = self.tokenize(query.location)
+        hits = [
+            item_id for item_id in scores
+            if self._matches_filters(self.documents[item_id], query, location_terms)
+        ]
+        hits.sort(key=lambda item_id: self.documents[item_id]["created_at"] or "", reverse=True)
+        hits.sort(key=lambda item_id: scores[item_id], reverse=True)  # stable: newest first within a score
+
+        facets = {name: Counter() for name in FACET_FIELDS}
+        for item_id in hits:
+            for name in FACET_FIELDS:
+                value = self.documents[item_id].get(name)
+                if value is not None:
+                    facets[name][value] += 1
+
+        return SearchResult(
+            documents=[self.documents[item_id] for item_id in hits[query.skip:query.skip + query.limit]],
+            total=len(hits),
+            facets={name: dict(counts.most_common()) for name, counts in facets.items()},
+        )
+
+
+BACKENDS = {
+    "elasticsearch": ElasticsearchBackend,
+    "memory": InMemoryBackend,
+}
+
+
+def create_backend(name: Optional[str] = None) -> SearchBackend:
+    """
+    Instantiate a search backend by name, falling back to the in-memory index.
+
+    Args:
+        name: Key of BACKENDS (defaults to SEARCH_BACKEND)
+    """
+    name = name or settings.SEARCH_BACKEND
+    try:
+        return BACKENDS[name]()
+    except Exception as e:
+        logger.warning(f"Search backend {name!r} unavailable ({e}); using the in-memory index")
+        return InMemoryBackend()
+
+
+class SearchService:
+    """Keeps the search index in sync with items and runs queries against it"""
+
+    def __init__(self, backend: Optional[SearchBackend] = None):
+        self._backend = backend
+        self._built = False
+        self._retry_at = 0.0  # monotonic time before which searches skip the backend
+
+    @property
+    def backend(self) -> SearchBackend:
+        if self._backend is None:
+            self._backend = create_backend()
+        return self._backend
+
+    async def setup(self) -> None:
+        """Create the index if it does not exist"""
+        await self.backend.setup()
+
+    async def startup(self, item_repo: Any) -> None:
+        """
+        Prepare the index when the API starts.
+
+        The in-process index starts empty, so it is filled from the database.
+        An Elasticsearch index that was just created (or whose last full
+        reindex never finished) is filled by a worker; searches use the
+        database until it is done.
+        """
+        if self.backend.name == "memory":
+            indexed = await self.reindex(item_repo)
+            logger.info(f"In-memory search index built with {indexed} items")
+            return
+        await self.setup()
+        if not await self.backend.is_built():
+            from app.workers.search_tasks import reindex_items
+            reindex_items.delay()
+            logger.info("Search index not built yet; reindex enqueued, searching the database until it finishes")
+
+    async def index_items(self, items: Iterable[Any]) -> int:
+        """
+        Add or replace items in the index (bulk).
+
+        Returns:
+            Number of documents sent
+        """
+        documents = [item_document(item) for item in items]
+        if not documents:
+            return 0
+        try:
+            await self.backend.index(documents)
+        except Exception as e:
+            logger.warning(f"Search indexing of {len(documents)} items failed: {e}")
+            return 0
+        return len(documents)
+
+    async def delete_items(self, item_ids: Iterable[UUID]) -> None:
+        """Remove items from the index (bulk)"""
+        ids = [str(item_id) for item_id in item_ids]
+        if not ids:
+            return
+        try:
+            await self.backend.delete(ids)
+        except Exception as e:
+            logger.warning(f"Search delete of {len(ids)} items failed: {e}")
+
+    async def reindex(self, item_repo: Any, chunk_size: Optional[int] = None) -> int:
+        """
+        Index every item in the database, one bulk request per chunk.
+
+        Items are streamed from a server-side cursor, so memory stays
+        bounded by ``chunk_size`` however large the table is.
+
+        Documents of deleted items are only dropped by ``delete_items``;
+        recreate the index to purge strays.
+
+        Args:
+            item_repo: ItemRepository to read items from
+            chunk_size: Items per chunk (defaults to SEARCH_BULK_CHUNK_SIZE)
+
+        Returns:
+            Number of indexed items
+        """
+        chunk_size = chunk_size or settings.SEARCH_BULK_CHUNK_SIZE
+        await self.setup()
+        indexed = 0
+        async for chunk in item_repo.stream(chunk_size=chunk_size):
+            await self.backend.index([item_document(item) for item in chunk])
+            indexed += len(chunk)
+        await self.backend.mark_built()
+        return indexed
+
+    async def search(self, **params: Any) -> SearchResult:
+        """
+        Ranked, filtered, faceted item search.
+
+        Args:
+            **params: SearchQuery fields (query, item_type, category, status,
+                date_from, date_to, location, fuzzy, skip, limit)
+
+        Returns:
+            Page of item documents with total hits and facet counts
+
+        Raises:
+            SearchUnavailableError: The index is not built yet, or the
+                backend failed within the last SEARCH_RETRY_SECONDS
+            Exception: Backend errors, so callers can fall back to the database
+        """
+        if time.monotonic() < self._retry_at:
+            raise SearchUnavailableError("Search backend unavailable, retrying later")
+        try:
+            if not self._built:
+                self._built = await self.backend.is_built()
+                if not self._built:
+                    self._retry_at = time.monotonic() + settings.SEARCH_RETRY_SECONDS
+                    raise SearchUnavailableError("Search index is still being built")
+            return await self.backend.search(SearchQuery(**params))
+        except SearchUnavailableError:
+            raise
+        except Exception:
+            self._retry_at = time.monotonic() + settings.SEARCH_RETRY_SECONDS
+            raise
+
+    async def close(self) -> None:
+        if self._backend is not None:
+            await self._backend.close()
+
+
+search_service = SearchService()
@@ -9,6 +9,8 @@ celery_app = Celery(
     include=[
         "app.workers.email_tasks",
         "app.workers.matching_tasks",
+        "app.workers.embedding_tasks",
+        "app.workers.search_tasks",
     ]
 )
 
@@ -36,4 +38,16 @@ celery_app.conf.beat_schedule = {
         "task": "app.workers.matching_tasks.run_matching_for_all_items",
         "schedule": 3600,  # Run every hour
     },
+    "rebuild-blocking-index": {
+        "task": "app.workers.matching_tasks.rebuild_blocking_index",
+        "schedule": 24 * 3600,  # Run daily
+    },
+    "reindex-search": {
+        "task": "app.workers.search_tasks.reindex_items",
+        "schedule": 24 * 3600,  # Run daily
+    },
+    "rebuild-embedding-index": {
+        "task": "app.workers.embedding_tasks.rebuild_embedding_index",
+        "schedule": 3600,  # Run every hour
+    },
 }
@@ -0,0 +1,56 @@
+from app.workers.celery_app import celery_app
+from uuid import UUID
+import asyncio
+
+from app.database import task_session
+from app.models.item import ItemType
+from app.repositories import ItemRepository, ItemEmbeddingRepository
+from app.services.embeddings import EmbeddingService
+from app.services.image_loader import image_loader
+
+
+@celery_app.task(name="app.workers.embedding_tasks.compute_item_embeddings")
+def compute_item_embeddings(item_id: str):
+    """
+    Compute and store CLIP embeddings for an item.
+    Triggered when an item is created or its text/images change; once the
+    embeddings are stored, matching is re-run so the item's ANN neighbours
+    are scored too.
+    
+    Args:
+        item_id: Item UUID as string
+    """
+    async def _run():
+        try:
+            async with task_session() as db:
+                item = await ItemRepository(db).get(UUID(item_id))
+                if not item:
+                    return False
+                return await EmbeddingService(ItemEmbeddingRepository(db)).refresh_item(item)
+        finally:
+            # The pooled client belongs to this task's event loop
+            await image_loader.close()
+    
+    stored = asyncio.run(_run())
+    if stored:
+        from app.workers.matching_tasks import run_matching_for_item
+        run_matching_for_item.delay(item_id)
+    return {"status": "completed", "item_id": item_id, "stored": stored}
+
+
+@celery_app.task(name="app.workers.embedding_tasks.rebuild_embedding_index")
+def rebuild_embedding_index():
+    """
+    Rebuild the per-type ANN indexes from stored embeddings.
+    Scheduled task that runs periodically.
+    """
+    async def _run():
+        async with task_session() as db:
+            service = EmbeddingService(ItemEmbeddingRepository(db))
+            return {
+                item_type.value: await service.rebuild_index(item_type)
+                for item_type in ItemType
+            }
+    
+    sizes = asyncio.run(_run())
+    return {"status": "completed", "indexed": sizes}
@@ -2,44 +2,113 @@ from app.workers.celery_app import celery_app
 from typing import List
 from uuid import UUID
 import asyncio
+import logging
 
+from kombu.exceptions import OperationalError as BrokerError
+from sqlalchemy.exc import InterfaceError, OperationalError, TimeoutError as PoolTimeoutError
 
-@celery_app.task(name="app.workers.matching_tasks.run_matching_for_item")
-def run_matching_for_item(item_id: str):
+logger = logging.getLogger(__name__)
+
+# Connection-level failures worth retrying; anything else is a bug or bad
+# input and would fail again on every retry
+TRANSIENT_ERRORS = (OperationalError, InterfaceError, PoolTimeoutError, BrokerError, ConnectionError, TimeoutError)
+
+
+@celery_app.task(
+    name="app.workers.matching_tasks.run_matching_for_item",
+    bind=True,
+    acks_late=True,
+    autoretry_for=TRANSIENT_ERRORS,
+    retry_backoff=True,
+    retry_kwargs={"max_retries": 3},
+)
+def run_matching_for_item(self, item_id: str):
     """
     Run matching algorithm for a specific item.
     
+    Uses its own database session and scores candidates in the worker's
+    process pool; the item's nearest neighbours in the CLIP ANN index are
+    scored alongside its block. Matches are upserted, so retries and
+    duplicate deliveries are safe. Only TRANSIENT_ERRORS are retried.
+    
     Args:
         item_id: Item UUID as string
     """
-    print(f"Running matching algorithm for item {item_id}")
+    logger.info(f"Running matching algorithm for item {item_id}")
+    
+    from app.database import task_session
+    from app.repositories import ItemRepository, MatchRepository, ItemEmbeddingRepository
+    from app.services.embeddings import EmbeddingService
+    from app.services.matching import MatchingService
+    from app.workers.pool import get_scoring_pool
     
-    # TODO: Implement actual matching algorithm
-    # 1. Get item details
-    # 2. Search for potential matches (opposite type)
-    # 3. Calculate similarity scores
-    # 4. Create match records
-    # 5. Send notifications
+    async def _run():
+        async with task_session() as db:
+            service = MatchingService(
+                ItemRepository(db), MatchRepository(db),
+                executor=get_scoring_pool(),
+                embedding_service=EmbeddingService(ItemEmbeddingRepository(db)),
+            )
+            return await service.process_matches_for_item(UUID(item_id))
     
-    return {"status": "completed", "item_id": item_id, "matches_found": 0}
+    counts = asyncio.run(_run())
+    return {
+        "status": "completed",
+        "item_id": item_id,
+        "matches_found": counts["created"] + counts["updated"],
+        **counts,
+    }
 
 
 @celery_app.task(name="app.workers.matching_tasks.run_matching_for_all_items")
-def run_matching_for_all_items():
+def run_matching_for_all_items(full: bool = False):
     """
     Run matching algorithm for all active items.
     Scheduled task that runs periodically.
+    
+    By default only items created or edited since the previous run are
+    rescored (see MatchingService.run_incremental_matching). Pass
+    ``full=True`` to rescore every lost/found block from scratch.
+    
+    Args:
+        full: Force a full blocked all-pairs run
     """
-    print("Running matching algorithm for all active items")
+    print(f"Running {'full' if full else 'incremental'} matching for active items")
     
-    # TODO: Implement batch matching
-    # 1. Get all active lost items
-    # 2. Get all active found items
-    # 3. Run matching algorithm
-    # 4. Create match records
-    # 5. Send notifications
+    from app.database import task_session
+    from app.repositories import ItemRepository, MatchRepository, MatchingStateRepository
+    from app.services.matching import MatchingService
     
-    return {"status": "completed", "items_processed": 0}
+    async def _run():
+        async with task_session() as db:
+            state_repo = MatchingStateRepository(db)
+            service = MatchingService(ItemRepository(db), MatchRepository(db), state_repo)
+            if not full:
+                return await service.run_incremental_matching()
+            return await service.run_full_matching()
+    
+    stats = asyncio.run(_run())
+    return {"status": "completed", **stats}
+
+
+@celery_app.task(name="app.workers.matching_tasks.rebuild_blocking_index")
+def rebuild_blocking_index():
+    """
+    Rebuild the candidate blocking index from the items table.
+    Scheduled task that runs daily; the API also enqueues it at startup
+    when active items are missing from the index (e.g. after first deploy).
+    """
+    print("Rebuilding matching blocking index")
+    
+    from app.database import task_session
+    from app.repositories import ItemRepository
+    
+    async def _run():
+        async with task_session() as db:
+            return await ItemRepository(db).rebuild_blocks()
+    
+    indexed = asyncio.run(_run())
+    return {"status": "completed", "items_indexed": indexed}
 
 
 @celery_app.task(name="app.workers.matching_tasks.cleanup_expired_items")
@@ -47,15 +116,52 @@ def cleanup_expired_items():
     """
     Mark expired items as expired.
     Scheduled task that runs periodically.
+    
+    Expired items are streamed in partitions, so memory stays bounded however
+    many there are. Each partition is marked expired with one bulk UPDATE
+    (which also drops the items from the blocking index), its owners are
+    notified with one bulk INSERT, and the search index is updated.
     """
     print("Cleaning up expired items")
     
-    # TODO: Implement cleanup
-    # 1. Get all items past expiry date
-    # 2. Mark as expired
-    # 3. Send notifications to owners
+    from app.database import task_session
+    from app.models.item import ItemStatus
+    from app.repositories import ItemRepository, NotificationRepository
+    from app.services.search import SearchService
     
-    return {"status": "completed", "items_expired": 0}
+    async def _run():
+        # Fresh service: its client belongs to this task's event loop
+        search = SearchService()
+        expired = 0
+        try:
+            async with task_session() as db:
+                item_repo = ItemRepository(db)
+                notification_repo = NotificationRepository(db)
+                
+                async for items in item_repo.stream_expired_items():
+                    await item_repo.bulk_update(
+                        [{"id": item.id, "status": ItemStatus.EXPIRED} for item in items]
+                    )
+                    await notification_repo.bulk_create([
+                        {
+                            "user_id": item.user_id,
+                            "type": "expiry",
+                            "title": "Item Expired",
+                            "message": f"Your item '{item.title}' has expired and is no longer listed",
+                            "link": f"/items/{item.id}",
+                        }
+                        for item in items
+                    ])
+                    # bulk_update reloaded the instances, so they carry the new status
+                    if search.backend.name != "memory":
+                        await search.index_items(items)
+                    expired += len(items)
+        finally:
+            await search.close()
+        return expired
+    
+    expired = asyncio.run(_run())
+    return {"status": "completed", "items_expired": expired}
 
 
 @celery_app.task(name="app.workers.matching_tasks.calculate_similarity")
@@ -89,68 +195,29 @@ def calculate_similarity(lost_item_data: dict, found_item_data: dict) -> float:
     except ImportError:
         print("scikit-learn not found")
         
-    # CLIP AI Matching (Image-Text & Image-Image)
+    # CLIP AI Matching (Image-Text & Image-Image) on stored embeddings
     try:
-        import torch
-        from app.services.ai_model import ai_service
-        import requests
-        from PIL import Image
-        from io import BytesIO
-
-        # Ensure model is loaded
-        if not ai_service.model:
-            pass # Skipping if model failed to load or not installed
-
-        # Helpers
-        def load_image(url_or_path):
-            try:
-                if url_or_path.startswith("http"):
-                    response = requests.get(url_or_path, timeout=5)
-                    return Image.open(BytesIO(response.content))
-                else:
-                    return Image.open(url_or_path) # Local path
-            except Exception:
-                return None
-
-        # Get inputs
-        lost_img_path = lost_item_data.get('images', [None])[0]
-        found_img_path = found_item_data.get('images', [None])[0]
+        import numpy as np
+        
+        lost_image, lost_text, found_image, found_text = _get_item_vectors(lost_item_data, found_item_data)
         
-        lost_image = load_image(lost_img_path) if lost_img_path else None
-        found_image = load_image(found_img_path) if found_img_path else None
-
         clip_score = 0.0
         
         # Case 1: Image <-> Image
-        if lost_image and found_image and ai_service.model:
-            inputs = ai_service.processor(images=[lost_image, found_image], return_tensors="pt", padding=True)
-            with torch.no_grad():
-                outputs = ai_service.model.get_image_features(**inputs)
-            
-            # Cosine similarity between two image vectors
-            cos = torch.nn.CosineSimilarity(dim=1, eps=1e-6)
-            clip_score = cos(outputs[0].unsqueeze(0), outputs[1].unsqueeze(0)).item()
+        if lost_image is not None and found_image is not None:
+            clip_score = float(np.dot(lost_image, found_image))
             score += clip_score * 0.4  # Big boost if images match
             
         # Case 2: Image <-> Text (Multimodal)
-        elif (lost_image or found_image) and ai_service.model:
-            # One has image, match with other's text
-            image_input = lost_image or found_image
-            text_input = found_text_full if lost_image else lost_text_full
-            # Truncate text to fit context window
-            text_input = text_input[:77] 
-            
-            inputs = ai_service.processor(text=[text_input], images=image_input, return_tensors="pt", padding=True)
-            with torch.no_grad():
-                img_embed = ai_service.model.get_image_features(pixel_values=inputs['pixel_values'])
-                text_embed = ai_service.model.get_text_features(input_ids=inputs['input_ids'], attention_mask=inputs['attention_mask'])
-            
-            cos = torch.nn.CosineSimilarity(dim=1, eps=1e-6)
-            clip_score = cos(img_embed, text_embed).item()
+        elif lost_image is not None and found_text is not None:
+            clip_score = float(np.dot(lost_image, found_text))
             score += clip_score * 0.3 # Moderate boost for Image-Text match
+        elif found_image is not None and lost_text is not None:
+            clip_score = float(np.dot(found_image, lost_text))
+            score += clip_score * 0.3
             
     except ImportError:
-        print("Torch/Transformers not installed, skipping AI matching")
+        print("numpy not installed, skipping AI matching")
     except Exception as e:
         print(f"CLIP Error: {e}")
 
@@ -158,9 +225,56 @@ def calculate_similarity(lost_item_data: dict, found_item_data: dict) -> float:
     if lost_item_data.get('category') == found_item_data.get('category'):
         score += 0.2
     
-    return min(score, 1.0)
-    
     # Date proximity (10% weight)
-    # TODO: Implement date comparison
+    from app.services.features import date_proximity
+    score += date_proximity(lost_item_data.get('date_lost_found'), found_item_data.get('date_lost_found')) * 0.1
     
     return min(score, 1.0)
+
+
+def _get_item_vectors(lost_item_data: dict, found_item_data: dict):
+    """
+    Normalized CLIP vectors for both items of a pair.
+    
+    Vectors come from the embedding store; CLIP only runs for items that have
+    not been embedded yet (e.g. ad-hoc dicts without an ``id``).
+    
+    Returns:
+        (lost image, lost text, found image, found text), each possibly None
+    """
+    from app.database import task_session
+    from app.repositories import ItemEmbeddingRepository
+    from app.services.ai_model import ai_service
+    from app.services.embeddings import compute_items_vectors, decode_vector
+    from app.services.image_loader import image_loader
+    
+    pair = (lost_item_data, found_item_data)
+    item_ids = [UUID(str(data["id"])) for data in pair if data.get("id")]
+    
+    async def _load():
+        stored = {}
+        if item_ids:
+            async with task_session() as db:
+                stored = await ItemEmbeddingRepository(db).get_by_items(item_ids)
+        
+        vectors = [None] * len(pair)
+        missing = []
+        for i, data in enumerate(pair):
+            row = stored.get(UUID(str(data["id"]))) if data.get("id") else None
+            if row is not None and row.model_name == ai_service.model_name:
+                vectors[i] = (decode_vector(row.image_embedding), decode_vector(row.text_embedding))
+            else:
+                missing.append(i)
+        
+        # Both images are fetched concurrently
+        try:
+            computed = await compute_items_vectors([pair[i] for i in missing])
+        finally:
+            # The pooled client belongs to this task's event loop
+            await image_loader.close()
+        for i, item_vectors in zip(missing, computed):
+            vectors[i] = item_vectors
+        return vectors
+    
+    lost_vectors, found_vectors = asyncio.run(_load())
+    return (*lost_vectors, *found_vectors)
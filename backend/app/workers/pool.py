@@ -0,0 +1,27 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+import multiprocessing
+
+from app.config import settings
+
+# One pool per worker process, created on first use
+_scoring_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_scoring_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Process pool for CPU-bound match scoring.
+    
+    Uses the ``spawn`` start method so pool processes start clean instead of
+    inheriting the Celery child's event loop and DB connections. Returns None
+    when MATCHING_POOL_WORKERS is 0 (score in-process).
+    """
+    global _scoring_pool
+    if settings.MATCHING_POOL_WORKERS <= 0:
+        return None
+    if _scoring_pool is None:
+        _scoring_pool = ProcessPoolExecutor(
+            max_workers=settings.MATCHING_POOL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _scoring_pool
@@ -0,0 +1,30 @@
+from app.workers.celery_app import celery_app
+import asyncio
+
+
+@celery_app.task(name="app.workers.search_tasks.reindex_items")
+def reindex_items():
+    """
+    Re-index every item into the search index.
+    Scheduled task that runs daily; repairs writes that bypassed the API
+    (e.g. bulk status updates) and updates missed while the backend was down.
+    """
+    print("Re-indexing items for search")
+    
+    from app.database import task_session
+    from app.repositories import ItemRepository
+    from app.services.search import SearchService
+    
+    async def _run():
+        # Fresh service: its client belongs to this task's event loop
+        service = SearchService()
+        if service.backend.name == "memory":
+            return service.backend.name, 0  # the in-process index lives in the API process
+        try:
+            async with task_session() as db:
+                return service.backend.name, await service.reindex(ItemRepository(db))
+        finally:
+            await service.close()
+    
+    backend, indexed = asyncio.run(_run())
+    return {"status": "completed", "backend": backend, "items_indexed": indexed}
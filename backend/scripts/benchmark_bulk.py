@@ -0,0 +1,132 @@
+"""
+Benchmark BaseCRUD bulk writes against the per-row paths they replaced.
+
+Counts database round trips (statements sent to the driver) and wall time
+for creating and then updating N notifications:
+
+- legacy create: add_all + flush + one refresh SELECT per row
+- legacy update: one UPDATE per row
+- bulk_create:   INSERT ... RETURNING, one statement per chunk
+- bulk_update:   UPDATE ... FROM (VALUES ...), one statement per chunk
+
+Everything runs inside one transaction that is rolled back, against the
+database at DATABASE_URL.
+
+Usage (from backend/):
+    python scripts/benchmark_bulk.py
+    python scripts/benchmark_bulk.py --rows 100 1000 10000 --chunk-size 500
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import event, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.config import settings
+from app.models.notification import Notification
+from app.models.user import User
+from app.repositories.notification import NotificationRepository
+
+
+class RoundTrips:
+    """Counts statements executed on an engine"""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def notification_rows(user_id, n):
+    return [
+        {"user_id": user_id, "type": "benchmark", "title": f"Benchmark {i}", "message": "bulk write benchmark"}
+        for i in range(n)
+    ]
+
+
+async def legacy_create(db, rows):
+    objs = [Notification(**row) for row in rows]
+    db.add_all(objs)
+    await db.flush()
+    for obj in objs:
+        await db.refresh(obj)
+    return objs
+
+
+async def legacy_update(db, updates):
+    for update_data in updates:
+        await db.execute(
+            update(Notification)
+            .where(Notification.id == update_data["id"])
+            .values(is_read=update_data["is_read"])
+        )
+    await db.flush()
+
+
+async def measure(counter, label, n, coroutine):
+    counter.count = 0
+    started = time.perf_counter()
+    result = await coroutine
+    seconds = time.perf_counter() - started
+    print(f"{label:<14}{n:>8}{counter.count:>14}{seconds * 1000:>12.1f}")
+    return result
+
+
+async def run(sizes, chunk_size):
+    engine = create_async_engine(settings.DATABASE_URL)
+    counter = RoundTrips(engine)
+
+    print(f"{'path':<14}{'rows':>8}{'round trips':>14}{'ms':>12}")
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        db = AsyncSession(bind=connection, expire_on_commit=False)
+        try:
+            user = User(
+                email=f"bulk-benchmark-{uuid.uuid4().hex}@example.com",
+                hashed_password="-",
+                full_name="Bulk Benchmark",
+            )
+            db.add(user)
+            await db.flush()
+            repo = NotificationRepository(db)
+
+            for n in sizes:
+                rows = notification_rows(user.id, n)
+
+                legacy = await measure(counter, "legacy create", n, legacy_create(db, rows))
+                await measure(
+                    counter, "legacy update", n,
+                    legacy_update(db, [{"id": obj.id, "is_read": True} for obj in legacy]),
+                )
+
+                created = await measure(counter, "bulk_create", n, repo.bulk_create(rows, chunk_size=chunk_size))
+                await measure(
+                    counter, "bulk_update", n,
+                    repo.bulk_update([{"id": obj.id, "is_read": True} for obj in created], chunk_size=chunk_size),
+                )
+                db.expunge_all()
+        finally:
+            await db.close()
+            await transaction.rollback()
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--chunk-size", type=int, default=settings.DATABASE_BULK_CHUNK_SIZE)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
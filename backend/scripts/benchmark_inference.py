@@ -0,0 +1,128 @@
+"""
+Benchmark CLIP inference backends and check them against fp32 torch.
+
+Each backend runs in its own process so resident memory is measured in
+isolation. Reports per-request latency (p50/p95), batched throughput, RSS,
+and embedding parity (cosine to the fp32 embeddings and zero-shot top-1
+label agreement on the category prompts).
+
+Usage (from backend/):
+    python scripts/benchmark_inference.py
+    python scripts/benchmark_inference.py --backends torch torch_int8 --images path/to/photos
+"""
+
+from pathlib import Path
+import argparse
+import multiprocessing
+import sys
+import time
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+
+from app.services.inference_backends import BACKENDS, check_parity
+
+CATEGORIES = [
+    "Electronics", "Books", "Clothing", "Accessories", "ID Cards",
+    "Keys", "Bags", "Sports Equipment", "Water Bottles", "Others"
+]
+
+
+def load_images(directory, count):
+    """Images from a directory, or random noise images if none given"""
+    from PIL import Image
+
+    if directory:
+        paths = sorted(p for p in Path(directory).iterdir() if p.suffix.lower() in {".jpg", ".jpeg", ".png", ".webp"})
+        return [Image.open(p).convert("RGB") for p in paths[:count]]
+
+    rng = np.random.default_rng(0)
+    return [Image.fromarray(rng.integers(0, 255, (480, 640, 3), dtype=np.uint8)) for _ in range(count)]
+
+
+def rss_mb() -> float:
+    """Resident set size of this process in MB (Linux)"""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def run_backend(name, image_dir, count, batch_size, results):
+    from app.config import settings
+    from app.services.ai_model import ai_service
+
+    settings.AI_INFERENCE_BACKEND = name
+    images = load_images(image_dir, count)
+    if ai_service.model is None or ai_service.backend_name != name:
+        results[name] = {"error": f"backend '{name}' could not be loaded"}
+        return
+
+    ai_service.embed_images(images[:1])  # warm-up
+
+    latencies = []
+    for image in images:
+        start = time.perf_counter()
+        ai_service.embed_images([image])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    embeddings = np.vstack([
+        ai_service.embed_images(images[i:i + batch_size])
+        for i in range(0, len(images), batch_size)
+    ])
+    batch_seconds = time.perf_counter() - start
+
+    labels = ai_service.embed_texts(CATEGORIES)
+    results[name] = {
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "images_per_s": len(images) / batch_seconds,
+        "rss_mb": rss_mb(),
+        "image_embeddings": embeddings,
+        "top1": np.argmax(embeddings @ labels.T, axis=1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--images", help="Directory of sample photos (defaults to synthetic images)")
+    parser.add_argument("--count", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=16)
+    args = parser.parse_args()
+
+    backends = ["torch"] + [b for b in args.backends if b != "torch"]
+    ctx = multiprocessing.get_context("spawn")
+    manager = ctx.Manager()
+    results = manager.dict()
+
+    for name in backends:
+        process = ctx.Process(target=run_backend, args=(name, args.images, args.count, args.batch_size, results))
+        process.start()
+        process.join()
+
+    reference = results.get("torch")
+    print(f"{'backend':<12}{'p50 ms':>9}{'p95 ms':>9}{'img/s':>9}{'RSS MB':>9}{'cos min':>9}{'cos mean':>10}{'top-1':>8}")
+    for name in backends:
+        result = results.get(name) or {"error": "process crashed"}
+        if "error" in result:
+            print(f"{name:<12}  {result['error']}")
+            continue
+
+        cos_min = cos_mean = agreement = float("nan")
+        if reference and "error" not in reference:
+            parity = check_parity(reference["image_embeddings"], result["image_embeddings"])
+            cos_min, cos_mean = parity["cosine_min"], parity["cosine_mean"]
+            agreement = float(np.mean(reference["top1"] == result["top1"]))
+
+        print(
+            f"{name:<12}{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}{result['images_per_s']:>9.1f}"
+            f"{result['rss_mb']:>9.0f}{cos_min:>9.4f}{cos_mean:>10.4f}{agreement:>8.2%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Evaluate match scoring against the labeled fixture set.
+
+For every lost item with a known match, same-category found items are ranked
+by score (as the matching pipeline blocks by category) and ranking metrics
+are reported. Pair-level precision/recall use the pipeline's acceptance rule:
+inside the date window and above the score threshold.
+
+Usage (from backend/):
+    python scripts/evaluate_matching.py
+    python scripts/evaluate_matching.py --weights title=0.3 date=0.2 --threshold 0.35
+"""
+
+from pathlib import Path
+import argparse
+import json
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+
+from app.config import settings
+from app.services.features import fusion_weights
+from app.services.scoring import BatchScorer
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "matching_eval.json"
+
+# Text-only weighting used before date and canonical location signals existed
+LEGACY_WEIGHTS = {"title": 0.4, "description": 0.3, "tags": 0.2, "location": 0.1, "date": 0.0}
+
+
+def evaluate(scorer: BatchScorer, items, matches, threshold: float, window_days: int):
+    lost = [item for item in items if item["type"] == "lost"]
+    found = [item for item in items if item["type"] == "found"]
+    positives = {tuple(pair) for pair in matches}
+
+    lost_vectors, found_vectors = scorer.vectorize(lost), scorer.vectorize(found)
+    scores = scorer.score_matrix(lost_vectors, found_vectors)
+    same_category = np.array([[l["category"] == f["category"] for f in found] for l in lost])
+    in_window = np.abs(lost_vectors.dates[:, None] - found_vectors.dates[None, :]) <= window_days
+    labels = np.array([[(l["key"], f["key"]) in positives for f in found] for l in lost])
+
+    hits_at_1, hits_at_3, reciprocal_ranks = [], [], []
+    for i in range(len(lost)):
+        if not labels[i].any():
+            continue
+        candidates = np.flatnonzero(same_category[i])
+        ranked = candidates[np.argsort(-scores[i, candidates], kind="stable")]
+        rank = next(r for r, j in enumerate(ranked, start=1) if labels[i, j])
+        hits_at_1.append(rank == 1)
+        hits_at_3.append(rank <= 3)
+        reciprocal_ranks.append(1.0 / rank)
+
+    accepted = same_category & in_window & (scores > threshold)
+    true_positives = int((accepted & labels).sum())
+    precision = true_positives / accepted.sum() if accepted.any() else 0.0
+    recall = true_positives / labels.sum()
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+    positive_scores = scores[labels]
+    negative_scores = scores[same_category & ~labels]
+    return {
+        "P@1": np.mean(hits_at_1),
+        "R@3": np.mean(hits_at_3),
+        "MRR": np.mean(reciprocal_ranks),
+        "precision": precision,
+        "recall": recall,
+        "F1": f1,
+        "pos mean": positive_scores.mean(),
+        "neg mean": negative_scores.mean() if negative_scores.size else 0.0,
+    }
+
+
+def parse_weights(values):
+    weights = {}
+    for value in values or []:
+        name, _, weight = value.partition("=")
+        weights[name] = float(weight)
+    return weights
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=str(FIXTURES))
+    parser.add_argument("--weights", nargs="*", metavar="SIGNAL=WEIGHT", help="Override configured weights")
+    parser.add_argument("--threshold", type=float, default=settings.SIMILARITY_THRESHOLD)
+    parser.add_argument("--window-days", type=int, default=settings.MATCHING_DATE_WINDOW_DAYS)
+    args = parser.parse_args()
+
+    with open(args.fixtures) as f:
+        fixtures = json.load(f)
+
+    configurations = {
+        "legacy": LEGACY_WEIGHTS,
+        "configured": dict(fusion_weights(), **parse_weights(args.weights)),
+    }
+
+    metrics = None
+    for name, weights in configurations.items():
+        scorer = BatchScorer(weights, date_window_days=args.window_days)
+        result = evaluate(scorer, fixtures["items"], fixtures["matches"], args.threshold, args.window_days)
+        if metrics is None:
+            metrics = list(result)
+            print(f"{'weights':<12}" + "".join(f"{metric:>10}" for metric in metrics))
+        print(f"{name:<12}" + "".join(f"{result[metric]:>10.3f}" for metric in metrics))
+
+    print(f"\nconfigured: {configurations['configured']}, threshold {args.threshold}, window {args.window_days}d")
+
+
+if __name__ == "__main__":
+    main()
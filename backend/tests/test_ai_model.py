@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.config import settings
+from app.services.ai_model import AIModelService
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "MODEL_CACHE_DIR", str(tmp_path))
+    service = AIModelService()
+    monkeypatch.setattr(AIModelService, "_model", None)
+    monkeypatch.setattr(AIModelService, "_label_sets", {})
+    monkeypatch.setattr(AIModelService, "_label_embeddings", {})
+    monkeypatch.setattr(
+        service, "embed_texts", lambda texts: np.ones((len(texts), 4), dtype=np.float32) / 2
+    )
+    yield service
+    # load_model assigns on the singleton instance; drop what the test left behind
+    for name in ("_model", "_processor", "_load_failed_at", "embed_texts"):
+        service.__dict__.pop(name, None)
+
+
+def test_labels_registered_before_load_are_cached_under_the_loaded_backend(service, tmp_path):
+    service.register_labels(["Phone", "Wallet"])
+    assert service._label_embeddings == {}
+
+    AIModelService._model = SimpleNamespace(name="onnx_int8")
+    for labels in service._label_sets.values():
+        service.label_embeddings(labels)
+
+    key = service._label_key(["Phone", "Wallet"])
+    assert service.backend_name == "onnx_int8"
+    assert set(service._label_embeddings) == {key}
+    assert (tmp_path / "label_embeddings" / f"{key}.npy").exists()
+
+
+def test_label_cache_survives_a_restart(service):
+    AIModelService._model = SimpleNamespace(name="torch")
+    computed = service.label_embeddings(["Keys"])
+
+    AIModelService._label_embeddings = {}
+    service.embed_texts = lambda texts: pytest.fail("label embeddings recomputed")
+
+    assert service.cached_label_embeddings(["Keys"]) == pytest.approx(computed)
+    assert service.cached_label_embeddings(["Bag"]) is None
+
+
+def test_rank_labels_is_a_softmax_over_scaled_similarities(service):
+    AIModelService._model = SimpleNamespace(name="torch", logit_scale=100.0)
+    labels = ["Phone", "Wallet"]
+    label_embeddings = np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+
+    results = service.rank_labels(np.array([0.8, 0.6], dtype=np.float32), label_embeddings, labels)
+
+    assert [label for label, _ in results] == ["Phone", "Wallet"]
+    assert sum(probability for _, probability in results) == pytest.approx(1.0)
+
+
+def test_failed_load_is_not_retried_until_the_backoff_expires(service, monkeypatch):
+    from app.services import ai_model
+
+    attempts = []
+
+    class UnreachableProcessor:
+        @staticmethod
+        def from_pretrained(name):
+            attempts.append(name)
+            raise OSError("model hub unreachable")
+
+    clock = [1000.0]
+    monkeypatch.setattr(ai_model, "CLIPProcessor", UnreachableProcessor)
+    monkeypatch.setattr(ai_model, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    monkeypatch.setattr(AIModelService, "_processor", None)
+    monkeypatch.setattr(AIModelService, "_load_failed_at", None)
+
+    assert service.model is None
+    assert service.model is None
+    assert len(attempts) == 1
+
+    clock[0] += settings.AI_MODEL_RETRY_SECONDS + 1
+    assert service.model is None
+    assert len(attempts) == 2
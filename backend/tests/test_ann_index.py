@@ -0,0 +1,58 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.services.ann_index import IVFIndex
+
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(7)
+    matrix = rng.normal(size=(400, 16)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def ids(vectors):
+    return [f"item-{i}" for i in range(len(vectors))]
+
+
+def test_search_with_every_cluster_probed_is_exact(vectors, ids):
+    index = IVFIndex.build(vectors, ids, n_lists=10)
+    query = vectors[42]
+
+    hits = index.search(query, k=5, nprobe=10)
+
+    expected = np.argsort(-(vectors @ query))[:5]
+    assert [item_id for item_id, _ in hits] == [ids[i] for i in expected]
+    assert hits[0] == ("item-42", pytest.approx(1.0, abs=1e-5))
+    assert [score for _, score in hits] == sorted((score for _, score in hits), reverse=True)
+
+
+def test_default_probe_finds_the_vector_itself(vectors, ids):
+    index = IVFIndex.build(vectors, ids, nprobe=2)
+
+    assert len(index) == 400
+    assert all(index.search(vectors[i], k=1)[0][0] == ids[i] for i in range(0, 400, 37))
+
+
+def test_save_and_load_round_trip(vectors, ids, tmp_path):
+    index = IVFIndex.build(vectors, ids, n_lists=8, nprobe=3)
+    path = tmp_path / "found"
+    index.save(str(path))
+    IVFIndex.build(vectors[:10], ids[:10]).save(str(path))  # atomic replace
+    index.save(str(path))
+
+    loaded = IVFIndex.load(str(path))
+
+    assert loaded.nprobe == 3
+    assert len(loaded) == len(index)
+    assert loaded.search(vectors[5], k=3) == index.search(vectors[5], k=3)
+    assert [p.name for p in tmp_path.iterdir()] == ["found"]
+
+
+def test_empty_index_returns_no_hits(vectors):
+    index = IVFIndex.build(np.zeros((0, 16), dtype=np.float32), [])
+
+    assert len(index) == 0
+    assert index.search(vectors[0], k=5) == []
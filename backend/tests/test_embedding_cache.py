@@ -0,0 +1,139 @@
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.config import settings
+from app.services.embedding_cache import DiskTier, EmbeddingCache, LRUTier, RedisTier, content_key
+
+
+class DictTier:
+    """Shared tier stand-in that counts reads"""
+
+    def __init__(self):
+        self.items = {}
+        self.reads = 0
+
+    def get(self, key):
+        self.reads += 1
+        return self.items.get(key)
+
+    def set(self, key, vector):
+        self.items[key] = vector
+
+
+class BrokenTier:
+    def get(self, key):
+        raise ConnectionError("redis down")
+
+    def set(self, key, vector):
+        raise ConnectionError("redis down")
+
+
+def vector(*values):
+    return np.array(values, dtype=np.float32)
+
+
+def test_keys_depend_on_content_and_model_version():
+    photo = b"\xff\xd8 jpeg bytes"
+
+    assert content_key(photo, "clip:torch") == content_key(bytes(photo), "clip:torch")
+    assert content_key(photo, "clip:torch") != content_key(photo + b"!", "clip:torch")
+    assert content_key(photo, "clip:torch") != content_key(photo, "clip:onnx_int8")
+
+
+def test_lru_evicts_the_least_recently_used_embedding():
+    lru = LRUTier(max_size=2)
+    lru.set("a", vector(1))
+    lru.set("b", vector(2))
+    lru.get("a")
+    lru.set("c", vector(3))
+
+    assert lru.get("b") is None
+    assert lru.get("a") is not None and lru.get("c") is not None
+
+
+def test_reads_fall_through_to_the_shared_tier_and_promote_hits():
+    cache = EmbeddingCache(backend="memory")
+    cache._shared = shared = DictTier()
+    shared.set("k", vector(0.6, 0.8))
+
+    assert cache.get("k").tolist() == pytest.approx([0.6, 0.8])
+    assert cache.get("k") is not None
+    assert shared.reads == 1  # second read served by the process LRU
+    assert cache.get("missing") is None
+
+
+def test_writes_reach_both_tiers():
+    cache = EmbeddingCache(backend="memory")
+    cache._shared = shared = DictTier()
+
+    cache.set("k", vector(1, 0))
+
+    assert cache.memory.get("k") is not None
+    assert "k" in shared.items
+
+
+def test_shared_tier_errors_are_misses():
+    cache = EmbeddingCache(backend="memory")
+    cache._shared = BrokenTier()
+
+    cache.set("k", vector(1, 0))
+    assert cache.get("k") is not None  # still in the LRU
+    assert cache.get("other") is None
+
+
+def test_disk_tier_round_trips_per_model_version(tmp_path):
+    tier = DiskTier(str(tmp_path))
+    torch_key = content_key(b"photo", "openai/clip-vit-base-patch32:torch")
+    onnx_key = content_key(b"photo", "openai/clip-vit-base-patch32:onnx_int8")
+
+    tier.set(torch_key, vector(0.6, 0.8))
+
+    assert tier.get(torch_key).tolist() == pytest.approx([0.6, 0.8])
+    assert tier.get(onnx_key) is None
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_redis_tier_stores_float32_bytes_with_a_ttl():
+    class FakeRedis:
+        def __init__(self):
+            self.data, self.ttls = {}, {}
+
+        def get(self, key):
+            return self.data.get(key)
+
+        def set(self, key, value, ex=None):
+            self.data[key], self.ttls[key] = value, ex
+
+    tier = RedisTier.__new__(RedisTier)
+    tier.ttl, tier._client = settings.EMBEDDING_CACHE_TTL, FakeRedis()
+
+    tier.set("clip:abc", vector(0.6, 0.8))
+
+    assert tier._client.ttls == {"emb:clip:abc": settings.EMBEDDING_CACHE_TTL}
+    assert tier.get("clip:abc").tolist() == pytest.approx([0.6, 0.8])
+    assert tier.get("clip:other") is None
+
+
+def test_image_bytes_are_embedded_once_per_model_version(monkeypatch):
+    from app.services import ai_model
+    from app.services.ai_model import AIModelService, ai_service
+
+    batches = []
+    monkeypatch.setattr(ai_model, "image_embedding_cache", EmbeddingCache(backend="memory"))
+    monkeypatch.setattr(ai_model, "decode_image", lambda data: data)
+    monkeypatch.setattr(
+        AIModelService, "embed_images",
+        lambda self, images: batches.append(list(images)) or np.ones((len(images), 2), dtype=np.float32),
+    )
+    monkeypatch.setattr(AIModelService, "_model", SimpleNamespace(name="torch"))
+
+    ai_service.embed_image_bytes([b"photo", b"other"])
+    ai_service.embed_image_bytes([b"photo"])  # same bytes, e.g. re-uploaded under a new URL
+    assert batches == [[b"photo", b"other"]]
+
+    AIModelService._model = SimpleNamespace(name="onnx_int8")
+    ai_service.embed_image_bytes([b"photo"])
+    assert batches[-1] == [b"photo"]
@@ -0,0 +1,76 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from sqlalchemy.dialects import postgresql
+
+from app.config import settings
+from app.models.item import ItemType
+from app.repositories.embedding import ItemEmbeddingCreate, ItemEmbeddingRepository
+from app.services.ai_model import ai_service
+from app.services.embeddings import EmbeddingIndex, EmbeddingService, decode_vector, encode_vector
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+
+    async def flush(self):
+        pass
+
+
+async def test_upsert_replaces_the_embeddings_of_an_item():
+    session = RecordingSession()
+
+    await ItemEmbeddingRepository(session).upsert(ItemEmbeddingCreate(
+        item_id=uuid.uuid4(), item_type=ItemType.LOST, model_name="clip", dim=2,
+        image_embedding=encode_vector([0.6, 0.8]),
+    ))
+
+    sql = str(session.statements[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (item_id) DO UPDATE SET" in sql
+    assert "image_embedding = excluded.image_embedding" in sql
+    assert "model_name = excluded.model_name" in sql
+
+
+class EmbeddingStore:
+    """In-memory ItemEmbeddingRepository keyed by item id"""
+
+    def __init__(self):
+        self.rows = {}
+
+    def add(self, item_type, vector):
+        item_id = uuid.uuid4()
+        self.rows[item_id] = SimpleNamespace(
+            item_id=item_id, item_type=item_type, model_name=ai_service.model_name,
+            image_embedding=encode_vector(vector), text_embedding=None,
+        )
+        return item_id
+
+    async def get_by_item(self, item_id):
+        return self.rows.get(item_id)
+
+    async def iter_active_by_type(self, item_type, model_name, chunk_size=1000):
+        yield [row for row in self.rows.values() if row.item_type == item_type and row.model_name == model_name]
+
+
+async def test_rebuilt_index_answers_opposite_type_lookups(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_INDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(EmbeddingIndex, "_indexes", {})
+    store = EmbeddingStore()
+    lost_id = store.add(ItemType.LOST, [1.0, 0.0, 0.0])
+    near = store.add(ItemType.FOUND, [0.9, 0.1, 0.0])
+    far = store.add(ItemType.FOUND, [0.0, 0.0, 1.0])
+    service = EmbeddingService(store)
+
+    assert await service.rebuild_index(ItemType.FOUND) == 2
+    hits = await service.find_candidates(SimpleNamespace(id=lost_id, type=ItemType.LOST), k=2)
+
+    assert [hit_id for hit_id, _ in hits] == [near, far]
+    assert decode_vector(encode_vector([0.5, 0.5])).tolist() == [0.5, 0.5]
@@ -0,0 +1,49 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.config import settings
+from app.services.features import canonical_location, date_proximity, location_id, UNKNOWN_LOCATION
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Main Library", "library"),
+    ("Central lib, 2nd floor", "library"),
+    ("library cafe", "cafeteria"),
+    ("Lab 3 room", "lab"),
+    ("Reading room", "library"),
+    ("Room 204, physics lab", "lab"),
+    ("Gym entrance", "gym"),
+    ("Near the main gate", "main_gate"),
+    ("Room 12", "classroom"),
+])
+def test_canonical_location(text, expected):
+    assert canonical_location(text) == expected
+
+
+@pytest.mark.parametrize("text", [None, "", "somewhere", "liberty square"])
+def test_canonical_location_unknown(text):
+    assert canonical_location(text) is None
+    assert location_id(text) == UNKNOWN_LOCATION
+
+
+def test_date_proximity_is_linear_over_the_window():
+    day = date(2024, 3, 1)
+
+    assert date_proximity(day, day, window_days=30) == 1.0
+    assert date_proximity(day, day + timedelta(days=15), window_days=30) == pytest.approx(0.5)
+    assert date_proximity(day + timedelta(days=15), day, window_days=30) == pytest.approx(0.5)
+    assert date_proximity(day, day + timedelta(days=30), window_days=30) == 0.0
+    assert date_proximity(day, day + timedelta(days=45), window_days=30) == 0.0
+
+
+def test_date_proximity_accepts_datetimes_and_iso_strings():
+    assert date_proximity(datetime(2024, 3, 1, 23, 59), "2024-03-11T08:00:00", window_days=20) == pytest.approx(0.5)
+
+
+def test_date_proximity_missing_date_and_default_window(monkeypatch):
+    monkeypatch.setattr(settings, "MATCHING_DATE_WINDOW_DAYS", 10)
+
+    assert date_proximity(None, date(2024, 3, 1)) == 0.0
+    assert date_proximity("", "2024-03-01") == 0.0
+    assert date_proximity(date(2024, 3, 1), date(2024, 3, 6)) == pytest.approx(0.5)
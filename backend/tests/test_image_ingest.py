@@ -0,0 +1,81 @@
+from io import BytesIO
+
+import pytest
+
+from app.services.image_ingest import FileTooLargeError, Image, decode_image, read_limited
+
+requires_pillow = pytest.mark.skipif(Image is None, reason="Pillow not installed")
+
+
+class FakeUpload:
+    def __init__(self, contents, size=None):
+        self.buffer = BytesIO(contents)
+        self.size = size
+        self.reads = 0
+
+    async def read(self, size=-1):
+        self.reads += 1
+        return self.buffer.read(size)
+
+
+def encode(image, format, **params):
+    buffer = BytesIO()
+    image.save(buffer, format=format, **params)
+    return buffer.getvalue()
+
+
+async def test_read_limited_returns_uploads_within_the_limit():
+    assert await read_limited(FakeUpload(b"x" * 100), max_size=100) == b"x" * 100
+
+
+async def test_read_limited_rejects_declared_size_without_reading():
+    upload = FakeUpload(b"x" * 10, size=1000)
+
+    with pytest.raises(FileTooLargeError):
+        await read_limited(upload, max_size=100)
+    assert upload.reads == 0
+
+
+async def test_read_limited_stops_once_the_stream_exceeds_the_limit():
+    with pytest.raises(FileTooLargeError):
+        await read_limited(FakeUpload(b"x" * (256 * 1024)), max_size=100 * 1024)
+
+
+@requires_pillow
+def test_large_jpeg_is_decoded_at_reduced_scale():
+    contents = encode(Image.new("RGB", (2000, 1000), "red"), "JPEG")
+
+    image = decode_image(contents, min_side=224)
+
+    # libjpeg's 1/4 scale is the smallest that keeps the short side >= 224
+    assert image.mode == "RGB"
+    assert image.size == (500, 250)
+
+
+@requires_pillow
+def test_large_palette_png_is_reduced_to_rgb():
+    contents = encode(Image.new("P", (1000, 500)), "PNG")
+
+    image = decode_image(contents, min_side=224)
+
+    assert image.mode == "RGB"
+    assert image.size == (500, 250)
+
+
+@requires_pillow
+def test_small_images_keep_their_size():
+    contents = encode(Image.new("L", (100, 80)), "PNG")
+
+    assert decode_image(contents, min_side=224).size == (100, 80)
+
+
+@requires_pillow
+def test_exif_orientation_is_applied_after_reduction():
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotated 90 degrees clockwise
+    contents = encode(Image.new("RGB", (1600, 800), "blue"), "JPEG", exif=exif.tobytes())
+
+    width, height = decode_image(contents, min_side=224).size
+
+    assert height > width
+    assert min(width, height) >= 224
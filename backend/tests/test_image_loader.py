@@ -0,0 +1,114 @@
+import asyncio
+from functools import partial
+
+import pytest
+
+from app.config import settings
+from app.services import image_loader as image_loader_module
+from app.services.image_loader import BoundedLRU, ImageLoader, httpx
+
+
+def test_bounded_lru_evicts_least_recently_used():
+    cache = BoundedLRU(max_size=6, size_of=len)
+    cache.set("a", b"aa")
+    cache.set("b", b"bb")
+    cache.get("a")
+    cache.set("c", b"cccc")
+
+    assert cache.get("a") == b"aa"
+    assert cache.get("b") is None
+    assert cache.get("c") == b"cccc"
+
+
+def test_bounded_lru_skips_values_larger_than_the_cache():
+    cache = BoundedLRU(max_size=2, size_of=len)
+    cache.set("big", b"too big")
+
+    assert cache.get("big") is None
+
+
+async def test_local_files_are_read_and_cached(tmp_path):
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(b"jpeg bytes")
+    loader = ImageLoader()
+
+    assert await loader.fetch_many([str(path), str(tmp_path / "missing.jpg")]) == [b"jpeg bytes", None]
+
+    path.unlink()
+    assert await loader.fetch(str(path)) == b"jpeg bytes"
+
+
+@pytest.mark.skipif(httpx is None, reason="httpx not installed")
+def test_each_task_loop_gets_a_client_that_close_releases():
+    loader = ImageLoader()
+    clients = []
+
+    async def task():
+        try:
+            clients.append(loader._ensure_client())
+        finally:
+            await loader.close()
+
+    asyncio.run(task())
+    asyncio.run(task())
+
+    assert clients[0] is not clients[1]
+    assert all(client.is_closed for client in clients)
+    assert loader._client is None
+
+
+@pytest.fixture
+def served(monkeypatch):
+    """Serves ``bodies[url]`` as a chunked response; records how many chunks were produced"""
+    if httpx is None:
+        pytest.skip("httpx not installed")
+    bodies, produced = {}, []
+
+    async def chunks(body):
+        for start in range(0, len(body), 1024):
+            produced.append(start)
+            yield body[start:start + 1024]
+
+    def handler(request):
+        body, declare = bodies[str(request.url)]
+        headers = {"content-length": str(len(body))} if declare else {}
+        return httpx.Response(200, headers=headers, content=chunks(body))
+
+    transport = httpx.MockTransport(handler)
+    monkeypatch.setattr(image_loader_module.httpx, "AsyncClient", partial(httpx.AsyncClient, transport=transport))
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE", 4096)
+    return bodies, produced
+
+
+async def test_http_images_within_the_limit_are_fetched(served):
+    bodies, _ = served
+    bodies["https://cdn.example.edu/a.jpg"] = (b"x" * 3000, False)
+    loader = ImageLoader()
+    try:
+        assert await loader.fetch("https://cdn.example.edu/a.jpg") == b"x" * 3000
+    finally:
+        await loader.close()
+
+
+async def test_oversized_stream_is_aborted_without_reading_it_all(served):
+    bodies, produced = served
+    bodies["https://cdn.example.edu/huge.jpg"] = (b"x" * 64 * 1024, False)
+    loader = ImageLoader()
+    try:
+        assert await loader.fetch("https://cdn.example.edu/huge.jpg") is None
+    finally:
+        await loader.close()
+
+    assert len(produced) < 64
+
+
+async def test_declared_oversized_response_is_rejected_before_the_body(served):
+    bodies, produced = served
+    bodies["https://cdn.example.edu/huge.jpg"] = (b"x" * 64 * 1024, True)
+    loader = ImageLoader()
+    try:
+        assert await loader.fetch("https://cdn.example.edu/huge.jpg") is None
+    finally:
+        await loader.close()
+
+    assert len(produced) <= 1
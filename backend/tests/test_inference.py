@@ -0,0 +1,90 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.services import inference
+from app.services.inference import InferenceQueue, MicroBatcher
+
+
+@pytest.fixture
+def executor():
+    executor = ThreadPoolExecutor(max_workers=1)
+    yield executor
+    executor.shutdown(wait=False)
+
+
+async def test_concurrent_submits_share_one_batch(executor):
+    batches = []
+
+    def double(payloads):
+        batches.append(list(payloads))
+        return [payload * 2 for payload in payloads]
+
+    batcher = MicroBatcher(double, executor, max_batch_size=8, max_wait_ms=50)
+    try:
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+    finally:
+        await batcher.close()
+
+    assert results == [0, 2, 4, 6, 8]
+    assert batches == [[0, 1, 2, 3, 4]]
+
+
+async def test_batches_are_capped_at_max_size(executor):
+    sizes = []
+
+    def identity(payloads):
+        sizes.append(len(payloads))
+        return payloads
+
+    batcher = MicroBatcher(identity, executor, max_batch_size=2, max_wait_ms=50)
+    try:
+        assert await asyncio.gather(*(batcher.submit(i) for i in range(5))) == [0, 1, 2, 3, 4]
+    finally:
+        await batcher.close()
+
+    assert max(sizes) == 2
+    assert sum(sizes) == 5
+
+
+async def test_batch_failure_reaches_every_caller(executor):
+    def fail(payloads):
+        raise RuntimeError("model unavailable")
+
+    batcher = MicroBatcher(fail, executor, max_batch_size=4, max_wait_ms=10)
+    try:
+        results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+    finally:
+        await batcher.close()
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+async def test_label_embeddings_go_through_the_text_batcher_once(monkeypatch):
+    store = {}
+    embedded = []
+
+    def embed_texts(texts):
+        embedded.append(list(texts))
+        return np.eye(len(texts), 4, dtype=np.float32)
+
+    monkeypatch.setattr(inference.ai_service, "embed_texts", embed_texts)
+    monkeypatch.setattr(inference.ai_service, "cached_label_embeddings", lambda labels: store.get(tuple(labels)))
+    monkeypatch.setattr(
+        inference.ai_service, "store_label_embeddings",
+        lambda labels, embeddings: store.__setitem__(tuple(labels), embeddings),
+    )
+
+    queue = InferenceQueue()
+    try:
+        first = await queue.label_embeddings(["Phone", "Wallet", "Keys"])
+        second = await queue.label_embeddings(["Phone", "Wallet", "Keys"])
+    finally:
+        await queue.close()
+
+    assert first.shape == (3, 4)
+    assert second is first
+    assert sorted(text for batch in embedded for text in batch) == ["Keys", "Phone", "Wallet"]
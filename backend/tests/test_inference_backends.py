@@ -0,0 +1,26 @@
+import pytest
+
+from app.services import inference_backends
+from app.services.inference_backends import InferenceBackend, create_backend
+
+
+def test_backends_must_implement_both_towers():
+    class ImageOnly(InferenceBackend):
+        def image_features(self, pixel_values):
+            return pixel_values
+
+    with pytest.raises(TypeError):
+        InferenceBackend("clip")
+    with pytest.raises(TypeError):
+        ImageOnly("clip")
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="expected one of"):
+        create_backend("tensorrt", "clip")
+
+
+@pytest.mark.skipif(inference_backends.ort is not None, reason="onnxruntime is installed")
+def test_onnx_backend_without_onnxruntime_names_the_missing_package():
+    with pytest.raises(RuntimeError, match="onnxruntime"):
+        create_backend("onnx", "clip")
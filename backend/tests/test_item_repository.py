@@ -0,0 +1,187 @@
+import uuid
+from datetime import date
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm.util import identity_key
+
+from app.models.item import Item, ItemStatus, ItemType
+from app.repositories.item import ItemRepository
+from app.services.features import date_bucket
+
+
+class RecordingSession:
+    """Stand-in AsyncSession that records statements and replays canned result pages"""
+
+    def __init__(self, pages=()):
+        self.pages = list(pages)
+        self.statements = []
+        self.identity_map = {}
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        rows = self.pages.pop(0) if self.pages else []
+        return SimpleNamespace(
+            all=lambda: rows, scalars=lambda: SimpleNamespace(all=lambda: rows), rowcount=len(rows)
+        )
+
+    async def flush(self):
+        pass
+
+    def __contains__(self, instance):
+        return False
+
+
+def compile_sql(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_blocking_key_features():
+    assert date_bucket(date(2026, 2, 10)) - date_bucket(date(2026, 1, 10)) in (4, 5)
+
+
+async def test_block_candidates_are_scanned_in_keyset_chunks(make_item):
+    item = make_item(type=ItemType.LOST)
+    rows = [SimpleNamespace(id=i, date_lost_found=date(2026, 1, 1 + i)) for i in range(5)]
+    session = RecordingSession([rows[:2], rows[2:4], rows[4:]])
+
+    chunks = [
+        chunk async for chunk in ItemRepository(session).iter_block_candidates(
+            item, chunk_size=2, columns=("id", "date_lost_found")
+        )
+    ]
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    first, second = (compile_sql(stmt) for stmt in session.statements[:2])
+    assert "JOIN item_blocks" in first
+    assert "item_blocks.date_bucket BETWEEN" in first
+    assert "(items.date_lost_found, items.id) >" not in first
+    assert "(items.date_lost_found, items.id) >" in second
+
+
+async def test_text_search_uses_the_weighted_vector_and_ranks_by_relevance():
+    stmt = await ItemRepository(RecordingSession()).search_statement("black wallet -card")
+
+    sql = compile_sql(stmt)
+    assert "items.search_vector @@ websearch_to_tsquery" in sql
+    assert sql.index("ts_rank(items.search_vector") < sql.index("items.created_at DESC")
+
+
+async def test_fuzzy_search_sets_the_threshold_and_ranks_by_word_similarity():
+    session = RecordingSession()
+    stmt = await ItemRepository(session).search_statement("macbok", location="libary", fuzzy=True)
+
+    assert "set_config" in compile_sql(session.statements[0])
+    sql = compile_sql(stmt)
+    assert "items.title %%> %(title_1)s" in sql
+    assert "items.location_found %%> %(location_found_1)s" in sql
+    assert sql.index("word_similarity(") < sql.index("items.created_at DESC")
+
+
+async def test_block_sync_is_chunked_below_the_bind_parameter_limit(make_item):
+    session = RecordingSession()
+    items = [make_item() for _ in range(5)] + [make_item(status=ItemStatus.CLAIMED) for _ in range(3)]
+
+    await ItemRepository(session).sync_blocks(items, chunk_size=2)
+
+    sql = [compile_sql(stmt) for stmt in session.statements]
+    assert [statement.split()[0] for statement in sql] == ["DELETE", "DELETE", "INSERT", "INSERT", "INSERT"]
+    assert all(len(stmt.compile(dialect=postgresql.dialect()).params) <= 2 * 8 for stmt in session.statements)
+    assert "ON CONFLICT (item_id) DO UPDATE" in sql[2]
+
+
+async def test_bulk_update_groups_rows_by_changed_fields():
+    session = RecordingSession()
+    updates = [
+        {"id": uuid.uuid4(), "status": ItemStatus.EXPIRED},
+        {"id": uuid.uuid4(), "status": ItemStatus.EXPIRED},
+        {"id": uuid.uuid4(), "status": ItemStatus.CLAIMED, "title": "Keys"},
+        {"title": "no id, skipped"},
+    ]
+
+    await ItemRepository(session).bulk_update(updates)
+
+    first, second, reload = (compile_sql(stmt) for stmt in session.statements)
+    assert first.startswith("UPDATE items SET status=CAST(data.status AS itemstatus)")
+    assert "FROM (VALUES" in first and "title" not in first
+    assert "title=CAST(data.title AS VARCHAR(255))" in second and "status=" in second
+    # status is a blocking field: the changed items are reloaded to resync their entries
+    assert reload.startswith("SELECT") and "items.id IN" in reload
+
+
+class LoadedSession(RecordingSession):
+    """RecordingSession holding loaded instances that ``populate_existing`` reloads from ``stored`` rows"""
+
+    def __init__(self, loaded, stored):
+        super().__init__()
+        self.identity_map = {identity_key(Item, item.id): item for item in loaded}
+        self.stored = stored
+
+    async def execute(self, stmt):
+        if stmt.get_execution_options().get("populate_existing"):
+            [ids] = stmt.compile(dialect=postgresql.dialect()).params.values()
+            for item in self.identity_map.values():
+                if item.id in ids:
+                    for name, value in self.stored[item.id].items():
+                        setattr(item, name, value)
+        return await super().execute(stmt)
+
+
+async def test_bulk_update_refreshes_instances_loaded_in_the_session():
+    loaded = Item(id=uuid.uuid4(), title="Wallet", status=ItemStatus.ACTIVE)
+    other_id = uuid.uuid4()
+    session = LoadedSession([loaded], stored={loaded.id: {"title": "Black wallet"}})
+
+    await ItemRepository(session).bulk_update([
+        {"id": loaded.id, "title": "Black wallet"},
+        {"id": other_id, "title": "Blue umbrella"},
+    ])
+
+    assert loaded.title == "Black wallet"
+    update, reload = session.statements
+    assert compile_sql(update).startswith("UPDATE items SET title=")
+    # Only the instance in the identity map is reloaded
+    assert reload.compile(dialect=postgresql.dialect()).params == {"id_1": [loaded.id]}
+
+
+class StreamingSession:
+    """Stand-in AsyncSession whose ``stream`` partitions canned objects like a server-side cursor"""
+
+    def __init__(self, objects):
+        self.objects = objects
+        self.attached = set(map(id, objects))
+        self.options = None
+
+    async def stream(self, stmt):
+        self.options = stmt.get_execution_options()
+        session = self
+
+        class Result:
+            def scalars(self):
+                return self
+
+            async def partitions(self):
+                size = session.options["yield_per"]
+                for start in range(0, len(session.objects), size):
+                    yield session.objects[start:start + size]
+
+        return Result()
+
+    def __contains__(self, obj):
+        return id(obj) in self.attached
+
+    def expunge(self, obj):
+        self.attached.discard(id(obj))
+
+
+async def test_stream_yields_partitions_and_detaches_consumed_ones(make_item):
+    items = [make_item() for _ in range(5)]
+    session = StreamingSession(items)
+    attached_during = []
+
+    async for partition in ItemRepository(session).stream(chunk_size=2, order_by="created_at"):
+        attached_during.append(sum(id(item) in session.attached for item in items))
+
+    assert session.options["yield_per"] == 2
+    assert attached_during == [5, 3, 1]
+    assert not session.attached
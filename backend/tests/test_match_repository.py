@@ -0,0 +1,52 @@
+import uuid
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app.repositories.match import MatchRepository
+
+
+class RecordingSession:
+    """Stand-in AsyncSession that records statements; upserts report every row as inserted"""
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        rows = [(True,)] * len(stmt._multi_values[0]) if stmt.is_insert else []
+        return SimpleNamespace(all=lambda: rows, rowcount=0)
+
+    async def flush(self):
+        pass
+
+
+def compile_sql(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+async def test_upsert_overwrites_scores_and_collapses_duplicates_in_a_batch():
+    session = RecordingSession()
+    lost, found = uuid.uuid4(), uuid.uuid4()
+    pairs = [(lost, found, 0.5), (lost, found, 0.8), (lost, uuid.uuid4(), 0.6), (lost, uuid.uuid4(), 0.7)]
+
+    counts = await MatchRepository(session).bulk_upsert(pairs, chunk_size=2)
+
+    assert counts == {"created": 3, "updated": 0}
+    assert len(session.statements) == 2
+    sql = compile_sql(session.statements[0])
+    assert "ON CONFLICT ON CONSTRAINT uq_matches_lost_found DO UPDATE" in sql
+    assert "similarity_score = excluded.similarity_score" in sql
+    assert "WHERE" not in sql  # lower scores overwrite too
+    assert 0.8 in session.statements[0].compile().params.values()
+
+
+async def test_prune_ranks_each_side_and_deletes_only_pending_matches():
+    session = RecordingSession()
+
+    await MatchRepository(session).prune_to_top_k(lost_item_ids=[uuid.uuid4()], found_item_ids=[uuid.uuid4()], keep=3)
+
+    lost_side, found_side = (compile_sql(stmt) for stmt in session.statements)
+    assert "PARTITION BY matches.lost_item_id ORDER BY matches.similarity_score DESC" in lost_side
+    assert "PARTITION BY matches.found_item_id" in found_side
+    assert "anon_1.rank > %(rank_1)s::INTEGER AND anon_1.status = %(status_1)s" in lost_side
@@ -0,0 +1,301 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.item import ItemStatus, ItemType
+from app.models.match import MatchStatus
+from app.config import settings
+from app.services import scoring
+from app.services.matching import MatchingService, TopKPairs
+
+pytestmark = pytest.mark.skipif(not scoring.is_available(), reason="numpy/scipy/scikit-learn not installed")
+
+
+class FakeSession:
+    async def commit(self):
+        pass
+
+
+class FakeItemRepository:
+    """In-memory stand-in for the ItemRepository methods the matching service uses"""
+
+    def __init__(self, items):
+        self.items = items
+        self.db = FakeSession()
+
+    async def get(self, item_id):
+        return next((item for item in self.items if item.id == item_id), None)
+
+    async def count(self, **filters):
+        return len([item for item in self.items if all(getattr(item, k) == v for k, v in filters.items())])
+
+    async def get_active_categories(self):
+        return sorted({item.category for item in self.items if item.status == ItemStatus.ACTIVE})
+
+    async def iter_block_candidates(self, item, window_days=None, chunk_size=1000, columns=None):
+        target = ItemType.FOUND if item.type == ItemType.LOST else ItemType.LOST
+        candidates = [
+            other for other in self.items
+            if other.type == target and other.status == ItemStatus.ACTIVE and other.category == item.category
+        ]
+        for start in range(0, len(candidates), chunk_size):
+            yield candidates[start:start + chunk_size]
+
+    async def get_active_by_ids(self, item_ids, item_type, columns=None):
+        return [
+            item for item in self.items
+            if item.id in item_ids and item.type == item_type and item.status == ItemStatus.ACTIVE
+        ]
+
+    async def iter_active_chunks(self, item_type, category=None, date_from=None, date_to=None,
+                                 chunk_size=1000, columns=None):
+        items = sorted(
+            (
+                item for item in self.items
+                if item.type == item_type and item.status == ItemStatus.ACTIVE
+                and (category is None or item.category == category)
+                and (date_from is None or item.date_lost_found >= date_from)
+                and (date_to is None or item.date_lost_found <= date_to)
+            ),
+            key=lambda item: (item.date_lost_found, str(item.id)),
+        )
+        for start in range(0, len(items), chunk_size):
+            yield items[start:start + chunk_size]
+
+    async def iter_updated_since(self, since, until, chunk_size=1000):
+        items = sorted(
+            (item for item in self.items if (since is None or item.updated_at > since) and item.updated_at <= until),
+            key=lambda item: (item.updated_at, str(item.id)),
+        )
+        for start in range(0, len(items), chunk_size):
+            yield items[start:start + chunk_size]
+
+
+class FakeMatchRepository:
+    """In-memory matches keyed by (lost_id, found_id) with the MatchRepository write semantics"""
+
+    def __init__(self, items):
+        self.items = items
+        self.matches = {}
+        self.db = FakeSession()
+
+    async def bulk_upsert(self, pairs):
+        scores = {}
+        for lost_id, found_id, score in pairs:
+            scores[(lost_id, found_id)] = max(score, scores.get((lost_id, found_id), 0.0))
+        counts = {"created": 0, "updated": 0}
+        now = datetime.utcnow()
+        for key, score in scores.items():
+            match = self.matches.get(key)
+            if match is None:
+                self.matches[key] = SimpleNamespace(score=score, status=MatchStatus.PENDING, updated_at=now)
+                counts["created"] += 1
+            else:
+                match.score, match.updated_at = score, now
+                counts["updated"] += 1
+        return counts
+
+    async def prune_to_top_k(self, lost_item_ids=(), found_item_ids=(), keep=10):
+        pruned = 0
+        for side, item_ids in ((0, set(lost_item_ids)), (1, set(found_item_ids))):
+            for item_id in item_ids:
+                ranked = sorted((key for key in self.matches if key[side] == item_id),
+                                key=lambda key: -self.matches[key].score)
+                for key in ranked[keep:]:
+                    if self.matches[key].status == MatchStatus.PENDING:
+                        del self.matches[key]
+                        pruned += 1
+        return pruned
+
+    async def delete_stale_pending(self, lost_item_ids=(), found_item_ids=(), before=None):
+        stale = [
+            key for key, match in self.matches.items()
+            if (key[0] in set(lost_item_ids) or key[1] in set(found_item_ids))
+            and match.status == MatchStatus.PENDING
+            and (before is None or match.updated_at < before)
+        ]
+        for key in stale:
+            del self.matches[key]
+        return len(stale)
+
+    async def delete_inactive_pending(self):
+        inactive = {item.id for item in self.items if item.status != ItemStatus.ACTIVE}
+        stale = [
+            key for key, match in self.matches.items()
+            if match.status == MatchStatus.PENDING and (key[0] in inactive or key[1] in inactive)
+        ]
+        for key in stale:
+            del self.matches[key]
+        return len(stale)
+
+
+class FakeStateRepository:
+    def __init__(self):
+        self.fingerprints = {}
+        self.high_water_marks = {}
+
+    async def get_fingerprints(self, item_ids):
+        return {item_id: self.fingerprints[item_id] for item_id in item_ids if item_id in self.fingerprints}
+
+    async def save_fingerprints(self, fingerprints):
+        self.fingerprints.update(fingerprints)
+
+    async def get_high_water_mark(self, name):
+        return self.high_water_marks.get(name)
+
+    async def set_high_water_mark(self, name, value):
+        self.high_water_marks[name] = value
+
+
+def test_top_k_pairs_keeps_each_items_best_candidates():
+    top = TopKPairs(k=2)
+    for candidate, score in (("a", 0.5), ("b", 0.9), ("c", 0.7), ("d", 0.6)):
+        top.push("lost-1", score, candidate)
+    top.push("lost-2", 0.1, "a")
+
+    assert sorted(top.items()) == [("lost-1", "b", 0.9), ("lost-1", "c", 0.7), ("lost-2", "a", 0.1)]
+
+
+def test_match_block_applies_window_threshold_and_per_side_top_k(make_item, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_MATCHES_PER_ITEM", 1)
+    service = MatchingService(None, None)
+    lost = [make_item(type=ItemType.LOST)]
+    near = make_item(type=ItemType.FOUND, title="Black wallet")
+    twin = make_item(type=ItemType.FOUND)
+    out_of_window = make_item(type=ItemType.FOUND, date_lost_found=lost[0].date_lost_found + timedelta(days=90))
+    found = [near, twin, out_of_window]
+    lost_vectors, found_vectors = service.scorer.vectorize(lost), service.scorer.vectorize(found)
+
+    pairs, n_in_window = service._match_block(lost, lost_vectors, found, found_vectors, timedelta(days=30))
+    assert n_in_window == 2
+    assert [(lost_id, found_id) for lost_id, found_id, _ in pairs] == [(lost[0].id, twin.id)]
+
+    pairs, _ = service._match_block(
+        lost, lost_vectors, found, found_vectors, timedelta(days=30), per_found=True
+    )
+    assert {found_id for _, found_id, _ in pairs} == {near.id, twin.id}
+
+
+def test_match_block_scores_dates_over_the_runs_window(make_item, monkeypatch):
+    monkeypatch.setattr(settings, "MATCHING_WEIGHT_TITLE", 0.2)
+    monkeypatch.setattr(settings, "MATCHING_WEIGHT_DATE", 0.2)
+    service = MatchingService(None, None)
+    lost = [make_item(type=ItemType.LOST)]
+    found = [make_item(type=ItemType.FOUND, date_lost_found=lost[0].date_lost_found + timedelta(days=10))]
+    lost_vectors, found_vectors = service.scorer.vectorize(lost), service.scorer.vectorize(found)
+
+    [(_, _, wide)], _ = service._match_block(lost, lost_vectors, found, found_vectors, timedelta(days=40))
+    [(_, _, narrow)], _ = service._match_block(lost, lost_vectors, found, found_vectors, timedelta(days=20))
+
+    assert wide - narrow == pytest.approx(0.2 * (3 / 4 - 1 / 2), abs=1e-5)
+
+
+@pytest.fixture
+def pair(make_item):
+    return make_item(type=ItemType.LOST), make_item(type=ItemType.FOUND)
+
+
+@pytest.fixture
+def service(pair):
+    items = list(pair)
+    return MatchingService(FakeItemRepository(items), FakeMatchRepository(items), FakeStateRepository())
+
+
+def edit(item, **changes):
+    for name, value in changes.items():
+        setattr(item, name, value)
+    item.updated_at = datetime.utcnow()
+
+
+async def test_first_run_is_full_and_seeds_fingerprints(service, pair):
+    stats = await service.run_incremental_matching()
+
+    assert stats["mode"] == "full"
+    assert stats["items_fingerprinted"] == 2
+    assert set(service.match_repo.matches) == {(pair[0].id, pair[1].id)}
+
+    stats = await service.run_incremental_matching()
+
+    assert stats["mode"] == "incremental"
+    assert stats["items_processed"] == 0
+
+
+async def test_edit_that_lowers_a_score_overwrites_it(service, pair):
+    lost, found = pair
+    await service.run_incremental_matching()
+    before = service.match_repo.matches[(lost.id, found.id)].score
+
+    edit(found, description="Found on a bench, some cards in it")
+    await service.run_incremental_matching()
+
+    after = service.match_repo.matches[(lost.id, found.id)].score
+    assert after < before
+
+
+async def test_edit_below_threshold_removes_pending_match(service, pair):
+    lost, found = pair
+    await service.run_incremental_matching()
+
+    edit(found, title="Blue umbrella", description="Folding umbrella", tags=["umbrella"], location_found="Gym")
+    stats = await service.run_incremental_matching()
+
+    assert stats["matches_removed"] == 1
+    assert service.match_repo.matches == {}
+
+
+async def test_inactive_item_loses_pending_but_not_decided_matches(service, pair, make_item):
+    lost, found = pair
+    other_lost = make_item(type=ItemType.LOST)
+    service.item_repo.items.append(other_lost)
+    await service.run_incremental_matching()
+    service.match_repo.matches[(other_lost.id, found.id)].status = MatchStatus.ACCEPTED
+
+    edit(found, status=ItemStatus.CLAIMED)
+    await service.run_incremental_matching()
+
+    assert set(service.match_repo.matches) == {(other_lost.id, found.id)}
+
+
+async def test_full_run_drops_pending_matches_of_inactive_items(service, pair):
+    lost, found = pair
+    await service.run_full_matching()
+    lost.status = ItemStatus.EXPIRED  # e.g. a bulk update that bypassed fingerprinting
+
+    stats = await service.run_full_matching()
+
+    assert stats["matches_removed"] == 1
+    assert service.match_repo.matches == {}
+
+
+async def test_single_item_matching_scans_every_candidate_chunk(service, pair, make_item, monkeypatch):
+    lost, found = pair
+    monkeypatch.setattr(settings, "MATCHING_CHUNK_SIZE", 2)
+    monkeypatch.setattr(settings, "MAX_MATCHES_PER_ITEM", 2)
+    weaker = [
+        make_item(type=ItemType.FOUND, title="Brown wallet", location_found="Gym")
+        for _ in range(4)
+    ]
+    # The best candidate comes last, in the final chunk
+    service.item_repo.items[:] = [lost, *weaker, found]
+
+    counts = await service.process_matches_for_item(lost.id)
+
+    assert counts["created"] == 2
+    assert (lost.id, found.id) in service.match_repo.matches
+
+
+async def test_ann_neighbours_outside_the_block_are_scored(service, pair, make_item):
+    lost, found = pair
+    miscategorized = make_item(type=ItemType.FOUND, category="Bags")
+    service.item_repo.items.append(miscategorized)
+
+    class NearestNeighbours:
+        async def find_candidates(self, item, k=None):
+            return [(found.id, 0.9), (miscategorized.id, 0.8), (lost.id, 0.7)]
+
+    service.embedding_service = NearestNeighbours()
+    counts = await service.process_matches_for_item(lost.id)
+
+    assert counts["created"] == 2
+    assert set(service.match_repo.matches) == {(lost.id, found.id), (lost.id, miscategorized.id)}
@@ -0,0 +1,96 @@
+import multiprocessing
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+import app.database
+from app.models.item import ItemType
+from app.services import matching, scoring
+from app.services.matching import MatchingService
+from app.workers import matching_tasks, pool
+from app.workers.matching_tasks import run_matching_for_item
+
+
+@pytest.fixture
+def task_env(monkeypatch):
+    """Runs the task against a fake session and a MatchingService stub driven by ``outcomes``"""
+    outcomes = []
+    calls = []
+
+    @asynccontextmanager
+    async def task_session():
+        yield object()
+
+    class StubMatchingService:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        async def process_matches_for_item(self, item_id):
+            calls.append(item_id)
+            outcome = outcomes[min(len(calls), len(outcomes)) - 1]
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+    monkeypatch.setattr(app.database, "task_session", task_session)
+    monkeypatch.setattr(matching, "MatchingService", StubMatchingService)
+    monkeypatch.setattr(pool, "get_scoring_pool", lambda: None)
+    return outcomes, calls
+
+
+def test_task_reports_the_match_counts(task_env):
+    outcomes, _ = task_env
+    outcomes.append({"created": 2, "updated": 1, "pruned": 3, "removed": 0})
+    item_id = str(uuid.uuid4())
+
+    result = run_matching_for_item.apply(args=[item_id]).get()
+
+    assert result == {
+        "status": "completed", "item_id": item_id, "matches_found": 3,
+        "created": 2, "updated": 1, "pruned": 3, "removed": 0,
+    }
+
+
+def test_transient_errors_are_retried(task_env):
+    outcomes, calls = task_env
+    outcomes.extend([
+        OperationalError("SELECT 1", {}, ConnectionResetError()),
+        {"created": 1, "updated": 0, "pruned": 0, "removed": 0},
+    ])
+
+    result = run_matching_for_item.apply(args=[str(uuid.uuid4())])
+
+    assert result.get()["created"] == 1
+    assert len(calls) == 2
+
+
+def test_other_errors_fail_without_retrying(task_env):
+    outcomes, calls = task_env
+    outcomes.append(KeyError("similarity_score"))
+
+    result = run_matching_for_item.apply(args=[str(uuid.uuid4())])
+
+    assert isinstance(result.result, KeyError)
+    assert len(calls) == 1
+    assert not issubclass(KeyError, matching_tasks.TRANSIENT_ERRORS)
+
+
+@pytest.mark.skipif(not scoring.is_available(), reason="numpy/scipy/scikit-learn not installed")
+async def test_process_pool_scores_like_the_in_process_scorer(make_item):
+    source = make_item(type=ItemType.LOST)
+    candidates = [
+        make_item(type=ItemType.FOUND),
+        make_item(type=ItemType.FOUND, title="Blue umbrella", description="Folding umbrella", tags=()),
+    ]
+    executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        pooled = await MatchingService(None, None, executor=executor)._score_candidates(source, candidates)
+    finally:
+        executor.shutdown()
+
+    in_process = await MatchingService(None, None)._score_candidates(source, candidates)
+    assert pooled == pytest.approx(in_process)
+    assert pooled[0] > pooled[1]
@@ -0,0 +1,39 @@
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app.repositories.message import MessageRepository
+
+
+class RecordingSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return SimpleNamespace(all=lambda: self.rows)
+
+
+async def test_conversation_list_is_one_query_shaped_for_the_messages_page():
+    partner = uuid.uuid4()
+    session = RecordingSession([SimpleNamespace(
+        id=partner, full_name="Sam Lee", email="sam@example.edu",
+        content="Is this your wallet?", created_at=datetime(2026, 10, 17, 9, 30), unread_count=2,
+    )])
+
+    conversations = await MessageRepository(session).get_conversations_list(uuid.uuid4())
+
+    assert conversations == [{
+        "user": {"id": str(partner), "full_name": "Sam Lee", "email": "sam@example.edu", "avatar": None},
+        "last_message": "Is this your wallet?",
+        "last_message_at": "2026-10-17T09:30:00",
+        "unread_count": 2,
+    }]
+    assert len(session.statements) == 1
+    sql = str(session.statements[0].compile(dialect=postgresql.dialect()))
+    assert "SELECT DISTINCT ON (CASE WHEN (messages.sender_id = " in sql
+    assert "count(*) FILTER (WHERE messages.receiver_id = " in sql
+    assert "OVER (PARTITION BY CASE WHEN" in sql
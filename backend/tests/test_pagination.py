@@ -0,0 +1,145 @@
+import json
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.api.v1.items import list_items
+from app.models.item import Item
+from app.repositories.base import BaseCRUD, InvalidCursorError, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trips_the_keyset_position():
+    created_at, id = datetime(2026, 10, 17, 12, 30, 45, 123456), uuid.uuid4()
+
+    cursor = encode_cursor(created_at, id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", encode_cursor(datetime(2026, 1, 1), uuid.uuid4())[:-3]])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+class PagingRepository:
+    """Returns one full page for any query and a capped total"""
+
+    def __init__(self, make_item):
+        self.items = [make_item() for _ in range(2)]
+        self.counted = []
+
+    async def get_multi_cursor(self, cursor=None, limit=100, **filters):
+        return self.items, encode_cursor(self.items[-1].created_at, self.items[-1].id)
+
+    def select_filtered(self, **filters):
+        return filters
+
+    async def count_capped(self, stmt):
+        self.counted.append(stmt)
+        return 10_000, True
+
+
+async def test_cursor_pages_have_no_page_number_and_a_capped_total(make_item):
+    repo = PagingRepository(make_item)
+
+    first = await list_items(skip=0, limit=2, cursor=None, type=None, status=None, category="Keys", item_repo=repo)
+    following = await list_items(
+        skip=0, limit=2, cursor=first.next_cursor, type=None, status=None, category="Keys", item_repo=repo
+    )
+
+    assert first.page == 1
+    assert following.page is None
+    assert following.total == 10_000 and following.total_is_estimate
+    assert repo.counted == [{"category": "Keys"}, {"category": "Keys"}]
+
+
+class ScriptedSession:
+    """Stand-in AsyncSession that replays one canned result per statement"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+        self.compiled = []
+
+    async def execute(self, stmt):
+        self.compiled.append(stmt.compile(dialect=postgresql.dialect()))
+        self.statements.append(str(self.compiled[-1]))
+        result = self.results.pop(0)
+        return SimpleNamespace(all=lambda: result, scalar_one=lambda: result)
+
+
+def plan(rows):
+    return [{"Plan": {"Node Type": "Seq Scan", "Plan Rows": rows}}]
+
+
+class Row(tuple):
+    """Result row carrying the page item and the capped total column"""
+
+    @property
+    def total(self):
+        return self[1]
+
+
+STMT = select(Item).where(Item.category == "Keys").order_by(Item.created_at)
+
+
+async def test_page_below_the_cap_has_an_exact_total(make_item):
+    items = [make_item(), make_item()]
+    session = ScriptedSession([Row((item, 7)) for item in items])
+
+    page, total, is_estimate = await BaseCRUD(Item, session).get_page(STMT, limit=2, count_limit=100)
+
+    assert page == items
+    assert (total, is_estimate) == (7, False)
+    # One statement: the capped count rides along as a scalar subquery
+    [sql] = session.statements
+    assert "(SELECT count(*) AS count_1 \nFROM (SELECT items.id AS id" in sql
+    assert "LIMIT %(param_1)s::INTEGER) AS anon_1) AS total" in sql
+    assert session.compiled[0].params["param_1"] == 101
+
+
+async def test_page_past_the_cap_takes_the_planner_estimate(make_item):
+    item = make_item()
+    session = ScriptedSession([Row((item, 101))], plan(25_000))
+
+    page, total, is_estimate = await BaseCRUD(Item, session).get_page(STMT, limit=1, count_limit=100)
+
+    assert page == [item]
+    assert (total, is_estimate) == (25_000, True)
+    assert session.statements[1].startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert "ORDER BY" not in session.statements[1]
+
+
+async def test_page_past_the_last_row_counts_separately():
+    session = ScriptedSession([], 3)
+
+    page, total, is_estimate = await BaseCRUD(Item, session).get_page(STMT, skip=50, limit=10, count_limit=100)
+
+    assert (page, total, is_estimate) == ([], 3, False)
+    assert session.statements[1].startswith("SELECT count(*)")
+
+
+async def test_count_capped_is_exact_up_to_the_cap():
+    session = ScriptedSession(100)
+
+    assert await BaseCRUD(Item, session).count_capped(STMT, count_limit=100) == (100, False)
+    assert len(session.statements) == 1
+
+
+async def test_count_capped_estimates_past_the_cap():
+    session = ScriptedSession(101, json.dumps(plan(40_000)))
+
+    assert await BaseCRUD(Item, session).count_capped(STMT, count_limit=100) == (40_000, True)
+
+
+async def test_estimate_without_planner_stats_falls_back_to_the_capped_count():
+    # A never-analyzed table can report far fewer planned rows than exist
+    session = ScriptedSession(101, plan(1))
+
+    assert await BaseCRUD(Item, session).count_capped(STMT, count_limit=100) == (101, True)
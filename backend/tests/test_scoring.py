@@ -0,0 +1,94 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app.services import scoring
+
+pytestmark = pytest.mark.skipif(not scoring.is_available(), reason="numpy/scipy/scikit-learn not installed")
+
+
+@pytest.fixture
+def scorer():
+    return scoring.BatchScorer()
+
+
+def test_identical_items_score_near_one(scorer, make_item):
+    item = make_item()
+    twin = make_item(type=item.type)
+
+    assert scorer.score_one(item, [twin])[0] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_similar_item_outranks_unrelated_one(scorer, make_item):
+    lost = make_item()
+    similar = make_item(title="Black wallet", description="Leather wallet, black, found near the library")
+    unrelated = make_item(
+        title="Blue umbrella",
+        description="Folding umbrella left at the gym",
+        location_found="Sports Hall",
+        tags=("umbrella",),
+        date_lost_found=lost.date_lost_found + timedelta(days=25),
+    )
+
+    similar_score, unrelated_score = scorer.score_one(lost, [similar, unrelated])
+
+    assert similar_score > unrelated_score
+    assert 0.0 <= unrelated_score <= similar_score <= 1.0
+
+
+def test_score_matrix_matches_score_one(scorer, make_item):
+    lost = [make_item(title="Red backpack"), make_item(title="Silver laptop")]
+    found = [make_item(title="Red bag"), make_item(title="Laptop"), make_item(title="Keys")]
+
+    matrix = scorer.score_matrix(scorer.vectorize(lost), scorer.vectorize(found))
+
+    assert matrix.shape == (2, 3)
+    for row, item in zip(matrix, lost):
+        assert row == pytest.approx(scorer.score_one(item, found))
+
+
+DATED_WEIGHTS = {"title": 0.3, "description": 0.3, "tags": 0.1, "location": 0.1, "date": 0.2}
+
+
+def test_dates_outside_window_add_nothing(make_item):
+    scorer = scoring.BatchScorer(weights=DATED_WEIGHTS)
+    item = make_item()
+    near = make_item(date_lost_found=item.date_lost_found)
+    far = make_item(date_lost_found=item.date_lost_found + timedelta(days=scorer.date_window_days + 1))
+
+    near_score, far_score = scorer.score_one(item, [near, far])
+
+    assert near_score - far_score == pytest.approx(0.2, abs=1e-5)
+
+
+def test_score_matrix_window_override(make_item):
+    scorer = scoring.BatchScorer(weights=DATED_WEIGHTS, date_window_days=30)
+    item = make_item()
+    later = make_item(date_lost_found=item.date_lost_found + timedelta(days=10))
+    item_vectors, later_vectors = scorer.vectorize([item]), scorer.vectorize([later])
+
+    default = scorer.score_matrix(item_vectors, later_vectors)[0, 0]
+    narrow = scorer.score_matrix(item_vectors, later_vectors, date_window_days=20)[0, 0]
+
+    # 10 days apart: proximity 2/3 over 30 days, 1/2 over 20 days
+    assert default - narrow == pytest.approx(0.2 * (2 / 3 - 1 / 2), abs=1e-5)
+
+
+def test_missing_fields_and_empty_inputs(scorer, make_item):
+    bare = {"id": 1, "title": "Keys", "description": None, "location_found": None, "tags": None, "date_lost_found": None}
+
+    scores = scorer.score_one(bare, [make_item(title="Keys")])
+
+    assert 0.0 < scores[0] <= 1.0
+    assert scorer.score_one(bare, []).shape == (0,)
+    assert scorer.score_matrix(scorer.vectorize([]), scorer.vectorize([bare])).shape == (0, 1)
+
+
+def test_scoring_fields_are_picklable_plain_values(make_item):
+    item = make_item(date_lost_found=date(2026, 2, 1))
+
+    data = scoring.scoring_fields(item)
+
+    assert set(data) == set(scoring.SCORING_FIELDS)
+    assert data["id"] == str(item.id)
+    assert scoring.score_candidates(data, [data])[0] == pytest.approx(1.0, abs=1e-5)
@@ -0,0 +1,151 @@
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import settings
+from app.models.item import ItemType
+from app.services import search
+from app.services.search import (
+    InMemoryBackend, SearchBackend, SearchQuery, SearchService, SearchUnavailableError, item_document,
+)
+
+
+@pytest.fixture
+def backend():
+    return InMemoryBackend()
+
+
+@pytest.fixture
+def documents(make_item):
+    now = datetime.utcnow()
+    return [
+        item_document(make_item(created_at=now - timedelta(hours=2))),
+        item_document(make_item(
+            type=ItemType.FOUND, title="Blue umbrella", description="Folding umbrella",
+            category="Umbrellas", location_found="Gym", tags=("umbrella",),
+            date_lost_found=date(2026, 2, 1), created_at=now - timedelta(hours=1),
+        )),
+        item_document(make_item(
+            title="Brown wallet", description="Wallet left on a cafeteria table",
+            location_found="Cafeteria", tags=(), created_at=now,
+        )),
+    ]
+
+
+async def test_text_query_ranks_boosted_title_and_tag_hits_first(backend, documents):
+    await backend.index(documents)
+
+    result = await backend.search(SearchQuery(query="black wallet"))
+
+    assert [document["title"] for document in result.documents] == ["Black leather wallet", "Brown wallet"]
+    assert result.total == 2
+    assert result.facets["location"] == {"library": 1, "cafeteria": 1}
+
+
+async def test_fuzzy_query_tolerates_typos(backend, documents):
+    await backend.index(documents)
+
+    assert (await backend.search(SearchQuery(query="umbrela"))).total == 0
+    assert (await backend.search(SearchQuery(query="umbrela", fuzzy=True))).total == 1
+
+
+async def test_filters_and_pages_without_a_query_newest_first(backend, documents):
+    await backend.index(documents)
+
+    result = await backend.search(SearchQuery(item_type=ItemType.LOST, skip=1, limit=1))
+    assert result.total == 2
+    assert [document["title"] for document in result.documents] == ["Black leather wallet"]
+
+    result = await backend.search(SearchQuery(date_from=date(2026, 1, 15), location="the gym"))
+    assert [document["title"] for document in result.documents] == ["Blue umbrella"]
+
+
+async def test_reindexing_and_deleting_update_the_postings(backend, documents):
+    await backend.index(documents)
+    await backend.index([dict(documents[0], title="Red scarf", tags=[])])
+    await backend.delete([documents[2]["id"]])
+
+    assert (await backend.search(SearchQuery(query="wallet"))).total == 1
+    assert (await backend.search(SearchQuery(query="scarf"))).total == 1
+    assert "brown" not in backend.postings
+
+
+def test_backends_must_implement_index_delete_and_search():
+    class Incomplete(SearchBackend):
+        async def index(self, documents):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+class FlakyBackend(InMemoryBackend):
+    def __init__(self, built=True):
+        super().__init__()
+        self.built = built
+        self.down = False
+        self.calls = 0
+
+    async def is_built(self):
+        return self.built
+
+    async def search(self, query):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError("elasticsearch unreachable")
+        return await super().search(query)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(search, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+async def test_failures_skip_the_backend_until_the_retry_window_ends(clock):
+    backend = FlakyBackend()
+    service = SearchService(backend)
+    backend.down = True
+
+    with pytest.raises(ConnectionError):
+        await service.search(query="wallet")
+    with pytest.raises(SearchUnavailableError):
+        await service.search(query="wallet")
+    assert backend.calls == 1
+
+    backend.down = False
+    clock[0] += settings.SEARCH_RETRY_SECONDS + 1
+    assert (await service.search(query="wallet")).total == 0
+    assert backend.calls == 2
+
+
+async def test_unbuilt_index_is_not_searched_until_a_reindex_completes(clock):
+    backend = FlakyBackend(built=False)
+    service = SearchService(backend)
+
+    with pytest.raises(SearchUnavailableError):
+        await service.search(query="wallet")
+
+    backend.built = True
+    clock[0] += settings.SEARCH_RETRY_SECONDS + 1
+    await service.search(query="wallet")
+    assert backend.calls == 1
+
+
+async def test_reindex_marks_the_index_built(make_item):
+    marked = []
+
+    class RecordingBackend(InMemoryBackend):
+        async def mark_built(self):
+            marked.append(len(self.documents))
+
+    class ItemSource:
+        async def stream(self, chunk_size):
+            items = [make_item() for _ in range(3)]
+            for start in range(0, len(items), chunk_size):
+                yield items[start:start + chunk_size]
+
+    assert await SearchService(RecordingBackend()).reindex(ItemSource(), chunk_size=2) == 3
+    assert marked == [3]